@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import numpy as np
+
+from attempt_store import load_attempts
+from bank_io import load_questions
+from explanation_matcher import DEFAULT_MIN_CONFIDENCE, match_confidence, option_token_sets
+from merge_sources import MergeEngine, Source, iter_book_explanations
+from text_utils import tokenize
+
+# Upper and lower groups: the classic 27% of learners by overall accuracy
+GROUP_FRACTION = 0.27
+# Learners with fewer attempts have no reliable accuracy and are left out of both groups
+MIN_LEARNER_ATTEMPTS = 20
+# Upper-group responses a question needs before it can be flagged
+MIN_UPPER_RESPONSES = 20
+# Flag when the upper group's favourite other option draws at least this share of them
+MIN_ALTERNATIVE_SHARE = 0.4
+
+LOWER, UPPER = 0, 2
+
+
+def learner_groups(log: Dict[str, np.ndarray]) -> np.ndarray:
+    """0 lower, 1 middle, 2 upper, -1 too few attempts, per learner"""
+    attempts = np.bincount(log['learner'])
+    accuracy = np.bincount(log['learner'], log['isCorrect'].astype(np.float64)) / np.maximum(attempts, 1)
+    eligible = attempts >= MIN_LEARNER_ATTEMPTS
+    groups = np.full(len(attempts), -1, dtype=np.int64)
+    if not eligible.any():
+        return groups
+    low, high = np.quantile(accuracy[eligible], [GROUP_FRACTION, 1 - GROUP_FRACTION])
+    groups[eligible] = np.where(accuracy[eligible] <= low, LOWER, np.where(accuracy[eligible] >= high, UPPER, 1))
+    return groups
+
+
+def option_counts(log: Dict[str, np.ndarray], groups: np.ndarray):
+    """Question ids, answer letters and a questions x options x groups count cube, in one bincount"""
+    ids, q = np.unique(log['questionId'], return_inverse=True)
+    letters, code = np.unique(log['selectedAnswer'], return_inverse=True)
+    group = groups[log['learner']]
+    keep = group >= 0
+    index = (q[keep] * len(letters) + code[keep]) * 3 + group[keep]
+    cube = np.bincount(index, minlength=len(ids) * len(letters) * 3).reshape(len(ids), len(letters), 3)
+    return ids, letters, cube
+
+
+def score_keys(ids: np.ndarray, letters: np.ndarray, cube: np.ndarray, keys: Dict[int, str]) -> Dict[str, np.ndarray]:
+    """Compare each key with the upper group's favourite other option
+
+    z is the difference of the two shares over its multinomial standard
+    error, so it grows with both the gap and the number of strong learners.
+    """
+    upper = cube[:, :, UPPER].astype(np.float64)
+    lower = cube[:, :, LOWER].astype(np.float64)
+    upper_n = upper.sum(axis=1)
+    lower_n = lower.sum(axis=1)
+    letter_index = {letter: i for i, letter in enumerate(letters.tolist())}
+    key = np.array([letter_index.get(keys.get(qid, ''), -1) for qid in ids.tolist()])
+    has_key = key >= 0
+    rows = np.arange(len(ids))
+
+    upper_share = upper / np.maximum(upper_n, 1)[:, None]
+    lower_share = lower / np.maximum(lower_n, 1)[:, None]
+    key_share = np.where(has_key, upper_share[rows, np.maximum(key, 0)], 0.0)
+    others = upper_share.copy()
+    others[rows[has_key], key[has_key]] = -1
+    alternative = others.argmax(axis=1)
+    alternative_share = others[rows, alternative]
+    variance = (key_share + alternative_share - (alternative_share - key_share) ** 2) / np.maximum(upper_n, 1)
+    z = (alternative_share - key_share) / np.sqrt(np.maximum(variance, 1e-12))
+    # An option that strong learners pick more than weak ones behaves like the right answer
+    alternative_gap = alternative_share - lower_share[rows, alternative]
+    key_gap = np.where(has_key, key_share - lower_share[rows, np.maximum(key, 0)], 0.0)
+    return {
+        'upperResponses': upper_n,
+        'keyShare': key_share,
+        'alternative': letters[alternative],
+        'alternativeShare': alternative_share,
+        'keyGap': key_gap,
+        'alternativeGap': alternative_gap,
+        'z': z,
+        'flagged': (upper_n >= MIN_UPPER_RESPONSES) & (alternative_share >= MIN_ALTERNATIVE_SHARE)
+                   & (alternative_share > key_share)
+    }
+
+
+def book_letters(questions: List[Dict], path: str) -> Dict[int, Dict]:
+    """Appendix letter per question id, resolved the way merge_sources does"""
+    engine = MergeEngine(questions)
+    engine.add_source(Source('book', 'book', path, 50))
+    letters = {}
+    for (idx, field), offers in engine.candidates.items():
+        if field == 'correctAnswer':
+            best = max(offers, key=lambda o: o['confidence'])
+            letters[questions[idx]['id']] = {'answer': best['value'], 'match': best['match'],
+                                             'confidence': best['confidence']}
+    return letters
+
+
+def other_domains(question: Dict, answer: str, records: List[Dict]) -> List[int]:
+    """Domains whose appendix entry for this question number gives answer and fits the options"""
+    options = option_token_sets(question)
+    domains = []
+    for record in records:
+        if record['domain'] == question.get('domain', {}).get('number') or record['correctAnswer'] != answer:
+            continue
+        view = {'number': record['originalId'], 'answer': answer, 'explanation': record['explanation']}
+        if match_confidence(question, options, view, set(tokenize(record['explanation']))) >= DEFAULT_MIN_CONFIDENCE:
+            domains.append(int(record['domain']))
+    return sorted(domains)
+
+
+def build_review(ids: np.ndarray, scores: Dict[str, np.ndarray], bank: Dict[int, Dict],
+                 book: Dict[int, Dict], book_by_number: Dict[int, List[Dict]]) -> List[Dict]:
+    """Flagged questions, most suspicious first"""
+    review = []
+    for row in np.flatnonzero(scores['flagged']).tolist():
+        question_id = int(ids[row])
+        question = bank.get(question_id, {})
+        suggested = str(scores['alternative'][row])
+        entry = {
+            'id': question_id,
+            'domain': question.get('domain', {}).get('number'),
+            'originalId': question.get('originalId'),
+            'correctAnswer': question.get('correctAnswer'),
+            'suggestedAnswer': suggested,
+            'upperResponses': int(scores['upperResponses'][row]),
+            'keyShare': round(float(scores['keyShare'][row]), 3),
+            'suggestedShare': round(float(scores['alternativeShare'][row]), 3),
+            'keyGap': round(float(scores['keyGap'][row]), 3),
+            'suggestedGap': round(float(scores['alternativeGap'][row]), 3),
+            'z': round(float(scores['z'][row]), 2)
+        }
+        appendix = book.get(question_id)
+        if appendix:
+            entry['bookAnswer'] = appendix['answer']
+            entry['bookMatch'] = appendix['match']
+        if appendix and appendix['answer'] == suggested:
+            entry['verdict'] = 'book-agrees-with-learners'
+        elif appendix and appendix['answer'] == entry['correctAnswer']:
+            entry['verdict'] = 'book-agrees-with-key'
+        else:
+            entry['verdict'] = 'learners-only'
+        # extract_explanations.py falls back to domain 1, which pairs the question with the wrong appendix entry
+        if entry['verdict'] != 'book-agrees-with-learners' and entry['originalId'] is not None:
+            domains = other_domains(question, suggested, book_by_number.get(entry['originalId'], []))
+            if domains:
+                entry['possibleDomains'] = domains
+        review.append(entry)
+
+    # A book that backs the key is weaker evidence, unless the question may sit in the wrong domain
+    rank = {'book-agrees-with-learners': 0, 'learners-only': 1, 'book-agrees-with-key': 2}
+    review.sort(key=lambda e: (min(rank[e['verdict']], 1 if 'possibleDomains' in e else 2), -e['z']))
+    return review
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Flag answer keys that strong learners consistently disagree with')
+    parser.add_argument('input', help='An export, a directory of exports (v1 or compact v2) or an attempt store')
+    parser.add_argument('--questions', default='src/data/questions.json')
+    parser.add_argument('--book', default='book_explanations.json', help='Appendix answers to cross-check against')
+    parser.add_argument('--output', default='artifacts/answer_key_review.json')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes for reading exports (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    questions = load_questions(args.questions)
+    bank = {q['id']: q for q in questions}
+    log, _ = load_attempts(args.input, args.jobs, ('questionId', 'selectedAnswer', 'isCorrect'))
+    if not len(log['questionId']):
+        print(f"❌ No question attempts found in {args.input}")
+        return 1
+    loaded = time.perf_counter()
+
+    groups = learner_groups(log)
+    ids, letters, cube = option_counts(log, groups)
+    scores = score_keys(ids, letters, cube, {qid: q['correctAnswer'] for qid, q in bank.items()})
+    scored = time.perf_counter()
+
+    book: Dict[int, Dict] = {}
+    book_by_number: Dict[int, List[Dict]] = defaultdict(list)
+    if os.path.exists(args.book):
+        book = book_letters(questions, args.book)
+        for record in iter_book_explanations(args.book):
+            if record['originalId'] is not None and record['domain'] is not None:
+                book_by_number[int(record['originalId'])].append(record)
+    else:
+        print(f"⚠️ {args.book} not found; skipping the appendix cross-check")
+    review = build_review(ids, scores, bank, book, book_by_number)
+
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'learners': {'upper': int((groups == UPPER).sum()), 'lower': int((groups == LOWER).sum()),
+                         'total': int((groups >= 0).sum())},
+            'questions': len(ids),
+            'flagged': len(review),
+            'review': review
+        }, f, indent=2)
+
+    print(f"Scanned {len(log['questionId'])} attempts on {len(ids)} questions "
+          f"(read {loaded - start:.2f}s, scoring {scored - loaded:.3f}s)")
+    if not review:
+        print("✅ No answer keys contradicted by strong learners")
+    for entry in review[:20]:
+        book_note = f", book {entry['bookAnswer']}" if 'bookAnswer' in entry else ''
+        print(f"  ⚠️ #{entry['id']} (domain {entry['domain']}, Q{entry['originalId']}): key {entry['correctAnswer']} "
+              f"{entry['keyShare']:.0%} vs {entry['suggestedAnswer']} {entry['suggestedShare']:.0%} of strong learners"
+              f"{book_note} [{entry['verdict']}]")
+    if len(review) > 20:
+        print(f"  ... and {len(review) - 20} more")
+    print(f"Review list saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import re
+from typing import Dict, Iterator
+
+
+def iter_appendix_answers(pdf_path: str, first_page: int = 238) -> Iterator[Dict]:
+    """Stream answers parsed from the PDF appendix with PyMuPDF"""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(pdf_path)
+    domain = None
+    current = None
+    try:
+        for page_num in range(first_page, len(doc) + 1):
+            lines = [line.strip() for line in doc.load_page(page_num - 1).get_text().split('\n')]
+            for line in lines:
+                chapter_match = re.match(r'^Chapter\s+(\d+)', line)
+                if chapter_match:
+                    domain = int(chapter_match.group(1))
+                    continue
+                if not line or re.match(r'^\d+\s*$', line) or 'Appendix' in line:
+                    continue
+                answer_match = re.match(r'^(\d+)\.\s*([A-D])\.\s*(.*)$', line)
+                if answer_match:
+                    if current:
+                        yield current
+                    current = {
+                        'domain': domain,
+                        'originalId': int(answer_match.group(1)),
+                        'correctAnswer': answer_match.group(2),
+                        'explanation': answer_match.group(3).strip()
+                    }
+                elif current:
+                    current['explanation'] += ' ' + line
+        if current:
+            yield current
+    finally:
+        doc.close()
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from learner_data import ATTEMPT_FIELDS, export_paths, load_attempt_log, new_attempts
+
+DEFAULT_STORE = 'artifacts/attempts'
+# Appends past this many segments trigger a compaction into one
+MAX_SEGMENTS = 8
+# meta.json layout; version 1 stores kept timestamp watermarks as export marks
+STORE_VERSION = 2
+# Widths read_attempt_columns uses, where the store keeps a narrower one
+LOG_TYPES = {'questionId': np.int64, 'timeSpent': np.float64}
+
+
+class AttemptStore:
+    """Attempts as fixed-width NumPy columns on disk, read through memory maps
+
+    Each append writes a new segment directory of .npy files; compaction
+    merges the segments into one, sorted by learner and time. String fields
+    are dictionary-encoded, with the dictionaries and each export's
+    new_attempts mark kept in meta.json.
+    """
+
+    COLUMNS = {
+        'learner': np.uint32,
+        'questionId': np.int32,
+        'selectedAnswer': np.uint8,
+        'correctAnswer': np.uint8,
+        'isCorrect': np.bool_,
+        'timeSpent': np.float32,
+        'timestamp': np.int64,  # epoch ms
+        'testMode': np.uint8,
+        'sessionId': np.uint32
+    }
+    # Encoded column -> dictionary it indexes; both answer columns share one
+    DICTIONARIES = {'learner': 'learners', 'selectedAnswer': 'answers', 'correctAnswer': 'answers',
+                    'testMode': 'modes', 'sessionId': 'sessions'}
+
+    def __init__(self, root: str = DEFAULT_STORE):
+        self.root = root
+        self.meta = {'version': STORE_VERSION, 'segments': [], 'next': 1, 'rows': 0, 'marks': {},
+                     'dictionaries': {'learners': [], 'answers': [''], 'modes': [''], 'sessions': ['']}}
+        meta_path = os.path.join(root, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+            if self.meta.get('version', 1) != STORE_VERSION:
+                raise ValueError(f'{root} was built by an older version of this tool; delete it and append again')
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self.meta['dictionaries'].items()}
+
+    @staticmethod
+    def is_store(path: str) -> bool:
+        return os.path.isfile(os.path.join(path, 'meta.json'))
+
+    @property
+    def rows(self) -> int:
+        return self.meta['rows']
+
+    def _save_meta(self):
+        path = os.path.join(self.root, 'meta.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, separators=(',', ':'))
+        # The rename is the commit point for appends and compactions
+        os.replace(path + '.tmp', path)
+
+    def encode(self, column: str, values: np.ndarray) -> np.ndarray:
+        """Dictionary-encode a string column; only its distinct values touch Python"""
+        dictionary = self.DICTIONARIES[column]
+        codes = self._codes[dictionary]
+        distinct, inverse = np.unique(values, return_inverse=True)
+        mapped = np.empty(len(distinct), dtype=np.int64)
+        for i, value in enumerate(distinct.tolist()):
+            if value not in codes:
+                codes[value] = len(codes)
+                self.meta['dictionaries'][dictionary].append(value)
+            mapped[i] = codes[value]
+        limit = np.iinfo(self.COLUMNS[column]).max
+        if len(codes) - 1 > limit:
+            raise ValueError(f'Too many distinct {column} values for {np.dtype(self.COLUMNS[column]).name}')
+        return mapped[inverse].astype(self.COLUMNS[column])
+
+    def decode(self, column: str, codes: np.ndarray) -> np.ndarray:
+        return np.array(self.meta['dictionaries'][self.DICTIONARIES[column]], dtype=str)[codes]
+
+    def _write_segment(self, columns: Dict[str, np.ndarray]) -> Dict:
+        name = f"segment-{self.meta['next']:06d}"
+        self.meta['next'] += 1
+        directory = os.path.join(self.root, name)
+        os.makedirs(directory, exist_ok=True)
+        for column, dtype in self.COLUMNS.items():
+            np.save(os.path.join(directory, column + '.npy'), np.ascontiguousarray(columns[column], dtype=dtype))
+        return {'name': name, 'rows': len(columns['questionId'])}
+
+    def append(self, learner: str, columns: Dict[str, np.ndarray]) -> int:
+        """Append one learner's attempts (read_attempt_columns layout) as a new segment"""
+        return self.append_many([learner], [columns])
+
+    def append_many(self, learners: List[str], parts: List[Dict[str, np.ndarray]]) -> int:
+        """Append several learners' attempts as a single segment"""
+        parts = [(name, part) for name, part in zip(learners, parts) if len(part['questionId'])]
+        if not parts:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        merged = {field: np.concatenate([part[field] for _, part in parts]) for field in parts[0][1]}
+        merged['learner'] = np.repeat(np.array([name for name, _ in parts], dtype=str),
+                                      [len(part['questionId']) for _, part in parts])
+        encoded = {column: self.encode(column, merged[column]) if column in self.DICTIONARIES
+                   else merged[column] for column in self.COLUMNS}
+        self.meta['segments'].append(self._write_segment(encoded))
+        self.meta['rows'] += len(encoded['questionId'])
+        self._save_meta()
+        if len(self.meta['segments']) > MAX_SEGMENTS:
+            self.compact()
+        return len(encoded['questionId'])
+
+    def drop_learners(self, names: List[str]) -> List[str]:
+        """Rewrite the segments holding any of these learners' rows without them
+
+        Only meta is updated in memory; the caller saves it and then deletes
+        the returned directories of the replaced segments.
+        """
+        codes = [self._codes['learners'][name] for name in names if name in self._codes['learners']]
+        if not codes:
+            return []
+        stale = []
+        for i, (segment, columns) in enumerate(zip(list(self.meta['segments']), self.segments())):
+            drop = np.isin(columns['learner'], codes)
+            if not drop.any():
+                continue
+            self.meta['segments'][i] = self._write_segment({column: values[~drop]
+                                                            for column, values in columns.items()})
+            self.meta['rows'] -= int(drop.sum())
+            stale.append(os.path.join(self.root, segment['name']))
+        return stale
+
+    def segments(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Each segment's columns as read-only memory maps (no copy, no parsing)"""
+        for segment in self.meta['segments']:
+            directory = os.path.join(self.root, segment['name'])
+            yield {column: np.load(os.path.join(directory, column + '.npy'), mmap_mode='r')
+                   for column in self.COLUMNS}
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """All rows per column: zero-copy after compaction, concatenated otherwise"""
+        segments = list(self.segments())
+        if len(segments) == 1:
+            return segments[0]
+        return {column: np.concatenate([s[column] for s in segments]) if segments
+                else np.zeros(0, dtype=dtype) for column, dtype in self.COLUMNS.items()}
+
+    def compact(self):
+        """Merge all segments into one, ordered by learner then time"""
+        old = self.meta['segments']
+        if len(old) < 2:
+            return
+        columns = self.columns()
+        order = np.lexsort((columns['timestamp'], columns['learner']))
+        self.meta['segments'] = [self._write_segment({column: values[order] for column, values in columns.items()})]
+        self._save_meta()
+        for segment in old:
+            shutil.rmtree(os.path.join(self.root, segment['name']), ignore_errors=True)
+
+    def log(self, fields=ATTEMPT_FIELDS) -> Dict[str, np.ndarray]:
+        """The given fields in the load_attempt_log layout (decoded strings, learner index)
+
+        Decoding a string field materialises it, so callers should ask only
+        for the fields they use.
+        """
+        columns = self.columns()
+        log = {}
+        for field in fields:
+            if field in self.DICTIONARIES:
+                log[field] = self.decode(field, columns[field])
+            else:
+                log[field] = np.asarray(columns[field]).astype(LOG_TYPES.get(field, self.COLUMNS[field]))
+        log['learner'] = np.asarray(columns['learner']).astype(np.int32)
+        return log
+
+    def learner_names(self) -> List[str]:
+        return list(self.meta['dictionaries']['learners'])
+
+
+def append_exports(store: AttemptStore, paths: List[str]) -> Dict:
+    """Append the attempts each export gained since the last run, as one segment per run
+
+    Learners whose earlier attempts changed have their rows replaced.
+    """
+    learners, parts, reset = [], [], []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        result = new_attempts(path, store.meta['marks'].setdefault(name, {}))
+        if result is not None:
+            learners.append(name)
+            parts.append(result[0])
+            if result[1]:
+                reset.append(name)
+    if not parts:
+        return {'changed': 0, 'replaced': 0, 'rows': 0}
+    os.makedirs(store.root, exist_ok=True)
+    stale = store.drop_learners(reset)
+    rows = store.append_many(learners, parts)
+    # One meta save commits the rewritten segments, the new rows and the marks together
+    store._save_meta()
+    for directory in stale:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {'changed': len(parts), 'replaced': len(reset), 'rows': rows}
+
+
+def load_attempts(source: str, jobs: Optional[int] = None,
+                  fields: Sequence[str] = ATTEMPT_FIELDS) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """Attempt log and learner names from an attempt store, or from an export or directory of exports
+
+    A store is read through memory maps with no JSON parsing; fields
+    limits which string columns it decodes.
+    """
+    if os.path.isdir(source) and AttemptStore.is_store(source):
+        store = AttemptStore(source)
+        return store.log(fields), store.learner_names()
+    paths = export_paths(source)
+    return load_attempt_log(paths, jobs), [os.path.splitext(os.path.basename(path))[0] for path in paths]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Memory-mapped columnar store of learner attempts')
+    parser.add_argument('--store', default=DEFAULT_STORE)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    append_parser = subparsers.add_parser('append', help='Append new attempts from learner exports')
+    append_parser.add_argument('input', help='An export, or a directory of exports (v1 or compact v2)')
+    subparsers.add_parser('compact', help='Merge all segments into one')
+    subparsers.add_parser('info', help='Print row, segment and dictionary counts')
+    args = parser.parse_args(argv)
+
+    try:
+        store = AttemptStore(args.store)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    start = time.perf_counter()
+    if args.command == 'append':
+        result = append_exports(store, export_paths(args.input))
+        print(f"Appended {result['rows']} attempts from {result['changed']} changed exports "
+              f"in {time.perf_counter() - start:.2f}s")
+        if result['replaced']:
+            print(f"  ℹ️ {result['replaced']} learners' rows replaced (earlier attempts changed)")
+    elif args.command == 'compact':
+        store.compact()
+        print(f"Compacted {store.rows} attempts into 1 segment in {time.perf_counter() - start:.2f}s")
+
+    dictionaries = store.meta['dictionaries']
+    size = sum(os.path.getsize(os.path.join(dirpath, f)) for dirpath, _, files in os.walk(args.store) for f in files) \
+        if os.path.isdir(args.store) else 0
+    print(f"{args.store}: {store.rows} attempts in {len(store.meta['segments'])} segments ({size / 1e6:.1f} MB), "
+          f"{len(dictionaries['learners'])} learners, {len(dictionaries['sessions']) - 1} sessions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import argparse
+import hashlib
+import json
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from bank_io import iter_questions
+
+# Fields compared individually; anything else is reported as 'other'
+DIFF_FIELDS = ('questionText', 'options', 'correctAnswer', 'explanation', 'domain')
+
+
+_canonical = json.JSONEncoder(sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def digest(value) -> bytes:
+    """Compact 8-byte hash of a JSON value"""
+    # Strings (most fields) skip the encoder; the prefix keeps '1' and 1 apart
+    data = b's' + value.encode('utf-8') if isinstance(value, str) else _canonical.encode(value).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def question_key(question: Dict, key: str):
+    """Join key: the question id, or (domain, originalId) for book numbering"""
+    if key == 'originalId':
+        return ((question.get('domain') or {}).get('number'), question.get('originalId'))
+    return question.get(key)
+
+
+def field_digests(question: Dict) -> Tuple[bytes, ...]:
+    other = {k: v for k, v in question.items() if k not in DIFF_FIELDS}
+    return tuple(digest(question.get(field)) for field in DIFF_FIELDS) + (digest(other),)
+
+
+def changed_fields(old: Tuple[bytes, ...], new: Tuple[bytes, ...]) -> List[str]:
+    names = DIFF_FIELDS + ('other',)
+    return [name for name, a, b in zip(names, old, new) if a != b]
+
+
+def field_value(question: Dict, field: str):
+    if field == 'other':
+        return {k: v for k, v in question.items() if k not in DIFF_FIELDS}
+    return question.get(field)
+
+
+def diff_banks(old_path: str, new_path: str, key: str = 'id') -> Dict:
+    """Stream both banks and report added, removed and modified questions
+
+    Only per-field hashes of the old bank are held in memory. Values of
+    changed fields are collected in a final pass over the old bank for just
+    the modified keys. A key that occurs more than once in a bank is
+    compared by its first occurrence and reported under duplicates.
+    """
+    old_index: Dict[object, Tuple[bytes, ...]] = {}
+    old_duplicates = set()
+    for question in iter_questions(old_path):
+        k = question_key(question, key)
+        if k in old_index:
+            old_duplicates.add(k)
+            continue
+        old_index[k] = field_digests(question)
+
+    added = []
+    modified: Dict[object, Dict] = {}
+    seen = set()
+    new_duplicates = set()
+    for question in iter_questions(new_path):
+        k = question_key(question, key)
+        if k in seen:
+            new_duplicates.add(k)
+            continue
+        seen.add(k)
+        new_digests = field_digests(question)
+        old_digests = old_index.get(k)
+        if old_digests is None:
+            added.append(question)
+        elif old_digests != new_digests:
+            fields = changed_fields(old_digests, new_digests)
+            modified[k] = {
+                'key': k,
+                'changes': {f: {'old': None, 'new': field_value(question, f)} for f in fields}
+            }
+    removed_keys = set(old_index) - seen
+
+    removed = []
+    if modified or removed_keys:
+        done = set()
+        for question in iter_questions(old_path):
+            k = question_key(question, key)
+            if k in done:
+                continue
+            done.add(k)
+            if k in modified:
+                for field, change in modified[k]['changes'].items():
+                    change['old'] = field_value(question, field)
+            elif k in removed_keys:
+                removed.append(question)
+
+    return {
+        'old': old_path,
+        'new': new_path,
+        'key': key,
+        'summary': {
+            'old': len(old_index),
+            'new': len(seen),
+            'added': len(added),
+            'removed': len(removed),
+            'modified': len(modified),
+            'duplicates': len(old_duplicates) + len(new_duplicates)
+        },
+        'added': added,
+        'removed': removed,
+        'modified': list(modified.values()),
+        'duplicates': {'old': sorted(old_duplicates, key=str), 'new': sorted(new_duplicates, key=str)}
+    }
+
+
+def short(value, width: int = 100, start: int = 0) -> str:
+    """Truncate a value for display, optionally centred on a character offset"""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    if len(text) <= width:
+        return text
+    begin = max(0, min(start - width // 4, len(text) - width))
+    return ('...' if begin else '') + text[begin:begin + width] + ('...' if begin + width < len(text) else '')
+
+
+def first_difference(a, b) -> int:
+    a = a if isinstance(a, str) else json.dumps(a, ensure_ascii=False)
+    b = b if isinstance(b, str) else json.dumps(b, ensure_ascii=False)
+    return next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+
+
+def format_text(result: Dict) -> Iterator[str]:
+    s = result['summary']
+    yield f"{result['old']} ({s['old']}) -> {result['new']} ({s['new']})"
+    yield f"  {s['added']} added, {s['removed']} removed, {s['modified']} modified"
+    for side in ('old', 'new'):
+        keys = result['duplicates'][side]
+        if keys:
+            shown = ', '.join(map(str, keys[:10])) + (' ...' if len(keys) > 10 else '')
+            yield f"  ⚠️ {len(keys)} {result['key']} keys occur more than once in {result[side]}; " \
+                  f"only the first of each is compared: {shown}"
+    for question in result['added']:
+        yield f"+ {question_key(question, result['key'])}: {short(question.get('questionText', ''))}"
+    for question in result['removed']:
+        yield f"- {question_key(question, result['key'])}: {short(question.get('questionText', ''))}"
+    for entry in result['modified']:
+        yield f"~ {entry['key']}: {', '.join(entry['changes'])}"
+        for field, change in entry['changes'].items():
+            at = first_difference(change['old'], change['new'])
+            yield f"    {field}: {short(change['old'], start=at)}"
+            yield f"    {' ' * len(field)}  -> {short(change['new'], start=at)}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Keyed diff between two question bank files (JSON or JSONL)')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--key', choices=['id', 'originalId'], default='id',
+                        help="Join on 'id' or on (domain, originalId)")
+    parser.add_argument('--format', choices=['text', 'json', 'summary'], default='text')
+    parser.add_argument('--exit-code', action='store_true', help='Exit with 1 when the banks differ')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = diff_banks(args.old, args.new, args.key)
+    elapsed = time.perf_counter() - start
+
+    if args.format == 'json':
+        json.dump(result, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.format == 'summary':
+        print(json.dumps(result['summary']))
+    else:
+        for line in format_text(result):
+            print(line)
+        print(f"\nCompared in {elapsed:.2f}s")
+
+    s = result['summary']
+    return 1 if args.exit_code and (s['added'] or s['removed'] or s['modified']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
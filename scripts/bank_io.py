@@ -0,0 +1,130 @@
+import json
+from typing import Dict, Iterator, List, TextIO
+
+_decoder = json.JSONDecoder()
+
+
+def load_questions(path: str) -> List[Dict]:
+    """Load a question bank stored as a JSON array or JSON Lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+
+class JsonStream:
+    """Incremental JSON reader over a text file, decoding one value at a time"""
+
+    def __init__(self, f: TextIO, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self, size: int = 0) -> bool:
+        chunk = self.f.read(max(size, self.chunk_size))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self, skip: str = ' \t\r\n') -> str:
+        """Next significant character ('' at end of input), skipping the given characters"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in JSON input")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # Grow geometrically so a large value is not re-decoded once per chunk
+                if not self.fill(len(self.buffer) - self.pos):
+                    raise
+                continue
+            if end >= len(self.buffer) and not self.eof:
+                # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator:
+        """Yield the elements of the array starting at the current position"""
+        self.expect('[')
+        while True:
+            char = self.peek(' \t\r\n,')
+            if char == ']':
+                self.pos += 1
+                return
+            if not char:
+                raise ValueError('Unterminated JSON array')
+            yield self.value()
+
+    def iter_object(self, streamed=()) -> Iterator:
+        """Yield (key, value) members of the object at the current position
+
+        Members named in `streamed` must hold arrays and are yielded as lazy
+        element iterators, which have to be consumed before the next member.
+        """
+        self.expect('{')
+        while True:
+            char = self.peek(' \t\r\n,')
+            if char == '}':
+                self.pos += 1
+                return
+            if not char:
+                raise ValueError('Unterminated JSON object')
+            key = self.value()
+            self.expect(':')
+            if key in streamed and self.peek() == '[':
+                elements = self.iter_array()
+                yield key, elements
+                for _ in elements:
+                    pass
+            else:
+                yield key, self.value()
+
+
+def iter_json_array(f: TextIO, chunk_size: int = 1 << 16) -> Iterator:
+    """Yield the elements of a top-level JSON array without reading it all at once"""
+    stream = JsonStream(f, chunk_size)
+    if stream.peek() != '[':
+        raise ValueError('Expected a JSON array')
+    yield from stream.iter_array()
+
+
+def iter_questions(path: str) -> Iterator[Dict]:
+    """Stream questions one at a time from a JSON array or JSON Lines file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(f)
+
+
+def save_questions(path: str, questions: List[Dict]):
+    """Write a question bank in the same layout the app and extractors use"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for question in questions:
+                f.write(json.dumps(question, ensure_ascii=False) + '\n')
+        else:
+            json.dump(questions, f, indent=2, ensure_ascii=False)
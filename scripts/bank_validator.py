@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from bank_io import load_questions
+
+OPTION_LETTERS = 'ABCD'
+
+# Default allowed gap (percentage points) between a domain's share of the bank and its exam weight
+DEFAULT_WEIGHT_TOLERANCE = 5.0
+
+# PDF extraction leftovers: hyphen breaks and running page headers/footers that leaked
+# into the text. A hyphen break is either a word split across a line ("fol- lowing") or
+# a compound with a stray space ("third- party"); both are reported. Suspended hyphens
+# followed by "and"/"or" ("volume- and partition-level") are allowed.
+HYPHEN_BREAK = re.compile(r'\b([A-Za-z]+)- (?!(?:and|or) )([a-z]+)')
+WORD = re.compile(r'[A-Za-z]+')
+PAGE_FURNITURE = re.compile(r'Appendix\s+■|Answers to Review Questions|Chapter \d+: Domain \d')
+
+
+class Columns:
+    """The bank as parallel arrays, built in a single pass over the records"""
+
+    def __init__(self, questions: List[Dict]):
+        n = len(questions)
+        self.count = n
+        # Null fields are read as missing rather than through .get defaults: they are exactly
+        # the bad records the rules exist to report
+        self.ids = np.fromiter((-1 if q.get('id') is None else q['id'] for q in questions), dtype=np.int64, count=n)
+        self.original_ids = np.fromiter((q.get('originalId') or -1 for q in questions), dtype=np.int64, count=n)
+        self.domains = np.fromiter(((q.get('domain') or {}).get('number') or 0 for q in questions),
+                                   dtype=np.int64, count=n)
+        self.weights = np.fromiter(((q.get('domain') or {}).get('weight') or 0 for q in questions),
+                                   dtype=np.float64, count=n)
+        options = [q.get('options') or [] for q in questions]
+        self.letters = np.array([''.join(o.get('letter') or '' for o in opts) for opts in options], dtype=object)
+        self.empty_options = np.fromiter(
+            (sum(1 for o in opts if not (o.get('text') or '').strip()) for opts in options),
+            dtype=np.int64, count=n)
+        # Domain number an objective such as "2.3" belongs to, or -1 when untagged
+        self.objective_domains = np.fromiter(
+            (int(q['objective'].split('.')[0]) if q.get('objective') else -1 for q in questions),
+            dtype=np.int64, count=n)
+        self.answers = np.array([(q.get('correctAnswer') or '').strip() for q in questions], dtype=object)
+        self.explanation_lengths = np.fromiter((len((q.get('explanation') or '').strip()) for q in questions),
+                                               dtype=np.int64, count=n)
+        # All of a question's text in one string, and every question's text in one column
+        texts = ['\n'.join([q.get('questionText') or ''] + [o.get('text') or '' for o in opts]
+                           + [q.get('explanation') or '']) for q, opts in zip(questions, options)]
+        self.text = '\x00'.join(texts)
+        self.text_ends = np.cumsum(np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=n))
+
+    def text_matches(self, pattern, accept: Optional[Callable] = None) -> np.ndarray:
+        """Rows whose text matches a regex (and accept(match), if given), using one scan over the joined column"""
+        starts = np.fromiter((m.start() for m in pattern.finditer(self.text) if accept is None or accept(m)),
+                             dtype=np.int64)
+        mask = np.zeros(self.count, dtype=bool)
+        mask[np.searchsorted(self.text_ends, starts, side='right')] = True
+        return mask
+
+
+def duplicated(values: np.ndarray, ignore=None) -> np.ndarray:
+    """Mask of rows whose value occurs more than once"""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    mask = counts[inverse] > 1
+    if ignore is not None:
+        mask &= values != ignore
+    return mask
+
+
+def duplicated_pairs(a: np.ndarray, b: np.ndarray, ignore=None) -> np.ndarray:
+    keys = np.stack([a, b], axis=1)
+    _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    mask = counts[inverse.reshape(-1)] > 1
+    if ignore is not None:
+        mask &= b != ignore
+    return mask
+
+
+def hyphen_breaks(c: Columns, max_ids: int) -> Dict:
+    """Every hyphen break, labelled a line break when its joined halves are a word found elsewhere in the bank"""
+    vocabulary = {word.lower() for word in WORD.findall(c.text)}
+    matches = list(HYPHEN_BREAK.finditer(c.text))
+    rows = np.searchsorted(c.text_ends, np.fromiter((m.start() for m in matches), dtype=np.int64,
+                                                    count=len(matches)), side='right')
+    kinds = ['line-break' if (m.group(1) + m.group(2)).lower() in vocabulary else 'stray-space'
+             for m in matches]
+    mask = np.zeros(c.count, dtype=bool)
+    mask[rows] = True
+    return {
+        'rule': 'hyphen-break',
+        'severity': 'warning',
+        'description': 'No hyphen breaks left by PDF extraction ("fol- lowing", "third- party")',
+        'failures': int(mask.sum()),
+        'ids': c.ids[mask][:max_ids].tolist(),
+        'kinds': {kind: kinds.count(kind) for kind in ('line-break', 'stray-space')},
+        'breaks': [{'id': int(c.ids[row]), 'text': m.group(0), 'kind': kind}
+                   for m, row, kind in zip(matches[:max_ids], rows[:max_ids], kinds[:max_ids])]
+    }
+
+
+def answer_in_options(c: Columns) -> np.ndarray:
+    single = np.fromiter((len(a) == 1 for a in c.answers), dtype=bool, count=c.count)
+    present = np.fromiter((a in letters for a, letters in zip(c.answers, c.letters)), dtype=bool, count=c.count)
+    return ~(single & present)
+
+
+class Rule:
+    def __init__(self, name: str, severity: str, description: str, check: Callable[[Columns], np.ndarray]):
+        self.name = name
+        self.severity = severity
+        self.description = description
+        self.check = check
+
+
+# Row-level rules: each check returns a boolean mask of failing questions
+RULES = [
+    Rule('unique-id', 'error', 'Question ids are unique',
+         lambda c: duplicated(c.ids)),
+    Rule('unique-original-id', 'warning', '(domain, originalId) pairs are unique',
+         lambda c: duplicated_pairs(c.domains, c.original_ids, ignore=-1)),
+    Rule('four-options', 'error', 'Exactly four options lettered A-D',
+         lambda c: c.letters != OPTION_LETTERS),
+    Rule('option-text', 'error', 'Every option has text',
+         lambda c: c.empty_options > 0),
+    Rule('answer-in-options', 'error', 'correctAnswer is one of the option letters',
+         answer_in_options),
+    Rule('explanation', 'error', 'Explanation is not empty',
+         lambda c: c.explanation_lengths == 0),
+    Rule('known-domain', 'error', 'Domain has a number and an exam weight',
+         lambda c: (c.domains <= 0) | (c.weights <= 0)),
+    Rule('objective-domain', 'error', 'Exam objective belongs to the question\'s domain',
+         lambda c: (c.objective_domains >= 0) & (c.objective_domains != c.domains)),
+    Rule('page-furniture', 'warning', 'No page headers or footers in the text',
+         lambda c: c.text_matches(PAGE_FURNITURE)),
+]
+
+
+def domain_distribution(c: Columns, tolerance: float) -> Dict:
+    """Compare each domain's share of the bank with its declared exam weight"""
+    domains, inverse, counts = np.unique(c.domains, return_inverse=True, return_counts=True)
+    # Weight per domain: the most common declared weight, so one bad record cannot hide
+    weights = np.zeros(len(domains))
+    for i in range(len(domains)):
+        values, value_counts = np.unique(c.weights[inverse == i], return_counts=True)
+        weights[i] = values[np.argmax(value_counts)]
+    inconsistent = c.weights != weights[inverse]
+    shares = counts / max(c.count, 1) * 100
+    expected = weights / max(weights.sum(), 1) * 100
+    deviation = shares - expected
+    failing = np.abs(deviation) > tolerance
+    return {
+        'rule': 'domain-distribution',
+        'severity': 'warning',
+        'description': f'Domain shares within {tolerance:g} points of the exam weights',
+        'failures': int(failing.sum()) + int(inconsistent.any()),
+        'inconsistentWeightIds': c.ids[inconsistent].tolist(),
+        'domains': [
+            {'domain': int(d), 'count': int(n), 'share': round(float(s), 2), 'weight': float(w),
+             'expectedShare': round(float(e), 2), 'deviation': round(float(dev), 2), 'ok': not bool(f)}
+            for d, n, s, w, e, dev, f in zip(domains, counts, shares, weights, expected, deviation, failing)
+        ]
+    }
+
+
+def validate_questions(questions: List[Dict], tolerance: float = DEFAULT_WEIGHT_TOLERANCE,
+                       max_ids: int = 50) -> Dict:
+    """Run every rule over the bank and return a JSON-serialisable report"""
+    columns = Columns(questions)
+    results = []
+    for rule in RULES:
+        mask = rule.check(columns) if columns.count else np.zeros(0, dtype=bool)
+        failing_ids = columns.ids[mask]
+        results.append({
+            'rule': rule.name,
+            'severity': rule.severity,
+            'description': rule.description,
+            'failures': int(mask.sum()),
+            'ids': failing_ids[:max_ids].tolist()
+        })
+    results.append(hyphen_breaks(columns, max_ids))
+    results.append(domain_distribution(columns, tolerance))
+
+    errors = sum(r['failures'] for r in results if r['severity'] == 'error')
+    warnings = sum(r['failures'] for r in results if r['severity'] == 'warning')
+    return {
+        'questions': columns.count,
+        'errors': errors,
+        'warnings': warnings,
+        'passed': errors == 0,
+        'rules': results
+    }
+
+
+SEVERITY_MARKS = {'error': '❌', 'warning': '⚠️ '}
+
+
+def print_report(report: Dict):
+    print("\n" + "="*60)
+    print("VALIDATING QUESTION BANK")
+    print("="*60)
+    for result in report['rules']:
+        mark = '✅' if not result['failures'] else SEVERITY_MARKS[result['severity']]
+        print(f"{mark} {result['description']}: {result['failures']} failing")
+        if result.get('ids'):
+            shown = result['ids'][:10]
+            more = ', ...' if result['failures'] > len(shown) else ''
+            print(f"     ids: {', '.join(map(str, shown))}{more}")
+        if result.get('breaks'):
+            kinds = ', '.join(f"{n} {kind}" for kind, n in result['kinds'].items() if n)
+            examples = ', '.join(f"\"{b['text']}\" ({b['kind']})" for b in result['breaks'][:5])
+            print(f"     {kinds}: {examples}")
+        for domain in result.get('domains', []):
+            mark = '  ' if domain['ok'] else '⚠️'
+            print(f"   {mark} Domain {domain['domain']}: {domain['count']} questions, {domain['share']:.1f}% "
+                  f"(weight {domain['expectedShare']:.1f}%)")
+    print(f"\n{report['questions']} questions, {report['errors']} errors, {report['warnings']} warnings")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Vectorized data-quality checks for the question bank')
+    parser.add_argument('questions', nargs='?', default='src/data/questions.json')
+    parser.add_argument('--report', help='Also write the JSON report to this file')
+    parser.add_argument('--json', action='store_true', help='Print the JSON report instead of a summary')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_WEIGHT_TOLERANCE,
+                        help='Allowed domain share deviation from the exam weights, in percentage points')
+    parser.add_argument('--strict', action='store_true', help='Fail on warnings as well as errors')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = validate_questions(load_questions(args.questions), args.tolerance)
+    report['seconds'] = round(time.perf_counter() - start, 3)
+
+    if args.report:
+        if os.path.dirname(args.report):
+            os.makedirs(os.path.dirname(args.report), exist_ok=True)
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    failed = not report['passed'] or (args.strict and report['warnings'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
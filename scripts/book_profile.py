@@ -0,0 +1,92 @@
+import copy
+import json
+import os
+import re
+from typing import Dict, Optional
+
+# The Security+ SY0-701 practice test book (david.pdf) the extractors were written for
+DEFAULT_PROFILE = {
+    'name': 'CompTIA Security+ SY0-701 Practice Tests',
+    'exam': 'SY0-701',
+    'questionPages': [23, 235],
+    'answerFirstPage': 238,
+    # Whether running headers name exam objectives ("Domain 2.3: ..."). This book's only
+    # headers are chapter headings for whole domains ("Domain 3.0"), so it has none.
+    'objectiveHeaders': False,
+    'domains': {
+        '1': {'name': 'General Security Concepts', 'weight': 12, 'lastPage': 48},
+        '2': {'name': 'Threats, Vulnerabilities, and Mitigations', 'weight': 22, 'lastPage': 87},
+        '3': {'name': 'Security Architecture', 'weight': 18, 'lastPage': 133},
+        '4': {'name': 'Security Operations', 'weight': 28, 'lastPage': 187},
+        '5': {'name': 'Security Program Management and Oversight', 'weight': 20, 'lastPage': None}
+    }
+}
+
+# Running headers such as "Chapter 2 ■ Domain 2.3: ..." or a bare "Domain 2.3: ..." line
+OBJECTIVE_HEADER = re.compile(r'^(?:Chapter\s+\d+\s*[:■]?\s*)?Domain\s+(\d+\.\d+)\b')
+
+
+def parse_objective_header(line: str) -> Optional[str]:
+    """Exam objective ("2.3") named by a running header line, if it is one
+
+    "Domain 2.0" is a chapter heading naming the whole domain, not an objective.
+    """
+    match = OBJECTIVE_HEADER.match(line)
+    return match.group(1) if match and not match.group(1).endswith('.0') else None
+
+
+class BookProfile:
+    """Page ranges and the domain table of one book
+
+    A profile file is a JSON object with any of the DEFAULT_PROFILE keys plus
+    an optional 'id' (used to namespace question ids) and 'idBase'. Missing
+    keys fall back to the defaults; 'domains' is replaced as a whole.
+    """
+
+    def __init__(self, data: Optional[Dict] = None, book_id: str = 'default'):
+        merged = copy.deepcopy(DEFAULT_PROFILE)
+        merged.update(data or {})
+        self.data = merged
+        self.id = merged.get('id', book_id)
+        self.name = merged['name']
+        self.exam = merged.get('exam', '')
+        self.id_base = merged.get('idBase')
+        self.first_question_page, self.last_question_page = merged['questionPages']
+        self.answer_first_page = merged['answerFirstPage']
+        self.objective_headers = bool(merged.get('objectiveHeaders'))
+        self.domains = {int(number): info for number, info in merged['domains'].items()}
+        # Chapters in page order; a None lastPage means "to the end of the question pages"
+        self._page_bounds = sorted(
+            (info.get('lastPage') or self.last_question_page, number) for number, info in self.domains.items()
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'BookProfile':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data, book_id=os.path.splitext(os.path.basename(path))[0])
+
+    def domain(self, number: int) -> Dict:
+        info = self.domains[number]
+        return {'number': number, 'name': info['name'], 'weight': info['weight']}
+
+    def domain_for_page(self, page_num: int) -> Dict:
+        """Domain of the chapter a question page belongs to"""
+        for last_page, number in self._page_bounds:
+            if page_num <= last_page:
+                return self.domain(number)
+        return self.domain(self._page_bounds[-1][1])
+
+    def question_pages(self) -> range:
+        return range(self.first_question_page, self.last_question_page + 1)
+
+    def to_dict(self) -> Dict:
+        return copy.deepcopy(self.data)
+
+
+DEFAULT = BookProfile()
+
+
+def load_profile(path: Optional[str]) -> BookProfile:
+    """Load a profile file, or the default profile when no path is given"""
+    return BookProfile.load(path) if path else DEFAULT
@@ -1,7 +1,6 @@
 import json
 import re
 from typing import Dict, List, Set
-import fitz  # PyMuPDF
 from collections import Counter
 
 def analyze_current_questions(questions_file: str):
@@ -27,6 +26,17 @@ def analyze_current_questions(questions_file: str):
     else:
         print("✅ No duplicate IDs found")
     
+    # Check for the same question extracted twice under different IDs
+    from dedup_questions import find_near_duplicate_clusters
+    clusters = find_near_duplicate_clusters([('questions', q) for q in questions])
+    if clusters:
+        print(f"\n❌ NEAR-DUPLICATE QUESTIONS FOUND: {len(clusters)} clusters")
+        for cluster in clusters[:10]:
+            member_ids = ', '.join(str(m['id']) for m in cluster['members'])
+            print(f"  IDs {member_ids}: similarity {cluster['minSimilarity']:.2f}")
+    else:
+        print("✅ No near-duplicate questions found")
+    
     # Check for empty answers
     empty_answers = sum(1 for q in questions if not q.get('correctAnswer', '').strip())
     print(f"\nQuestions with empty answers: {empty_answers}")
@@ -47,8 +57,13 @@ def analyze_current_questions(questions_file: str):
     
     return questions, duplicates, empty_answers, empty_explanations
 
-def extract_questions_properly(pdf_path: str) -> List[Dict]:
+def extract_questions_properly(pdf_path: str, profile=None) -> List[Dict]:
     """Extract questions with proper unique IDs"""
+    import fitz  # PyMuPDF
+    from book_profile import DEFAULT, OBJECTIVE_HEADER, parse_objective_header
+    
+    profile = profile or DEFAULT
+    
     print("\n" + "="*60)
     print("EXTRACTING QUESTIONS WITH PROPER IDs")
     print("="*60)
@@ -56,9 +71,10 @@ def extract_questions_properly(pdf_path: str) -> List[Dict]:
     doc = fitz.open(pdf_path)
     all_questions = []
     global_question_id = 1  # Use global counter instead of page-based IDs
+    current_objective = None  # Exam objective from the latest running header
     
-    # Question pages are 23-235
-    for page_num in range(23, 236):
+    # Question pages come from the book profile (23-235 for the default book)
+    for page_num in profile.question_pages():
         if page_num - 1 >= len(doc):
             continue
             
@@ -80,6 +96,13 @@ def extract_questions_properly(pdf_path: str) -> List[Dict]:
                 i += 1
                 continue
             
+            # Running headers name the exam objective of the questions that follow, in books
+            # whose profile has them (a "Domain N.0" chapter heading starts a domain with no objective yet)
+            if OBJECTIVE_HEADER.match(line):
+                current_objective = parse_objective_header(line) if profile.objective_headers else None
+                i += 1
+                continue
+            
             # Look for question numbers (but use global ID)
             question_match = re.match(r'^(\d+)\.\s*(.*)$', line)
             if question_match:
@@ -97,13 +120,15 @@ def extract_questions_properly(pdf_path: str) -> List[Dict]:
                     'id': global_question_id,  # Use global ID
                     'originalId': original_id,  # Keep original for answer matching
                     'pageNumber': page_num,
-                    'domain': determine_domain_by_page(page_num),
+                    'domain': profile.domain_for_page(page_num),
                     'questionText': '',
                     'options': [],
                     'correctAnswer': '',
                     'explanation': '',
                     'questionType': 'multiple-choice'
                 }
+                if current_objective:
+                    current_question['objective'] = current_objective
                 
                 question_text_lines = [question_start] if question_start else []
                 current_options = []
@@ -134,6 +159,8 @@ def extract_questions_properly(pdf_path: str) -> List[Dict]:
                         # Stop if we hit chapter headers or page numbers
                         if re.match(r'^Chapter\s+\d+', next_line) or re.match(r'^\d+\s*$', next_line):
                             break
+                        if OBJECTIVE_HEADER.match(next_line):
+                            break
                         option_text += ' ' + next_line
                         j += 1
                     
@@ -165,34 +192,13 @@ def extract_questions_properly(pdf_path: str) -> List[Dict]:
 
 def determine_domain_by_page(page_num: int) -> Dict:
     """Determine domain based on page number"""
-    domain_info = {
-        1: {'name': 'General Security Concepts', 'weight': 12},
-        2: {'name': 'Threats, Vulnerabilities, and Mitigations', 'weight': 22},
-        3: {'name': 'Security Architecture', 'weight': 18},
-        4: {'name': 'Security Operations', 'weight': 28},
-        5: {'name': 'Security Program Management and Oversight', 'weight': 20}
-    }
-    
-    # Based on the book structure and page ranges
-    if page_num <= 48:  # Chapter 1 ends around page 48
-        domain_num = 1
-    elif page_num <= 87:  # Chapter 2 ends around page 87
-        domain_num = 2
-    elif page_num <= 133:  # Chapter 3 ends around page 133
-        domain_num = 3
-    elif page_num <= 187:  # Chapter 4 ends around page 187
-        domain_num = 4
-    else:  # Chapter 5
-        domain_num = 5
-    
-    return {
-        'number': domain_num,
-        'name': domain_info[domain_num]['name'],
-        'weight': domain_info[domain_num]['weight']
-    }
+    from book_profile import DEFAULT
+    return DEFAULT.domain_for_page(page_num)
 
 def extract_answers_by_original_id(pdf_path: str) -> Dict[int, Dict[str, str]]:
     """Extract answers using original question IDs from the book"""
+    import fitz  # PyMuPDF
+    
     print("\n" + "="*60)
     print("EXTRACTING ANSWERS BY ORIGINAL ID")
     print("="*60)
@@ -363,14 +369,19 @@ def main():
         # Step 5: Test final data
         complete_count = test_final_data(questions)
         
-        if complete_count > 800:  # Expect at least 800 complete questions
-            # Step 6: Save the corrected data
+        # Step 6: Gate on the declarative rule set rather than a fixed count
+        from bank_validator import validate_questions, print_report
+        report = validate_questions(questions)
+        print_report(report)
+        
+        if report['passed']:
+            # Step 7: Save the corrected data
             with open(questions_file, 'w', encoding='utf-8') as f:
                 json.dump(questions, f, indent=2, ensure_ascii=False)
             
             print(f"\n🎉 SUCCESS! Saved {len(questions)} questions with {complete_count} complete entries")
         else:
-            print(f"\n❌ QUALITY CHECK FAILED - Only {complete_count} complete questions")
+            print(f"\n❌ QUALITY CHECK FAILED - {report['errors']} validation errors")
     else:
         print("\n✅ Current data looks good!")
 
@@ -0,0 +1,171 @@
+import argparse
+import json
+import re
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from bank_io import load_questions
+from text_utils import normalize_text
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+def question_fingerprint_text(question: Dict, include_options: bool = True) -> str:
+    """Text used to compare questions, insensitive to whitespace and hyphen breaks"""
+    parts = [question.get('questionText', '')]
+    if include_options:
+        parts.extend(option.get('text', '') for option in question.get('options', []))
+    return re.sub(r'[^a-z0-9]', '', normalize_text(' '.join(parts)))
+
+
+def shingle_hashes(text: str, size: int = 5) -> np.ndarray:
+    """Unique 32-bit hashes of the character shingles in text"""
+    if len(text) < size:
+        shingles = [text] if text else []
+    else:
+        shingles = [text[i:i + size] for i in range(len(text) - size + 1)]
+    hashes = [zlib.crc32(s.encode('utf-8')) for s in shingles]
+    return np.unique(np.asarray(hashes, dtype=np.uint64))
+
+
+class MinHashLSH:
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be divisible by bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Shingle hashes are 32-bit, so with a and b below 2^32 too, a*x + b < 2^64 never
+        # wraps in uint64 and the mod-p permutations are exactly (a*x + b) mod p
+        self.a = rng.integers(1, int(MAX_HASH) + 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(MAX_HASH) + 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """MinHash signature of a shingle hash set"""
+        if hashes.size == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1)
+
+    def candidate_pairs(self, signatures: np.ndarray) -> set:
+        """Pairs of rows that collide in at least one LSH band"""
+        pairs = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = defaultdict(list)
+            band_slice = signatures[:, band * self.rows:(band + 1) * self.rows]
+            for row, key in enumerate(band_slice):
+                buckets[key.tobytes()].append(row)
+            for members in buckets.values():
+                for i in range(len(members)):
+                    for j in range(i + 1, len(members)):
+                        pairs.add((members[i], members[j]))
+        return pairs
+
+
+def jaccard(first: np.ndarray, second: np.ndarray) -> float:
+    """Exact Jaccard similarity of two sorted unique hash arrays"""
+    if first.size == 0 and second.size == 0:
+        return 1.0
+    intersection = np.intersect1d(first, second, assume_unique=True).size
+    return intersection / (first.size + second.size - intersection)
+
+
+def find_near_duplicate_clusters(records: List[Tuple[str, Dict]], threshold: float = 0.8,
+                                 include_options: bool = True, cross_only: bool = False,
+                                 lsh: MinHashLSH = None) -> List[Dict]:
+    """Cluster near-duplicate questions; records are (source name, question) pairs"""
+    lsh = lsh or MinHashLSH()
+    shingles = [shingle_hashes(question_fingerprint_text(q, include_options)) for _, q in records]
+    signatures = np.vstack([lsh.signature(h) for h in shingles]) if shingles else np.empty((0, lsh.num_perm))
+
+    parent = list(range(len(records)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    similarities = {}
+    for i, j in lsh.candidate_pairs(signatures):
+        if cross_only and records[i][0] == records[j][0]:
+            continue
+        score = jaccard(shingles[i], shingles[j])
+        if score >= threshold:
+            similarities[(i, j)] = score
+            parent[find(i)] = find(j)
+
+    groups: Dict[int, set] = defaultdict(set)
+    cluster_scores: Dict[int, List[float]] = defaultdict(list)
+    for (i, j), score in similarities.items():
+        root = find(i)
+        groups[root].update((i, j))
+        cluster_scores[root].append(score)
+
+    clusters = []
+    for root, members in groups.items():
+        scores = cluster_scores[root]
+        clusters.append({
+            'size': len(members),
+            'minSimilarity': round(min(scores), 4),
+            'members': [
+                {
+                    'source': records[row][0],
+                    'id': records[row][1].get('id'),
+                    'originalId': records[row][1].get('originalId'),
+                    'questionText': records[row][1].get('questionText', '')
+                }
+                for row in sorted(members)
+            ]
+        })
+    clusters.sort(key=lambda c: (-c['size'], c['minSimilarity']))
+    return clusters
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find near-duplicate questions with MinHash and LSH')
+    parser.add_argument('files', nargs='*', default=['src/data/questions.json'],
+                        help='Question bank files (JSON or JSONL) to compare')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Minimum Jaccard similarity to report')
+    parser.add_argument('--stem-only', action='store_true', help='Compare question stems without options')
+    parser.add_argument('--cross-only', action='store_true', help='Only pair questions from different files')
+    parser.add_argument('--num-perm', type=int, default=128)
+    parser.add_argument('--bands', type=int, default=32)
+    parser.add_argument('--json', action='store_true', help='Print clusters as JSON')
+    args = parser.parse_args(argv)
+
+    records = []
+    for path in args.files:
+        # Keyed by the path as given: banks in different directories often share a file name
+        records.extend((path, q) for q in load_questions(path))
+
+    start = time.perf_counter()
+    clusters = find_near_duplicate_clusters(
+        records,
+        threshold=args.threshold,
+        include_options=not args.stem_only,
+        cross_only=args.cross_only,
+        lsh=MinHashLSH(args.num_perm, args.bands)
+    )
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(clusters, indent=2, ensure_ascii=False))
+        return
+
+    print(f"Compared {len(records)} questions from {len(args.files)} file(s) in {elapsed:.2f}s")
+    print(f"Near-duplicate clusters: {len(clusters)}")
+    for cluster in clusters[:50]:
+        print(f"\n  {cluster['size']} questions (min similarity {cluster['minSimilarity']:.2f}):")
+        for member in cluster['members']:
+            print(f"    {member['source']} id={member['id']}: {member['questionText'][:80]}...")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from bank_io import load_questions
+
+DEFAULT_FORM_SIZE = 90
+# Default cap on questions any two forms may share, as a fraction of the form size
+DEFAULT_MAX_OVERLAP = 0.3
+# Forms sampled per round; also bounds the size of each overlap matrix block
+BATCH_SIZE = 4096
+MAX_ROUNDS = 100
+
+
+def apportion(count: int, weights: Dict[int, float], capacity: Optional[Dict[int, int]] = None) -> Dict[int, int]:
+    """Split count across domains by weight with the largest-remainder method
+
+    Seats a domain cannot fill (capacity) go to the domains that still have
+    room, so the total is min(count, total capacity).
+    """
+    total = sum(weights.values())
+    quotas = {d: count * w / total for d, w in weights.items()}
+    limits = {d: min(count, (capacity or {}).get(d, count)) for d in weights}
+    allocation = {d: min(int(q), limits[d]) for d, q in quotas.items()}
+    target = min(count, sum(limits.values()))
+    order = sorted(quotas, key=lambda d: (quotas[d] - int(quotas[d]), weights[d]), reverse=True)
+    while sum(allocation.values()) < target:
+        for d in order:
+            if sum(allocation.values()) >= target:
+                break
+            if allocation[d] < limits[d]:
+                allocation[d] += 1
+    return allocation
+
+
+def domain_pools(questions: List[Dict], domains: Optional[List[int]] = None):
+    """Question ids per domain and each domain's exam weight"""
+    pools = defaultdict(list)
+    weights = {}
+    for question in questions:
+        number = question['domain']['number']
+        if domains and number not in domains:
+            continue
+        pools[number].append(question['id'])
+        weights[number] = question['domain'].get('weight', 0) or 1
+    return {d: np.array(sorted(ids), dtype=np.int64) for d, ids in sorted(pools.items())}, weights
+
+
+def sample_forms(pools: Dict[int, np.ndarray], quotas: Dict[int, int], count: int,
+                 rng: np.random.Generator) -> np.ndarray:
+    """Draw count forms at once: each row holds quotas[d] distinct ids from every domain"""
+    parts = []
+    for d, pool in pools.items():
+        k = quotas[d]
+        if k == 0:
+            continue
+        # The k smallest of a row of uniform keys is a uniform k-subset of the pool
+        keys = rng.random((count, len(pool)))
+        picks = np.argpartition(keys, k - 1, axis=1)[:, :k] if k < len(pool) else np.argsort(keys, axis=1)
+        parts.append(pool[picks])
+    return rng.permuted(np.concatenate(parts, axis=1), axis=1)
+
+
+def incidence(forms: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    """Forms x questions 0/1 matrix, so overlaps are a single matrix product"""
+    matrix = np.zeros((len(forms), len(columns)), dtype=np.float32)
+    matrix[np.arange(len(forms))[:, None], np.searchsorted(columns, forms)] = 1
+    return matrix
+
+
+def generate_forms(pools: Dict[int, np.ndarray], quotas: Dict[int, int], count: int, seed: int,
+                   max_overlap: Optional[int] = None, batch_size: int = BATCH_SIZE) -> np.ndarray:
+    """Generate count forms, rejecting any that share more than max_overlap questions with an earlier form"""
+    rng = np.random.default_rng(seed)
+    if max_overlap is None:
+        return sample_forms(pools, quotas, count, rng)
+
+    columns = np.sort(np.concatenate(list(pools.values())))
+    size = sum(quotas.values())
+    accepted = np.zeros((count, size), dtype=np.int64)
+    accepted_matrix = np.zeros((count, len(columns)), dtype=np.float32)
+    total = 0
+    for _ in range(MAX_ROUNDS):
+        if total >= count:
+            break
+        need = count - total
+        # Early rounds size the batch to what is needed; later rounds oversample for rejections
+        candidates = sample_forms(pools, quotas, min(batch_size, max(int(need * 1.1) + 8, 256)), rng)
+        matrix = incidence(candidates, columns)
+
+        keep = np.ones(len(candidates), dtype=bool)
+        for start in range(0, total, batch_size):
+            keep &= (matrix @ accepted_matrix[start:min(start + batch_size, total)].T).max(axis=1) <= max_overlap
+        # Within the batch, keep forms greedily in order
+        conflicts = (matrix @ matrix.T) > max_overlap
+        for i in np.flatnonzero(keep):
+            if keep[i]:
+                keep[i + 1:] &= ~conflicts[i, i + 1:]
+
+        chosen = np.flatnonzero(keep)[:need]
+        accepted[total:total + len(chosen)] = candidates[chosen]
+        accepted_matrix[total:total + len(chosen)] = matrix[chosen]
+        total += len(chosen)
+        if len(chosen) < need and len(chosen) < len(candidates) // 100:
+            break  # Under 1% of fresh candidates fit; more rounds will not finish the set
+
+    if total < count:
+        raise ValueError(f"Only {total} of {count} forms satisfy max overlap {max_overlap}; "
+                         f"raise --max-overlap or use a larger bank")
+    return accepted
+
+
+def overlap_stats(forms: np.ndarray, columns: np.ndarray, block: int = BATCH_SIZE) -> Dict:
+    """Largest and mean pairwise overlap, computed blockwise"""
+    matrix = incidence(forms, columns)
+    largest, total, pairs = 0, 0.0, 0
+    for start in range(0, len(forms), block):
+        product = matrix[start:start + block] @ matrix.T
+        rows = np.arange(product.shape[0])[:, None] + start
+        upper = np.arange(len(forms))[None, :] > rows
+        values = product[upper]
+        if values.size:
+            largest = max(largest, int(values.max()))
+            total += float(values.sum())
+            pairs += values.size
+    return {'maxOverlap': largest, 'meanOverlap': round(total / pairs, 2) if pairs else 0.0}
+
+
+def write_forms(path: str, forms: np.ndarray, seed: int, by_id: Optional[Dict[int, Dict]] = None):
+    """One JSON object per line; embeds full questions when by_id is given"""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for number, row in enumerate(forms.tolist(), 1):
+            form = {'form': number, 'seed': seed, 'questionIds': row}
+            if by_id is not None:
+                form['questions'] = [by_id[qid] for qid in row]
+            f.write(json.dumps(form, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Generate exam forms stratified by domain weight')
+    parser.add_argument('--questions', default='src/data/questions.json')
+    parser.add_argument('-n', '--forms', type=int, default=1000)
+    parser.add_argument('--size', type=int, default=DEFAULT_FORM_SIZE, help='Questions per form')
+    parser.add_argument('--domains', help='Comma-separated domains to draw from (default: all)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-overlap', type=float, default=DEFAULT_MAX_OVERLAP,
+                        help='Most questions two forms may share: a count, or a fraction of --size if below 1 '
+                             '(0 disables the check)')
+    parser.add_argument('--embed', action='store_true', help='Include full question objects (printable forms)')
+    parser.add_argument('--output', default='artifacts/exam_forms.jsonl')
+    args = parser.parse_args(argv)
+    if args.forms < 1 or args.size < 1:
+        parser.error('--forms and --size must be positive')
+
+    questions = load_questions(args.questions)
+    domains = [int(d) for d in args.domains.split(',')] if args.domains else None
+    pools, weights = domain_pools(questions, domains)
+    capacity = {d: len(pool) for d, pool in pools.items()}
+    quotas = apportion(args.size, weights, capacity)
+    if sum(quotas.values()) < args.size:
+        print(f"❌ The bank only has {sum(capacity.values())} questions in the selected domains")
+        return 1
+    max_overlap = args.max_overlap * args.size if 0 < args.max_overlap < 1 else args.max_overlap
+    max_overlap = int(max_overlap) if max_overlap else None
+
+    start = time.perf_counter()
+    try:
+        forms = generate_forms(pools, quotas, args.forms, args.seed, max_overlap)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    generated = time.perf_counter() - start
+
+    by_id = {q['id']: q for q in questions} if args.embed else None
+    write_forms(args.output, forms, args.seed, by_id)
+    stats = overlap_stats(forms, np.sort(np.concatenate(list(pools.values()))))
+
+    print(f"Generated {len(forms)} forms of {args.size} questions in {generated:.2f}s")
+    print(f"  per domain: {', '.join(f'{d}: {k}' for d, k in quotas.items())}")
+    print(f"  overlap between forms: max {stats['maxOverlap']}, mean {stats['meanOverlap']}"
+          + (f" (limit {max_overlap})" if max_overlap else ''))
+    print(f"Forms saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Set, Tuple
+
+from text_utils import tokenize
+
+# Candidates scored per question after blocking on shared option tokens
+MAX_CANDIDATES = 25
+DEFAULT_MIN_CONFIDENCE = 0.6
+
+
+def option_token_sets(question: Dict) -> Dict[str, Set[str]]:
+    """Token set of each option, keyed by option letter"""
+    return {o.get('letter', ''): set(tokenize(o.get('text', ''))) for o in question.get('options', [])}
+
+
+def match_confidence(question: Dict, options: Dict[str, Set[str]], explanation: Dict,
+                     explanation_tokens: Set[str]) -> float:
+    """Score how likely an appendix explanation belongs to a question (0-1)"""
+    coverages = [len(tokens & explanation_tokens) / len(tokens) for tokens in options.values() if tokens]
+    if not coverages:
+        return 0.0
+    option_score = sum(coverages) / len(coverages)
+
+    answer_tokens = options.get(explanation.get('answer'), set())
+    answer_score = len(answer_tokens & explanation_tokens) / len(answer_tokens) if answer_tokens else 0.0
+
+    qnum = question.get('originalId') or question.get('id')
+    number_score = 1.0 if qnum is not None and int(qnum) == int(explanation.get('number') or -1) else 0.0
+
+    return min(1.0, 0.55 * option_score + 0.15 * answer_score + 0.3 * number_score)
+
+
+def match_unmatched(questions: List[Dict], explanations: List[Dict],
+                    min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> List[Tuple[Dict, Dict, float]]:
+    """Align leftover explanations to leftover questions by option wording
+
+    Explanations are blocked through an inverted index on their tokens and by
+    question number, so each question is only scored against a handful of
+    candidates. Each explanation is assigned at most once, best matches first.
+    """
+    explanation_tokens = [set(tokenize(e.get('explanation', ''))) for e in explanations]
+    token_index: Dict[str, List[int]] = defaultdict(list)
+    number_index: Dict[int, List[int]] = defaultdict(list)
+    for idx, tokens in enumerate(explanation_tokens):
+        for token in tokens:
+            token_index[token].append(idx)
+        number_index[int(explanations[idx].get('number') or -1)].append(idx)
+
+    scored = []
+    for q_idx, question in enumerate(questions):
+        options = option_token_sets(question)
+        shared = Counter()
+        all_option_tokens = set().union(*options.values()) if options else set()
+        for token in all_option_tokens:
+            postings = token_index.get(token, [])
+            # Tokens that appear in most explanations do not help blocking
+            if len(postings) <= max(10, len(explanations) // 10):
+                shared.update(postings)
+        candidates = {idx for idx, _ in shared.most_common(MAX_CANDIDATES)}
+        qnum = question.get('originalId') or question.get('id')
+        if qnum is not None:
+            candidates.update(number_index.get(int(qnum), []))
+
+        for e_idx in candidates:
+            confidence = match_confidence(question, options, explanations[e_idx], explanation_tokens[e_idx])
+            if confidence >= min_confidence:
+                scored.append((confidence, q_idx, e_idx))
+
+    matches = []
+    used_questions = set()
+    used_explanations = set()
+    for confidence, q_idx, e_idx in sorted(scored, key=lambda s: -s[0]):
+        if q_idx in used_questions or e_idx in used_explanations:
+            continue
+        used_questions.add(q_idx)
+        used_explanations.add(e_idx)
+        matches.append((questions[q_idx], explanations[e_idx], confidence))
+    return matches
@@ -3,10 +3,14 @@ import re
 from typing import List, Dict, Any
 import PyPDF2
 
-def extract_questions_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
+from book_profile import DEFAULT, OBJECTIVE_HEADER, parse_objective_header
+
+def extract_questions_from_pdf(pdf_path: str, profile=None) -> List[Dict[str, Any]]:
+    profile = profile or DEFAULT
     questions = []
     current_question = None
     current_options = []
+    current_objective = None  # Exam objective from the latest running header
     
     with open(pdf_path, 'rb') as file:
         reader = PyPDF2.PdfReader(file)
@@ -17,6 +21,12 @@ def extract_questions_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
             lines = text.split('\n')
             
             for line in lines:
+                # Running headers name the exam objective of the questions that follow, in books
+                # whose profile has them (a "Domain N.0" chapter heading starts a domain with no objective yet)
+                if OBJECTIVE_HEADER.match(line.strip()):
+                    current_objective = parse_objective_header(line.strip()) if profile.objective_headers else None
+                    continue
+                
                 # Check for question number pattern (e.g., "1. ")
                 question_match = re.match(r'^(\d+)\.\s+(.+)$', line)
                 if question_match:
@@ -47,6 +57,8 @@ def extract_questions_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
                         'explanation': '',    # Will be filled from answers section
                         'questionType': 'multiple-choice'
                     }
+                    if current_objective:
+                        current_question['objective'] = current_objective
                     current_options = []
                 
                 # Check for option pattern (e.g., "A. ")
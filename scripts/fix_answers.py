@@ -1,10 +1,12 @@
+import argparse
 import json
 import re
 from typing import Dict
-import fitz  # PyMuPDF
 
 def extract_answers_properly(pdf_path: str) -> Dict[int, Dict[str, str]]:
     """Extract answers and explanations with proper parsing"""
+    import fitz  # PyMuPDF
+
     doc = fitz.open(pdf_path)
     answers = {}
     
@@ -76,6 +78,19 @@ def extract_answers_properly(pdf_path: str) -> Dict[int, Dict[str, str]]:
 def update_questions_with_answers(questions_file: str, answers: Dict[int, Dict[str, str]]):
     """Update the questions.json file with proper answers and explanations"""
     
+    # A SQLite store is updated field by field instead of rewriting the whole bank
+    if questions_file.endswith('.db'):
+        from question_store import QuestionStore
+        store = QuestionStore(questions_file)
+        known_ids = store.ids() & answers.keys()
+        store.update_fields(
+            (q_id, field, answers[q_id][field]) for q_id in known_ids for field in ('correctAnswer', 'explanation')
+        )
+        store.close()
+        updated_count = len(known_ids)
+        print(f"Updated {updated_count} questions with answers and explanations")
+        return updated_count
+
     # Load existing questions
     with open(questions_file, 'r', encoding='utf-8') as f:
         questions = json.load(f)
@@ -96,12 +111,16 @@ def update_questions_with_answers(questions_file: str, answers: Dict[int, Dict[s
     print(f"Updated {updated_count} questions with answers and explanations")
     return updated_count
 
-def main():
-    pdf_path = 'david.pdf'
-    questions_file = 'src/data/questions.json'
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fill in answers and explanations from the PDF appendix')
+    parser.add_argument('--pdf', default='david.pdf')
+    parser.add_argument('--questions', default='src/data/questions.json',
+                        help='Question bank to update: questions.json or a SQLite store (.db)')
+    args = parser.parse_args(argv)
+    questions_file = args.questions
     
     print("Extracting answers from PDF...")
-    answers = extract_answers_properly(pdf_path)
+    answers = extract_answers_properly(args.pdf)
     print(f"Found {len(answers)} answers")
     
     print("Updating questions with answers...")
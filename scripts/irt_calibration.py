@@ -0,0 +1,225 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from attempt_store import load_attempts
+
+# Ability is integrated over a fixed N(0, 1) grid (marginal maximum likelihood)
+QUADRATURE_POINTS = 31
+QUADRATURE_RANGE = 4.0
+# Weak priors keep items with few responses finite: a ~ N(1, 1), b ~ N(0, 2)
+PRIOR_A = (1.0, 1.0)
+PRIOR_B = (0.0, 2.0)
+# Discrimination is left free to go negative, which is how a mis-keyed question shows up
+A_RANGE = (-4.0, 6.0)
+B_RANGE = (-6.0, 6.0)
+MAX_ITERATIONS = 500
+TOLERANCE = 1e-3
+
+
+def response_matrices(log: Dict[str, np.ndarray]) -> Tuple[np.ndarray, sparse.csr_matrix, sparse.csr_matrix]:
+    """Question ids plus learner x question matrices of right and wrong first attempts
+
+    Only each learner's first attempt at a question counts; repeats have
+    seen the feedback and would break local independence.
+    """
+    ids, item = np.unique(log['questionId'], return_inverse=True)
+    learner = log['learner'].astype(np.int64)
+    order = np.lexsort((log['timestamp'], item, learner))
+    key = learner[order] * len(ids) + item[order]
+    first = order[np.r_[True, key[1:] != key[:-1]]]
+    shape = (int(learner.max()) + 1, len(ids))
+    correct = log['isCorrect'][first]
+    right = sparse.csr_matrix((np.ones(correct.sum()), (learner[first][correct], item[first][correct])), shape=shape)
+    wrong = sparse.csr_matrix((np.ones((~correct).sum()), (learner[first][~correct], item[first][~correct])),
+                              shape=shape)
+    return ids, right, wrong
+
+
+def quadrature() -> Tuple[np.ndarray, np.ndarray]:
+    nodes = np.linspace(-QUADRATURE_RANGE, QUADRATURE_RANGE, QUADRATURE_POINTS)
+    weights = np.exp(-nodes ** 2 / 2)
+    return nodes, weights / weights.sum()
+
+
+def posterior(right: sparse.csr_matrix, wrong: sparse.csr_matrix, a: np.ndarray, b: np.ndarray,
+              nodes: np.ndarray, log_weights: np.ndarray) -> Tuple[np.ndarray, float]:
+    """E-step: each learner's posterior over the ability nodes, and the marginal log-likelihood"""
+    z = a[:, None] * (nodes[None, :] - b[:, None])
+    # Sparse x dense products sum log P over just the questions each learner answered
+    loglik = right @ -np.logaddexp(0, -z) + wrong @ -np.logaddexp(0, z) + log_weights
+    peak = loglik.max(axis=1, keepdims=True)
+    post = np.exp(loglik - peak)
+    total = post.sum(axis=1, keepdims=True)
+    return post / total, float((peak + np.log(total)).sum())
+
+
+def item_step(expected_right: np.ndarray, expected_seen: np.ndarray, a: np.ndarray, b: np.ndarray,
+              nodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """M-step: one Fisher-scoring update of every item's (a, b) at once
+
+    Returns the step and the 2x2 information matrices (prior included) as
+    (I_aa, I_ab, I_bb) rows, which also give the standard errors.
+    """
+    d = nodes[None, :] - b[:, None]
+    p = 1 / (1 + np.exp(-a[:, None] * d))
+    residual = expected_right - expected_seen * p
+    w = expected_seen * p * (1 - p)
+    grad_a = (residual * d).sum(axis=1) - (a - PRIOR_A[0]) / PRIOR_A[1] ** 2
+    grad_b = -a * residual.sum(axis=1) - (b - PRIOR_B[0]) / PRIOR_B[1] ** 2
+    info_aa = (w * d * d).sum(axis=1) + 1 / PRIOR_A[1] ** 2
+    info_bb = a * a * w.sum(axis=1) + 1 / PRIOR_B[1] ** 2
+    info_ab = -a * (w * d).sum(axis=1)
+    det = info_aa * info_bb - info_ab ** 2
+    step_a = (info_bb * grad_a - info_ab * grad_b) / det
+    step_b = (info_aa * grad_b - info_ab * grad_a) / det
+    return np.clip(step_a, -1, 1), np.clip(step_b, -1, 1), np.stack([info_aa, info_ab, info_bb])
+
+
+def calibrate(right: sparse.csr_matrix, wrong: sparse.csr_matrix, a: Optional[np.ndarray] = None,
+              b: Optional[np.ndarray] = None, max_iterations: int = MAX_ITERATIONS,
+              tolerance: float = TOLERANCE) -> Dict:
+    """Fit 2PL item parameters by EM; a and b are optional warm-start values"""
+    items = right.shape[1]
+    a = np.full(items, PRIOR_A[0]) if a is None else a.astype(np.float64).copy()
+    b = np.zeros(items) if b is None else b.astype(np.float64).copy()
+    nodes, weights = quadrature()
+    log_weights = np.log(weights)
+    right_t, seen_t = right.T.tocsr(), (right + wrong).T.tocsr()
+
+    converged = False
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        post, loglik = posterior(right, wrong, a, b, nodes, log_weights)
+        expected_right, expected_seen = right_t @ post, seen_t @ post
+        step_a, step_b, _ = item_step(expected_right, expected_seen, a, b, nodes)
+        a = np.clip(a + step_a, *A_RANGE)
+        b = np.clip(b + step_b, *B_RANGE)
+        if max(np.abs(step_a).max(), np.abs(step_b).max()) < tolerance:
+            converged = True
+            break
+
+    post, loglik = posterior(right, wrong, a, b, nodes, log_weights)
+    _, _, info = item_step(right_t @ post, seen_t @ post, a, b, nodes)
+    det = info[0] * info[2] - info[1] ** 2
+    theta = post @ nodes
+    return {
+        'a': a,
+        'b': b,
+        'seA': np.sqrt(info[2] / det),
+        'seB': np.sqrt(info[0] / det),
+        'theta': theta,
+        'thetaSe': np.sqrt(np.clip(post @ nodes ** 2 - theta ** 2, 0, None)),
+        'iterations': iteration,
+        'converged': converged,
+        'logLikelihood': loglik
+    }
+
+
+def load_warm_start(path: str, ids: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], int]:
+    """Previous a and b for the given ids (defaults for new questions) and how many were found"""
+    if not path or not os.path.exists(path):
+        return None, None, 0
+    with open(path, 'r', encoding='utf-8') as f:
+        previous = json.load(f).get('items', {})
+    a = np.full(len(ids), PRIOR_A[0])
+    b = np.zeros(len(ids))
+    found = 0
+    for row, question_id in enumerate(ids.tolist()):
+        item = previous.get(str(question_id))
+        if item:
+            a[row], b[row] = item['a'], item['b']
+            found += 1
+    return a, b, found
+
+
+def export_parameters(path: str, ids: np.ndarray, fit: Dict, right: sparse.csr_matrix, wrong: sparse.csr_matrix,
+                      learners: int):
+    responses = np.asarray((right + wrong).sum(axis=0)).ravel()
+    items = {
+        str(question_id): {
+            'a': round(float(fit['a'][row]), 4),
+            'b': round(float(fit['b'][row]), 4),
+            'seA': round(float(fit['seA'][row]), 4),
+            'seB': round(float(fit['seB'][row]), 4),
+            'responses': int(responses[row])
+        }
+        for row, question_id in enumerate(ids.tolist())
+    }
+    document = {
+        'model': '2PL',
+        'calibratedAt': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'learners': learners,
+        'responses': int(responses.sum()),
+        'iterations': fit['iterations'],
+        'converged': fit['converged'],
+        'logLikelihood': round(fit['logLikelihood'], 3),
+        'items': items
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Calibrate 2PL IRT parameters from learner-data exports')
+    parser.add_argument('input', help='An export, a directory of exports (v1 or compact v2) or an attempt store')
+    parser.add_argument('--questions', default='src/data/questions.json',
+                        help='Bank the parameters are exported alongside')
+    parser.add_argument('--output', help='Parameter file (default: irt_params.json next to --questions)')
+    parser.add_argument('--warm-start', help='Previous parameter file (default: --output, if it exists)')
+    parser.add_argument('--cold', action='store_true', help='Ignore any previous calibration')
+    parser.add_argument('--abilities', help='Also write each learner\'s ability estimate to this file')
+    parser.add_argument('--max-iterations', type=int, default=MAX_ITERATIONS)
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='Largest parameter change at convergence')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes for reading exports (default: CPU count)')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero when EM has not converged')
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(os.path.dirname(args.questions), 'irt_params.json')
+    start = time.perf_counter()
+    log, names = load_attempts(args.input, args.jobs, ('questionId', 'isCorrect', 'timestamp'))
+    if not len(log['questionId']):
+        print(f"❌ No question attempts found in {args.input}")
+        return 1
+    ids, right, wrong = response_matrices(log)
+    loaded = time.perf_counter()
+
+    a0, b0, found = (None, None, 0) if args.cold else load_warm_start(args.warm_start or output, ids)
+    fit = calibrate(right, wrong, a0, b0, args.max_iterations, args.tolerance)
+    fitted = time.perf_counter()
+    learners = int(((right + wrong).getnnz(axis=1) > 0).sum())
+    export_parameters(output, ids, fit, right, wrong, learners)
+
+    print(f"Calibrated {len(ids)} questions from {right.nnz + wrong.nnz} first-attempt responses by "
+          f"{learners} learners (read {loaded - start:.2f}s, fit {fitted - loaded:.2f}s)")
+    print(f"  {'warm start from ' + str(found) + ' previous items' if found else 'cold start'}, "
+          f"{fit['iterations']} EM iterations, log-likelihood {fit['logLikelihood']:.1f}")
+    if not fit['converged']:
+        print(f"⚠️ Not converged after {fit['iterations']} iterations")
+    print(f"  a: median {np.median(fit['a']):.2f} (range {fit['a'].min():.2f} to {fit['a'].max():.2f}), "
+          f"b: median {np.median(fit['b']):.2f} (range {fit['b'].min():.2f} to {fit['b'].max():.2f})")
+    negative = ids[fit['a'] < 0].tolist()
+    if negative:
+        print(f"  ⚠️ Negative discrimination (check the answer key): {negative}")
+    print(f"Parameters saved to: {output}")
+
+    if args.abilities:
+        abilities = {
+            name: {'theta': round(float(fit['theta'][i]), 4), 'se': round(float(fit['thetaSe'][i]), 4)}
+            for i, name in enumerate(names) if i < len(fit['theta'])
+        }
+        with open(args.abilities, 'w', encoding='utf-8') as f:
+            json.dump(abilities, f, indent=2)
+        print(f"Abilities saved to: {args.abilities}")
+    return 1 if args.strict and not fit['converged'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
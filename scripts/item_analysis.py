@@ -0,0 +1,154 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from bank_io import load_questions
+from attempt_store import load_attempts
+
+# Learners need this many attempts on other questions for a meaningful rest score
+MIN_REST_ATTEMPTS = 10
+# Questions seen by fewer learners are reported but never flagged
+MIN_LEARNERS = 30
+TOO_EASY = 0.9
+TOO_HARD = 0.25  # Chance level for four options
+LOW_DISCRIMINATION = 0.15
+
+
+def item_statistics(log: Dict[str, np.ndarray], min_rest_attempts: int = MIN_REST_ATTEMPTS) -> Dict[str, np.ndarray]:
+    """Per-question difficulty, discrimination, timing and option counts in whole-array passes
+
+    Discrimination is the corrected point-biserial: across learners who saw
+    the question, the correlation between their score on it and their score
+    on every other question (the rest score).
+    """
+    ids, q = np.unique(log['questionId'], return_inverse=True)
+    count = len(ids)
+    correct = log['isCorrect'].astype(np.float64)
+    attempts = np.bincount(q, minlength=count)
+    p_value = np.bincount(q, correct, count) / attempts
+    mean_time = np.bincount(q, log['timeSpent'], count) / attempts
+
+    answers, code = np.unique(log['selectedAnswer'], return_inverse=True)
+    options = np.bincount(q * len(answers) + code, minlength=count * len(answers)).reshape(count, len(answers))
+
+    # Collapse repeat attempts into one learner x question cell
+    cells, cell = np.unique(log['learner'].astype(np.int64) * count + q, return_inverse=True)
+    cell_n = np.bincount(cell)
+    cell_correct = np.bincount(cell, correct)
+    cell_learner, cell_q = np.divmod(cells, count)
+    learner_n = np.bincount(log['learner'])
+    learner_correct = np.bincount(log['learner'], correct)
+
+    rest_n = learner_n[cell_learner] - cell_n
+    valid = rest_n >= max(min_rest_attempts, 1)
+    x = (cell_correct / cell_n)[valid]
+    y = (learner_correct[cell_learner] - cell_correct)[valid] / rest_n[valid]
+    item = cell_q[valid]
+    k = np.bincount(item, minlength=count).astype(np.float64)
+    sx, sy = np.bincount(item, x, count), np.bincount(item, y, count)
+    sxx, syy, sxy = np.bincount(item, x * x, count), np.bincount(item, y * y, count), np.bincount(item, x * y, count)
+    denominator = np.sqrt(np.clip(k * sxx - sx * sx, 0, None) * np.clip(k * syy - sy * sy, 0, None))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        discrimination = np.where(denominator > 0, (k * sxy - sx * sy) / denominator, np.nan)
+
+    return {
+        'ids': ids,
+        'attempts': attempts,
+        'learners': np.bincount(cell_q, minlength=count),
+        'pValue': p_value,
+        'discrimination': discrimination,
+        'meanTimeSpent': mean_time,
+        'answers': answers,
+        'options': options
+    }
+
+
+def flag_items(stats: Dict[str, np.ndarray], min_learners: int = MIN_LEARNERS) -> Dict[str, np.ndarray]:
+    """Boolean masks of questions worth a look"""
+    enough = stats['learners'] >= min_learners
+    discrimination = np.nan_to_num(stats['discrimination'], nan=1.0)
+    return {
+        'too-easy': enough & (stats['pValue'] > TOO_EASY),
+        'too-hard': enough & (stats['pValue'] < TOO_HARD),
+        'negative-discrimination': enough & (discrimination < 0),
+        'low-discrimination': enough & (discrimination >= 0) & (discrimination < LOW_DISCRIMINATION)
+    }
+
+
+def build_report(stats: Dict[str, np.ndarray], flags: Dict[str, np.ndarray], learners: int,
+                 bank: Optional[Dict[int, Dict]] = None) -> Dict:
+    """JSON report keyed by question id"""
+    answers = stats['answers'].tolist()
+    questions = {}
+    for row, question_id in enumerate(stats['ids'].tolist()):
+        discrimination = stats['discrimination'][row]
+        entry = {
+            'attempts': int(stats['attempts'][row]),
+            'learners': int(stats['learners'][row]),
+            'pValue': round(float(stats['pValue'][row]), 4),
+            'discrimination': None if np.isnan(discrimination) else round(float(discrimination), 4),
+            'meanTimeSpent': round(float(stats['meanTimeSpent'][row]), 2),
+            'options': {a: int(n) for a, n in zip(answers, stats['options'][row].tolist()) if n},
+            'flags': [name for name, mask in flags.items() if mask[row]]
+        }
+        if bank is not None and question_id in bank:
+            entry['domain'] = bank[question_id]['domain']['number']
+            entry['correctAnswer'] = bank[question_id]['correctAnswer']
+        questions[str(question_id)] = entry
+    return {
+        'learners': learners,
+        'attempts': int(stats['attempts'].sum()),
+        'questions': questions,
+        'flagged': {name: stats['ids'][mask].tolist() for name, mask in flags.items()},
+        'unattempted': sorted(set(bank) - set(stats['ids'].tolist())) if bank is not None else []
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Item analysis (difficulty, discrimination, option choice) '
+                                                 'over learner-data exports')
+    parser.add_argument('input', help='An export, a directory of exports (v1 or compact v2) or an attempt store')
+    parser.add_argument('--questions', default='src/data/questions.json', help='Bank for domains and answer keys')
+    parser.add_argument('--output', default='artifacts/item_analysis.json')
+    parser.add_argument('--min-learners', type=int, default=MIN_LEARNERS, help='Fewest learners before flagging')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes for reading exports (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    log, _ = load_attempts(args.input, args.jobs, ('questionId', 'selectedAnswer', 'isCorrect', 'timeSpent'))
+    loaded = time.perf_counter()
+    if not len(log['questionId']):
+        print(f"❌ No question attempts found in {args.input}")
+        return 1
+    stats = item_statistics(log)
+    flags = flag_items(stats, args.min_learners)
+    analysed = time.perf_counter()
+
+    bank = {q['id']: q for q in load_questions(args.questions)} if os.path.exists(args.questions) else None
+    learners = len(np.unique(log['learner']))
+    report = build_report(stats, flags, learners, bank)
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Analysed {report['attempts']} attempts by {learners} learners on {len(stats['ids'])} questions "
+          f"(read {loaded - start:.2f}s, analysis {analysed - loaded:.2f}s)")
+    print(f"  mean p-value {np.mean(stats['pValue']):.3f}, "
+          f"median discrimination {np.nanmedian(stats['discrimination']):.3f}")
+    for name, ids in report['flagged'].items():
+        shown = ', '.join(map(str, ids[:10])) + (' ...' if len(ids) > 10 else '')
+        print(f"  {'⚠️' if ids else '✅'} {name}: {len(ids)}" + (f" ({shown})" if ids else ''))
+    if report['unattempted']:
+        print(f"  ℹ️ {len(report['unattempted'])} bank questions have no attempts")
+    print(f"Report saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
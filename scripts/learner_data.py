@@ -0,0 +1,299 @@
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from bank_io import JsonStream, iter_questions
+from revision_store import record_hash
+
+# localStorage key the app saves PersistentData under (src/services/storageService.ts)
+STORAGE_KEY = 'comptia-security-quiz-data'
+
+EPOCH_ISO = '1970-01-01T00:00:00.000Z'
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# QuestionAttempt fields, in the order the app writes them (sessionId is optional)
+ATTEMPT_FIELDS = ('questionId', 'selectedAnswer', 'correctAnswer', 'isCorrect',
+                  'timeSpent', 'timestamp', 'testMode', 'sessionId')
+
+
+class BankIndex:
+    """What learner-data tools need from the bank: per-id domain and answer key
+
+    Small and picklable, so it is built once and handed to worker processes.
+    """
+
+    def __init__(self, domains: Dict[int, int], answers: Dict[int, str], domain_sizes: Dict[int, int]):
+        self.domains = domains
+        self.answers = answers
+        self.domain_sizes = domain_sizes
+
+    @classmethod
+    def load(cls, path: str = 'src/data/questions.json') -> 'BankIndex':
+        domains, answers, sizes = {}, {}, {}
+        for question in iter_questions(path):
+            number = question.get('domain', {}).get('number')
+            domains[question['id']] = number
+            answers[question['id']] = question.get('correctAnswer', '')
+            sizes[number] = sizes.get(number, 0) + 1
+        return cls(domains, answers, sizes)
+
+
+def parse_time(value) -> Optional[datetime]:
+    """Parse a serialised JS Date (ISO string or epoch milliseconds)"""
+    if value is None or value == '':
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (ValueError, OverflowError, OSError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def to_iso(moment: Optional[datetime]) -> Optional[str]:
+    """Format like Date.prototype.toJSON: UTC with milliseconds"""
+    if moment is None:
+        return None
+    return moment.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.') + f'{moment.microsecond // 1000:03d}Z'
+
+
+def to_millis(moment: datetime) -> int:
+    return (moment - EPOCH) // timedelta(milliseconds=1)
+
+
+def from_millis(millis: int) -> datetime:
+    # timedelta arithmetic is exact, unlike fromtimestamp(millis / 1000)
+    return EPOCH + timedelta(milliseconds=millis)
+
+
+def bank_hash(questions: List[Dict]) -> str:
+    """Content hash of a whole bank: the record hashes of its questions in id order"""
+    digest = hashlib.sha256()
+    for question in sorted(questions, key=lambda q: q['id']):
+        digest.update(f"{question['id']}:{record_hash(question)}\n".encode('ascii'))
+    return digest.hexdigest()[:32]
+
+
+def iter_export(path: str, streamed=('testSessions',),
+                wrapper: Optional[Dict] = None) -> Iterator[Tuple[str, object]]:
+    """Stream the top-level members of an exported PersistentData blob
+
+    testSessions (the bulk of a blob) is yielded as a lazy iterator of
+    sessions. Blobs saved as {STORAGE_KEY: ...} wrappers are unwrapped; pass
+    a wrapper dict to learn how ('string' for a localStorage dump, else 'object').
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        stream = JsonStream(f)
+        for key, value in stream.iter_object(streamed):
+            if key == STORAGE_KEY:
+                if wrapper is not None:
+                    wrapper['wrapped'] = 'string' if isinstance(value, str) else 'object'
+                inner = json.loads(value) if isinstance(value, str) else value
+                for inner_key, inner_value in inner.items():
+                    if inner_key in streamed and isinstance(inner_value, list):
+                        inner_value = iter(inner_value)
+                    yield inner_key, inner_value
+            else:
+                yield key, value
+
+
+def session_answers(session: Dict) -> List[Tuple[int, str]]:
+    """(questionId, selectedAnswer) pairs in JS property order (integer keys ascending)"""
+    answers = session.get('answers') or {}
+    return sorted((int(k), v) for k, v in answers.items() if str(k).isdigit())
+
+
+def _is_regular(attempt) -> bool:
+    """Whether an attempt survives the column round trip unchanged"""
+    if not isinstance(attempt, dict) or not set(ATTEMPT_FIELDS[:-1]) <= set(attempt) <= set(ATTEMPT_FIELDS):
+        return False
+    if not isinstance(attempt['isCorrect'], bool) or not isinstance(attempt['testMode'], str):
+        return False
+    if not isinstance(attempt.get('sessionId', ''), str):
+        return False
+    moment = parse_time(attempt['timestamp'])
+    return moment is not None and to_iso(moment) == attempt['timestamp']
+
+
+def attempts_to_columns(attempts: List[Dict]) -> Dict:
+    """Store an attempt log as parallel arrays
+
+    Modes and session ids are interned into lookup tables and timestamps
+    become epoch milliseconds. Attempts that do not have the usual shape
+    (or whose timestamp would not survive the conversion) are kept
+    verbatim under 'irregular', keyed by row.
+    """
+    columns = {field: [] for field in ATTEMPT_FIELDS}
+    modes: Dict[str, int] = {}
+    sessions: Dict[str, int] = {}
+    irregular = {}
+    for row, attempt in enumerate(attempts):
+        if not _is_regular(attempt):
+            irregular[str(row)] = attempt
+            attempt = {}
+        columns['questionId'].append(attempt.get('questionId', 0))
+        columns['selectedAnswer'].append(attempt.get('selectedAnswer', ''))
+        columns['correctAnswer'].append(attempt.get('correctAnswer', ''))
+        columns['isCorrect'].append(int(bool(attempt.get('isCorrect'))))
+        columns['timeSpent'].append(attempt.get('timeSpent', 0))
+        columns['timestamp'].append(to_millis(parse_time(attempt['timestamp'])) if attempt else 0)
+        columns['testMode'].append(modes.setdefault(attempt.get('testMode'), len(modes)) if attempt else -1)
+        session = attempt.get('sessionId')
+        columns['sessionId'].append(sessions.setdefault(session, len(sessions)) if session is not None else -1)
+    return {
+        'count': len(attempts),
+        'columns': columns,
+        'modes': list(modes),
+        'sessions': list(sessions),
+        'irregular': irregular
+    }
+
+
+def columns_to_attempts(table: Dict) -> List[Dict]:
+    """Inverse of attempts_to_columns"""
+    columns = table['columns']
+    modes, sessions, irregular = table['modes'], table['sessions'], table.get('irregular', {})
+    attempts = []
+    for row in range(table['count']):
+        if str(row) in irregular:
+            attempts.append(irregular[str(row)])
+            continue
+        attempt = {
+            'questionId': columns['questionId'][row],
+            'selectedAnswer': columns['selectedAnswer'][row],
+            'correctAnswer': columns['correctAnswer'][row],
+            'isCorrect': bool(columns['isCorrect'][row]),
+            'timeSpent': columns['timeSpent'][row],
+            'timestamp': to_iso(from_millis(columns['timestamp'][row])),
+            'testMode': modes[columns['testMode'][row]]
+        }
+        if columns['sessionId'][row] >= 0:
+            attempt['sessionId'] = sessions[columns['sessionId'][row]]
+        attempts.append(attempt)
+    return attempts
+
+
+def millis_column(values: List) -> np.ndarray:
+    """Epoch milliseconds for a column of serialised dates (0 where unparseable)"""
+    strings = np.array(values, dtype=str) if values else np.zeros(0, dtype='U24')
+    if strings.size and np.all(np.char.endswith(strings, 'Z')):
+        try:
+            # numpy parses naive ISO strings in bulk; the Z suffix is the only obstacle
+            return np.char.rstrip(strings, 'Z').astype('datetime64[ms]').astype(np.int64)
+        except ValueError:
+            pass
+    millis = [parse_time(value) for value in values]
+    return np.array([to_millis(m) if m else 0 for m in millis], dtype=np.int64)
+
+
+def read_attempt_columns(path: str) -> Dict[str, np.ndarray]:
+    """The questionAttempts of one export (v1 or compact v2) as NumPy columns
+
+    Columns: questionId, selectedAnswer, correctAnswer, isCorrect, timeSpent,
+    timestamp (epoch ms), testMode and sessionId ('' when absent).
+    Malformed attempts are dropped.
+    """
+    table = None
+    for key, value in iter_export(path):
+        if key == 'questionAttempts':
+            table = value
+    if isinstance(table, dict):
+        if table.get('irregular'):
+            table = columns_to_attempts(table)
+        else:
+            columns = table['columns']
+            modes = np.array(table['modes'] + [''], dtype=str)
+            sessions = np.array(table['sessions'] + [''], dtype=str)
+            return {
+                'questionId': np.array(columns['questionId'], dtype=np.int64),
+                'selectedAnswer': np.array(columns['selectedAnswer'], dtype=str),
+                'correctAnswer': np.array(columns['correctAnswer'], dtype=str),
+                'isCorrect': np.array(columns['isCorrect'], dtype=bool),
+                'timeSpent': np.array(columns['timeSpent'], dtype=np.float64),
+                'timestamp': np.array(columns['timestamp'], dtype=np.int64),
+                # -1 (no session) indexes the trailing ''
+                'testMode': modes[np.array(columns['testMode'], dtype=np.int64)],
+                'sessionId': sessions[np.array(columns['sessionId'], dtype=np.int64)]
+            }
+    attempts = [a for a in table or [] if isinstance(a, dict) and isinstance(a.get('questionId'), int)]
+    return {
+        'questionId': np.array([a['questionId'] for a in attempts], dtype=np.int64),
+        'selectedAnswer': np.array([str(a.get('selectedAnswer', '')) for a in attempts], dtype=str),
+        'correctAnswer': np.array([str(a.get('correctAnswer', '')) for a in attempts], dtype=str),
+        'isCorrect': np.array([bool(a.get('isCorrect')) for a in attempts], dtype=bool),
+        'timeSpent': np.array([a.get('timeSpent') or 0 for a in attempts], dtype=np.float64),
+        'timestamp': millis_column([a.get('timestamp') for a in attempts]),
+        'testMode': np.array([str(a.get('testMode') or '') for a in attempts], dtype=str),
+        'sessionId': np.array([str(a.get('sessionId') or '') for a in attempts], dtype=str)
+    }
+
+
+def attempts_digest(columns: Dict[str, np.ndarray], rows: int) -> str:
+    """Digest of the first rows attempts, independent of the string columns' NumPy width"""
+    digest = hashlib.sha256()
+    for field in ATTEMPT_FIELDS:
+        values = columns[field][:rows]
+        if values.dtype.kind == 'U':
+            digest.update('\x1f'.join(values.tolist()).encode('utf-8'))
+        else:
+            digest.update(values.astype(np.float64 if field == 'timeSpent' else np.int64).tobytes())
+        digest.update(b'\x1e')
+    return digest.hexdigest()[:32]
+
+
+def new_attempts(path: str, mark: Dict) -> Optional[Tuple[Dict[str, np.ndarray], bool]]:
+    """Attempts an export gained since mark was taken, and whether the learner must be reset; None if unchanged
+
+    The app only appends attempts, so mark records how many rows were
+    ingested and a digest of them. If those rows changed (a repair, a
+    deleted session) or a new attempt is older than an ingested one, every
+    attempt is returned with reset True, and the caller drops what it holds
+    for the learner first. Attempts sharing a timestamp are never skipped.
+    mark ({'rows', 'digest', 'mtime', 'size'}) is updated in place.
+    """
+    info = os.stat(path)
+    if (mark.get('mtime'), mark.get('size')) == (info.st_mtime_ns, info.st_size):
+        return None
+    columns = read_attempt_columns(path)
+    rows = mark.get('rows', 0)
+    timestamps = columns['timestamp']
+    reset = rows > len(timestamps) or (rows > 0 and attempts_digest(columns, rows) != mark.get('digest'))
+    # New attempts older than ingested ones would be replayed out of order, so they reset the learner too
+    if not reset and 0 < rows < len(timestamps) and timestamps[rows:].min() < timestamps[:rows].max():
+        reset = True
+    start = 0 if reset else rows
+    mark['rows'] = len(columns['questionId'])
+    mark['digest'] = attempts_digest(columns, mark['rows'])
+    mark['mtime'], mark['size'] = info.st_mtime_ns, info.st_size
+    return {field: values[start:] for field, values in columns.items()}, reset
+
+
+def export_paths(source: str) -> List[str]:
+    """A single export, or every *.json export in a directory"""
+    if os.path.isfile(source):
+        return [source]
+    return sorted(glob.glob(os.path.join(source, '*.json')))
+
+
+def load_attempt_log(paths: List[str], jobs: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Attempt columns of many exports concatenated, plus a learner column
+
+    Each export is one learner; learner holds the index into paths. Files
+    are parsed in a process pool (jobs=1 reads them in this process).
+    """
+    if jobs == 1 or len(paths) < 2:
+        parts = [read_attempt_columns(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parts = list(pool.map(read_attempt_columns, paths, chunksize=16))
+    log = {field: np.concatenate([part[field] for part in parts]) if parts else np.zeros(0)
+           for field in ATTEMPT_FIELDS}
+    log['learner'] = np.repeat(np.arange(len(parts), dtype=np.int32), [len(part['questionId']) for part in parts])
+    return log
@@ -0,0 +1,208 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from bank_io import load_questions
+from learner_data import STORAGE_KEY, attempts_to_columns, bank_hash, columns_to_attempts, iter_export
+from revision_store import record_hash
+
+FORMAT_VERSION = 2
+
+
+class Bank:
+    """Questions by id plus the content hash v2 blobs are pinned to"""
+
+    def __init__(self, questions: List[Dict]):
+        self.by_id = {q['id']: q for q in questions}
+        self.hash = bank_hash(questions)
+
+
+def _question_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(q, dict) and isinstance(q.get('id'), int) for q in value)
+
+
+def compact_questions(holder: Dict, bank: Bank, variants: Dict[str, Dict]) -> Dict:
+    """Replace holder['questions'] with questionIds, keeping key order
+
+    Embedded copies that differ from the bank (edited since the session was
+    saved) go into the blob's shared variants table, referenced by position.
+    """
+    questions = holder.get('questions')
+    if not _question_list(questions):
+        return holder
+    changed = {}
+    for index, question in enumerate(questions):
+        if bank.by_id.get(question['id']) != question:
+            digest = record_hash(question)
+            variants.setdefault(digest, question)
+            changed[str(index)] = digest
+    compacted = {}
+    for key, value in holder.items():
+        if key == 'questions':
+            compacted['questionIds'] = [q['id'] for q in questions]
+            if changed:
+                compacted['questionVariants'] = changed
+        else:
+            compacted[key] = value
+    return compacted
+
+
+def expand_questions(holder: Dict, bank: Bank, variants: Dict[str, Dict]) -> Dict:
+    if 'questionIds' not in holder:
+        return holder
+    changed = holder.get('questionVariants', {})
+    questions = []
+    for index, question_id in enumerate(holder['questionIds']):
+        if str(index) in changed:
+            questions.append(variants[changed[str(index)]])
+        elif question_id in bank.by_id:
+            questions.append(bank.by_id[question_id])
+        else:
+            raise ValueError(f'Question {question_id} is not in the bank')
+    expanded = {}
+    for key, value in holder.items():
+        if key == 'questionIds':
+            expanded['questions'] = questions
+        elif key != 'questionVariants':
+            expanded[key] = value
+    return expanded
+
+
+def compact_session(session: Dict, bank: Bank, variants: Dict[str, Dict]) -> Dict:
+    if not isinstance(session, dict):
+        return session
+    session = compact_questions(session, bank, variants)
+    if isinstance(session.get('config'), dict):
+        session['config'] = compact_questions(session['config'], bank, variants)
+    return session
+
+
+def expand_session(session: Dict, bank: Bank, variants: Dict[str, Dict]) -> Dict:
+    if not isinstance(session, dict):
+        return session
+    session = expand_questions(session, bank, variants)
+    if isinstance(session.get('config'), dict):
+        session['config'] = expand_questions(session['config'], bank, variants)
+    return session
+
+
+def compact_export(path: str, bank: Bank) -> Dict:
+    """Rewrite an exported blob in the v2 format
+
+    Sessions reference question ids instead of embedding questions, and
+    questionAttempts is stored as parallel arrays. A {STORAGE_KEY: ...}
+    wrapper is recorded in the header so expand can restore it.
+    """
+    data = {'version': FORMAT_VERSION, 'bank': {'hash': bank.hash, 'questions': len(bank.by_id)}}
+    variants: Dict[str, Dict] = {}
+    wrapper: Dict[str, str] = {}
+    for key, value in iter_export(path, wrapper=wrapper):
+        if key == 'version' and value == FORMAT_VERSION:
+            raise ValueError('Already in the v2 format')
+        if key == 'testSessions':
+            value = [compact_session(session, bank, variants) for session in value]
+        elif key == 'questionAttempts' and isinstance(value, list):
+            value = attempts_to_columns(value)
+        data[key] = value
+    data['questionVariants'] = variants
+    if wrapper:
+        data['wrapped'] = wrapper['wrapped']
+    return data
+
+
+def expand_export(data: Dict, bank: Bank, force: bool = False) -> Dict:
+    """Turn a v2 blob back into the PersistentData layout the app imports"""
+    if data.get('version') != FORMAT_VERSION:
+        raise ValueError('Not a v2 blob')
+    pinned = data.get('bank', {}).get('hash')
+    if pinned != bank.hash and not force:
+        raise ValueError(f'Compacted against bank {pinned}, but this bank is {bank.hash} '
+                         f'(--force expands against it anyway)')
+    variants = data.get('questionVariants', {})
+    expanded = {}
+    for key, value in data.items():
+        if key in ('version', 'bank', 'questionVariants', 'wrapped'):
+            continue
+        if key == 'testSessions':
+            value = [expand_session(session, bank, variants) for session in value]
+        elif key == 'questionAttempts' and isinstance(value, dict):
+            value = columns_to_attempts(value)
+        expanded[key] = value
+    wrapped = data.get('wrapped')
+    if wrapped == 'string':
+        # localStorage holds the blob as JSON.stringify output
+        return {STORAGE_KEY: json.dumps(expanded, ensure_ascii=False, separators=(',', ':'))}
+    if wrapped == 'object':
+        return {STORAGE_KEY: expanded}
+    return expanded
+
+
+def write_export(path: str, data: Dict):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+
+def convert_file(command: str, path: str, output: str, bank: Bank, force: bool = False) -> Tuple[int, int]:
+    """Compact or expand one blob; returns (bytes in, bytes out)"""
+    if command == 'compact':
+        data = compact_export(path, bank)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = expand_export(json.load(f), bank, force)
+    write_export(output, data)
+    return os.path.getsize(path), os.path.getsize(output)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Convert learner-data exports to and from the compact v2 format')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('compact', 'Rewrite exports in the compact v2 format'),
+                            ('expand', 'Expand v2 blobs back into app exports')):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument('input', help='A blob, or a directory of *.json blobs')
+        sub.add_argument('--output', default=f'artifacts/{name}ed',
+                         help='Output directory (or file, when converting a single blob)')
+        sub.add_argument('--questions', default='src/data/questions.json')
+        if name == 'expand':
+            sub.add_argument('--force', action='store_true', help='Expand even if the bank hash differs')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    bank = Bank(load_questions(args.questions))
+    if os.path.isfile(args.input):
+        single = args.output.endswith('.json')
+        jobs = [(args.input, args.output if single else os.path.join(args.output, os.path.basename(args.input)))]
+    else:
+        jobs = [(path, os.path.join(args.output, os.path.basename(path)))
+                for path in sorted(glob.glob(os.path.join(args.input, '*.json')))]
+    for _, output in jobs:
+        if os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+
+    size_in = size_out = 0
+    errors = 0
+    for path, output in jobs:
+        try:
+            before, after = convert_file(args.command, path, output, bank, getattr(args, 'force', False))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"❌ {os.path.basename(path)}: {e}")
+            errors += 1
+            continue
+        size_in += before
+        size_out += after
+
+    done = len(jobs) - errors
+    ratio = f" ({size_in / size_out:.1f}x smaller)" if args.command == 'compact' and size_out else ''
+    print(f"{'⚠️' if errors else '✅'} {args.command.capitalize()}ed {done}/{len(jobs)} blobs in {time.perf_counter() - start:.2f}s: "
+          f"{size_in / 1e6:.1f} MB -> {size_out / 1e6:.1f} MB{ratio}")
+    print(f"Bank hash: {bank.hash}")
+    print(f"Output: {args.output}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
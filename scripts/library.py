@@ -0,0 +1,173 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from bank_io import save_questions
+from book_profile import DEFAULT_PROFILE, BookProfile
+
+# Default spacing between books' id ranges when a profile has no explicit idBase
+ID_BLOCK = 100000
+
+
+def discover_books(directory: str) -> List[Tuple[str, BookProfile]]:
+    """Pair every PDF in a directory with the profile file of the same name"""
+    books = []
+    for pdf_path in sorted(glob.glob(os.path.join(directory, '*.pdf'))):
+        stem = os.path.splitext(pdf_path)[0]
+        profile_path = stem + '.json'
+        if os.path.exists(profile_path):
+            profile = BookProfile.load(profile_path)
+        else:
+            print(f"⚠️  No profile for {os.path.basename(pdf_path)}, using the default book layout")
+            profile = BookProfile(book_id=os.path.basename(stem))
+        books.append((pdf_path, profile))
+    return books
+
+
+def assign_id_bases(profiles: List[BookProfile]) -> Dict[str, int]:
+    """Give each book its own id range; explicit idBase values win"""
+    bases = {}
+    for index, profile in enumerate(profiles):
+        bases[profile.id] = profile.id_base if profile.id_base is not None else index * ID_BLOCK
+    ordered = sorted(bases.items(), key=lambda item: item[1])
+    for (first, base), (second, next_base) in zip(ordered, ordered[1:]):
+        if next_base - base < ID_BLOCK:
+            raise ValueError(f"Books '{first}' and '{second}' have overlapping id ranges "
+                             f"({base} and {next_base}); set idBase in their profiles")
+    return bases
+
+
+def ingest_book(pdf_path: str, profile_data: Dict, book_id: str, work_dir: str) -> Dict:
+    """Extract, answer and merge one book; runs in a worker process"""
+    from appendix_answers import iter_appendix_answers
+    from debug_and_test import extract_questions_properly
+    from merge_sources import MergeEngine, Source
+
+    start = time.perf_counter()
+    profile = BookProfile(profile_data, book_id)
+    book_dir = os.path.join(work_dir, profile.id)
+    os.makedirs(book_dir, exist_ok=True)
+
+    # The extractors are chatty; keep their output out of the interleaved console
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        questions = extract_questions_properly(pdf_path, profile)
+        answers = list(iter_appendix_answers(pdf_path, profile.answer_first_page))
+        save_questions(os.path.join(book_dir, 'extracted_questions.json'), questions)
+        answers_path = os.path.join(book_dir, 'appendix_answers.json')
+        with open(answers_path, 'w', encoding='utf-8') as f:
+            json.dump(answers, f, indent=2, ensure_ascii=False)
+
+        engine = MergeEngine(questions)
+        engine.add_source(Source('appendix', 'answers', answers_path, 10))
+        merged, _ = engine.merge()
+    with open(os.path.join(book_dir, 'extract.log'), 'w', encoding='utf-8') as f:
+        f.write(log.getvalue())
+
+    return {
+        'book': profile.id,
+        'questions': merged,
+        'stats': {
+            'name': profile.name,
+            'exam': profile.exam,
+            'pdf': pdf_path,
+            'questions': len(merged),
+            'answers': len(answers),
+            'withAnswer': sum(1 for q in merged if q.get('correctAnswer')),
+            'withExplanation': sum(1 for q in merged if q.get('explanation')),
+            'domains': {str(d): n for d, n in sorted(Counter(q['domain']['number'] for q in merged).items())},
+            'match': engine.stats['appendix'],
+            'seconds': round(time.perf_counter() - start, 2)
+        }
+    }
+
+
+def ingest_library(directory: str, work_dir: str, jobs: Optional[int] = None) -> Tuple[List[Dict], Dict]:
+    """Ingest every book of a library concurrently and merge them into one bank"""
+    books = discover_books(directory)
+    if not books:
+        raise ValueError(f"No PDFs found in {directory}")
+    bases = assign_id_bases([profile for _, profile in books])
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(ingest_book, pdf_path, profile.to_dict(), profile.id, work_dir): profile.id
+            for pdf_path, profile in books
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results[result['book']] = result
+            stats = result['stats']
+            print(f"✅ {result['book']}: {stats['questions']} questions, {stats['withAnswer']} answered "
+                  f"({stats['seconds']:.1f}s)")
+
+    bank = []
+    stats = {}
+    for _, profile in books:
+        result = results[profile.id]
+        base = bases[profile.id]
+        for question in result['questions']:
+            question['id'] += base
+            question['book'] = profile.id
+            bank.append(question)
+        ids = [q['id'] for q in result['questions']]
+        stats[profile.id] = dict(result['stats'], idRange=[min(ids), max(ids)] if ids else None)
+    return bank, stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Ingest a directory of practice-test PDFs into one question bank')
+    parser.add_argument('directory', nargs='?', default='books',
+                        help='Directory of PDFs, each with an optional <name>.json profile')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--output', default='artifacts/library/questions.json')
+    parser.add_argument('--stats', default='artifacts/library/library_stats.json')
+    parser.add_argument('--work-dir', default='artifacts/library', help='Per-book intermediates')
+    parser.add_argument('--print-profile', action='store_true', help='Print the default profile as a template')
+    args = parser.parse_args(argv)
+
+    if args.print_profile:
+        print(json.dumps(DEFAULT_PROFILE, indent=2))
+        return 0
+
+    start = time.perf_counter()
+    try:
+        bank, stats = ingest_library(args.directory, args.work_dir, args.jobs)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    for path in (args.output, args.stats):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    save_questions(args.output, bank)
+    with open(args.stats, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+
+    print("\n" + "="*60)
+    print("LIBRARY SUMMARY")
+    print("="*60)
+    for book, s in stats.items():
+        print(f"{book}: {s['name']} ({s['exam']})")
+        print(f"  ids {s['idRange']}, {s['questions']} questions, {s['withAnswer']} with answers, "
+              f"{s['withExplanation']} with explanations")
+        print(f"  domains: {', '.join(f'{d}: {n}' for d, n in s['domains'].items())}")
+        print(f"  answers matched: {s['match']['exact']} exact, {s['match']['fuzzy']} fuzzy, "
+              f"{s['match']['unmatched']} unmatched")
+    print(f"\nMerged {len(bank)} questions from {len(stats)} books in {time.perf_counter() - start:.1f}s")
+    print(f"Bank saved to: {args.output}")
+    print(f"Stats saved to: {args.stats}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
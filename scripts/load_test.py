@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+
+# The line question_server prints once it is listening
+SERVING = re.compile(r'Serving on http://([^:/\s]+):(\d+)')
+
+
+def build_paths(question_ids: List[int], domains: List[int], total: int, seed: int = 1) -> List[str]:
+    """A request mix weighted towards single questions, like the quiz app's traffic"""
+    rng = random.Random(seed)
+    paths = []
+    for _ in range(total):
+        roll = rng.random()
+        if roll < 0.8:
+            paths.append(f'/questions/{rng.choice(question_ids)}')
+        elif roll < 0.9:
+            paths.append(f'/domains/{rng.choice(domains)}')
+        else:
+            # A small pool of seeds so the exam cache gets both hits and misses
+            paths.append(f'/exam?count=90&seed={rng.randrange(32)}')
+    return paths
+
+
+async def read_response(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    body = await reader.readexactly(length) if length else b''
+    return status, body
+
+
+async def worker(host: str, port: int, paths: List[str], gzip_ok: bool, latencies: List[float],
+                 statuses: Dict[int, int]):
+    """One keep-alive connection issuing requests back to back"""
+    reader, writer = await asyncio.open_connection(host, port)
+    accept = 'Accept-Encoding: gzip\r\n' if gzip_ok else ''
+    try:
+        for path in paths:
+            request = f'GET {path} HTTP/1.1\r\nHost: {host}\r\n{accept}\r\n'.encode('latin-1')
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def fetch_json(host: str, port: int, path: str):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode('latin-1'))
+    await writer.drain()
+    _, body = await read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+
+async def run_load_test(host: str, port: int, requests: int, concurrency: int, gzip_ok: bool) -> Dict:
+    index = await fetch_json(host, port, '/')
+    domains = [d['number'] for d in index['domains']]
+    question_ids = []
+    for number in domains:
+        question_ids.extend(q['id'] for q in (await fetch_json(host, port, f'/domains/{number}'))['questions'])
+
+    paths = build_paths(question_ids, domains, requests)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, paths[i::concurrency], gzip_ok, latencies, statuses) for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': round(elapsed, 3),
+        'requestsPerSecond': round(len(latencies) / elapsed, 1),
+        'p50Ms': round(float(np.percentile(ms, 50)), 3),
+        'p90Ms': round(float(np.percentile(ms, 90)), 3),
+        'p99Ms': round(float(np.percentile(ms, 99)), 3),
+        'maxMs': round(float(ms.max()), 3),
+        'statuses': {str(k): v for k, v in sorted(statuses.items())}
+    }
+
+
+async def run_with_local_server(questions: str, requests: int, concurrency: int, gzip_ok: bool) -> Dict:
+    """Start question_server in a subprocess on a free port and load-test it
+
+    The server gets its own process and event loop, so the client's work does not
+    share a thread with it and skew the numbers.
+    """
+    server = await asyncio.create_subprocess_exec(
+        sys.executable, '-u', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'question_server.py'),
+        '--questions', questions, '--port', '0',
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+    try:
+        output = []
+        while True:
+            line = (await server.stdout.readline()).decode('utf-8', 'replace')
+            if not line:
+                raise RuntimeError('question_server exited before listening:\n' + ''.join(output))
+            output.append(line)
+            match = SERVING.match(line)
+            if match:
+                break
+        return await run_load_test(match.group(1), int(match.group(2)), requests, concurrency, gzip_ok)
+    finally:
+        if server.returncode is None:
+            server.terminate()
+        await server.wait()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load-test the question bank HTTP service')
+    parser.add_argument('--url', help='Running service, e.g. http://127.0.0.1:8765 (default: start one in a subprocess)')
+    parser.add_argument('--questions', default='src/data/questions.json', help='Bank for the local server')
+    parser.add_argument('-n', '--requests', type=int, default=20000)
+    parser.add_argument('-c', '--concurrency', type=int, default=32)
+    parser.add_argument('--no-gzip', action='store_true', help='Do not send Accept-Encoding: gzip')
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    if args.url:
+        url = urlsplit(args.url)
+        coro = run_load_test(url.hostname, url.port or 80, args.requests, args.concurrency, not args.no_gzip)
+    else:
+        coro = run_with_local_server(args.questions, args.requests, args.concurrency, not args.no_gzip)
+    result = asyncio.run(coro)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['requests']} requests, {result['concurrency']} connections, {result['seconds']:.2f}s")
+        print(f"  {result['requestsPerSecond']:.0f} requests/s")
+        print(f"  latency p50 {result['p50Ms']:.2f} ms, p90 {result['p90Ms']:.2f} ms, "
+              f"p99 {result['p99Ms']:.2f} ms, max {result['maxMs']:.2f} ms")
+        print(f"  statuses: {result['statuses']}")
+    return 0 if set(result['statuses']) <= {'200', '304'} else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
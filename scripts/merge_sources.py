@@ -0,0 +1,226 @@
+import argparse
+import json
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from bank_io import load_questions, save_questions
+from explanation_matcher import DEFAULT_MIN_CONFIDENCE, match_unmatched
+
+MERGED_FIELDS = ('correctAnswer', 'explanation')
+
+
+def iter_book_explanations(path: str) -> Iterator[Dict]:
+    """Stream answer records from the pdfplumber book_explanations.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for e in json.load(f):
+            yield {
+                'domain': e.get('domain'),
+                'originalId': e.get('number'),
+                'correctAnswer': e.get('answer', ''),
+                'explanation': e.get('explanation', '')
+            }
+
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """Stream override or answer records keyed by id or (domain, originalId)"""
+    yield from load_questions(path)
+
+
+def iter_appendix_answers(pdf_path: str) -> Iterator[Dict]:
+    """Stream answers parsed from the PDF appendix with PyMuPDF"""
+    from appendix_answers import iter_appendix_answers as iter_pdf_answers
+    yield from iter_pdf_answers(pdf_path)
+
+
+SOURCE_READERS = {
+    'book': iter_book_explanations,
+    'overrides': iter_records,
+    'answers': iter_records,
+    'appendix': iter_appendix_answers
+}
+
+
+class Source:
+    def __init__(self, name: str, kind: str, path: str, priority: int,
+                 field_priorities: Optional[Dict[str, int]] = None, fuzzy: bool = True):
+        if kind not in SOURCE_READERS:
+            raise ValueError(f"Unknown source type '{kind}' (expected one of {', '.join(SOURCE_READERS)})")
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.priority = priority
+        self.field_priorities = field_priorities or {}
+        self.fuzzy = fuzzy
+
+    def priority_for(self, field: str) -> int:
+        return self.field_priorities.get(field, self.priority)
+
+    def records(self) -> Iterable[Dict]:
+        return SOURCE_READERS[self.kind](self.path)
+
+
+class MergeEngine:
+    def __init__(self, questions: List[Dict], min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.questions = questions
+        self.min_confidence = min_confidence
+        self.by_id = {q['id']: idx for idx, q in enumerate(questions)}
+        self.by_key = {}
+        for idx, q in enumerate(questions):
+            original_id = q.get('originalId')
+            domain = q.get('domain', {}).get('number')
+            if original_id is not None and domain is not None:
+                self.by_key[(int(domain), int(original_id))] = idx
+        # (question index, field) -> list of candidate dicts
+        self.candidates: Dict[Tuple[int, str], List[Dict]] = defaultdict(list)
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def resolve(self, record: Dict) -> Optional[int]:
+        """Find the base question a source record refers to"""
+        if record.get('id') is not None and record['id'] in self.by_id:
+            return self.by_id[record['id']]
+        if record.get('domain') is not None and record.get('originalId') is not None:
+            return self.by_key.get((int(record['domain']), int(record['originalId'])))
+        return None
+
+    def add_source(self, source: Source):
+        """Stream one source, matching records exactly and then by option wording"""
+        if source.name in self.stats:
+            # Stats and provenance are keyed by name, so a second source would blur the two
+            raise ValueError(f"Duplicate source name '{source.name}'; give each source its own NAME=")
+        matched: Dict[int, List[Dict]] = defaultdict(list)
+        unresolved = []
+        for record in source.records():
+            idx = self.resolve(record)
+            if idx is None:
+                unresolved.append(record)
+            else:
+                matched[idx].append(record)
+
+        stats = {'exact': 0, 'fuzzy': 0, 'ambiguous': 0, 'unmatched': 0}
+        for idx, records in matched.items():
+            if len(records) == 1:
+                self._offer(idx, source, records[0], 'exact', 1.0)
+                stats['exact'] += 1
+            else:
+                # Repeated keys usually mean a mis-assigned domain; let wording decide
+                unresolved.extend(records)
+                stats['ambiguous'] += len(records)
+
+        if source.fuzzy and unresolved:
+            claimed = {idx for idx, records in matched.items() if len(records) == 1}
+            open_questions = [q for idx, q in enumerate(self.questions) if idx not in claimed]
+            # The matcher works on book-style explanation records
+            views = [
+                {'number': r.get('originalId', -1), 'answer': r.get('correctAnswer'),
+                 'explanation': r.get('explanation', ''), 'record': r}
+                for r in unresolved
+            ]
+            for question, view, confidence in match_unmatched(open_questions, views, self.min_confidence):
+                self._offer(self.by_id[question['id']], source, view['record'], 'fuzzy', confidence)
+                stats['fuzzy'] += 1
+        stats['unmatched'] = len(unresolved) - stats['fuzzy']
+        self.stats[source.name] = stats
+
+    def _offer(self, idx: int, source: Source, record: Dict, match: str, confidence: float):
+        for field in MERGED_FIELDS:
+            value = record.get(field)
+            if isinstance(value, str):
+                value = re.sub(r'\s+', ' ', value).strip()
+            if not value:
+                continue
+            self.candidates[(idx, field)].append({
+                'source': source.name,
+                'priority': source.priority_for(field),
+                'match': match,
+                'confidence': round(confidence, 4),
+                'value': value
+            })
+
+    def merge(self) -> Tuple[List[Dict], Dict[str, Dict]]:
+        """Apply winning values and return (merged questions, provenance by id)"""
+        provenance: Dict[str, Dict] = {}
+        for (idx, field), offers in sorted(self.candidates.items()):
+            # Highest priority wins; ties go to the more confident match, then source order
+            winner = max(enumerate(offers), key=lambda o: (o[1]['priority'], o[1]['confidence'], -o[0]))[1]
+            question = self.questions[idx]
+            question[field] = winner['value']
+            entry = {k: winner[k] for k in ('source', 'priority', 'match', 'confidence')}
+            overridden = sorted({o['source'] for o in offers if o['value'] != winner['value']})
+            if overridden:
+                entry['overridden'] = overridden
+            provenance.setdefault(str(question['id']), {})[field] = entry
+        return self.questions, provenance
+
+
+def parse_source_spec(spec: str) -> Source:
+    """Parse NAME=TYPE:PATH[:PRIORITY] or TYPE:PATH[:PRIORITY]"""
+    name, _, rest = spec.rpartition('=')
+    parts = rest.split(':')
+    if len(parts) < 2:
+        raise argparse.ArgumentTypeError(f"Invalid source '{spec}', expected TYPE:PATH[:PRIORITY]")
+    kind, path = parts[0], parts[1]
+    priority = int(parts[2]) if len(parts) > 2 else 0
+    return Source(name or kind, kind, path, priority)
+
+
+def load_config(path: str) -> List[Source]:
+    """Load sources from a JSON config: {"sources": [{name, type, path, priority, fieldPriorities}]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return [
+        Source(s.get('name', s['type']), s['type'], s['path'], s.get('priority', 0),
+               s.get('fieldPriorities'), s.get('fuzzy', True))
+        for s in config['sources']
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Merge answers and explanations from several sources by priority')
+    parser.add_argument('--questions', default='src/data/questions.json', help='Base question bank')
+    parser.add_argument('--output', help='Merged bank (defaults to overwriting --questions)')
+    parser.add_argument('--provenance', default='src/data/questions_provenance.json',
+                        help='Where to write per-field provenance')
+    parser.add_argument('--config', help='JSON file listing sources and priorities')
+    parser.add_argument('--source', action='append', type=parse_source_spec, default=[],
+                        help='Source as [NAME=]TYPE:PATH[:PRIORITY]; TYPE is book, appendix, answers or overrides')
+    parser.add_argument('--min-confidence', type=float, default=DEFAULT_MIN_CONFIDENCE)
+    args = parser.parse_args(argv)
+
+    sources = load_config(args.config) if args.config else []
+    sources.extend(args.source)
+    if not sources:
+        sources = [Source('book', 'book', 'book_explanations.json', 50)]
+    names = [source.name for source in sources]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        parser.error(f"duplicate source names: {', '.join(duplicates)} (name them with NAME=TYPE:PATH)")
+
+    start = time.perf_counter()
+    engine = MergeEngine(load_questions(args.questions), args.min_confidence)
+    for source in sources:
+        engine.add_source(source)
+        stats = engine.stats[source.name]
+        print(f"{source.name} (priority {source.priority}): {stats['exact']} exact, {stats['fuzzy']} fuzzy, "
+              f"{stats['ambiguous']} ambiguous, {stats['unmatched']} unmatched")
+    questions, provenance = engine.merge()
+
+    save_questions(args.output or args.questions, questions)
+    with open(args.provenance, 'w', encoding='utf-8') as f:
+        json.dump(provenance, f, indent=2, ensure_ascii=False)
+
+    wins = defaultdict(int)
+    for fields in provenance.values():
+        for entry in fields.values():
+            wins[entry['source']] += 1
+    elapsed = time.perf_counter() - start
+    print(f"\nMerged {len(questions)} questions in {elapsed:.2f}s")
+    for name, count in sorted(wins.items()):
+        print(f"  {name}: won {count} fields")
+    print(f"Merged bank saved to: {args.output or args.questions}")
+    print(f"Provenance saved to: {args.provenance}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import json
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+from bank_io import load_questions
+
+
+def objective_sort_key(objective: str):
+    return tuple(int(part) for part in objective.split('.'))
+
+
+def build_objective_index(questions: List[Dict]) -> Dict[str, List[int]]:
+    """Map each exam objective ("2.3") to the ids of its questions, in id order"""
+    index = defaultdict(list)
+    for question in questions:
+        objective = question.get('objective')
+        if objective:
+            index[objective].append(question['id'])
+    return {objective: sorted(index[objective]) for objective in sorted(index, key=objective_sort_key)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Build the exam objective -> question id index')
+    parser.add_argument('questions', nargs='?', default='src/data/questions.json')
+    parser.add_argument('--output', default='src/data/objectives.json')
+    args = parser.parse_args(argv)
+
+    questions = load_questions(args.questions)
+    index = build_objective_index(questions)
+    if not index:
+        print(f"❌ No question in {args.questions} has an objective "
+              f"(extract with a book profile that sets objectiveHeaders)")
+        return 1
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    tagged = sum(len(ids) for ids in index.values())
+    print(f"Indexed {tagged}/{len(questions)} questions under {len(index)} objectives")
+    for objective, ids in index.items():
+        print(f"  {objective}: {len(ids)} questions")
+    if tagged < len(questions):
+        print(f"⚠️  {len(questions) - tagged} questions have no objective (re-extract to capture running headers)")
+    print(f"Index saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from bank_io import load_questions
+from exam_forms import DEFAULT_FORM_SIZE, apportion, domain_pools
+from learner_data import export_paths, iter_export
+from progress_rollup import ProgressRollup
+
+# Quiz.tsx marks a session passed at 75%, the percentage form of CompTIA's 750/900
+PASSING_SCORE = 75.0
+DEFAULT_SIMULATIONS = 1000
+# Domain accuracy is a Beta posterior: each domain's counts plus this many pseudo-attempts
+# at the learner's overall accuracy, so a barely practised domain is not taken at face value
+PRIOR_ATTEMPTS = 4
+# Two-sided 95% normal quantile for the Wilson interval
+Z_95 = 1.959964
+# Learners x simulations x domains draws held in memory at once
+BATCH_CELLS = 1 << 22
+
+
+def read_progress(path: str) -> Optional[Dict]:
+    """The userProgress member of one export, without reading the members after it"""
+    for key, value in iter_export(path, streamed=('testSessions', 'questionAttempts')):
+        if key == 'userProgress':
+            return value
+    return None
+
+
+def progress_counts(progress: List[Optional[Dict]], domains: List[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Learners x domains matrices of attempted and correct answers from userProgress objects"""
+    attempts = np.zeros((len(progress), len(domains)))
+    correct = np.zeros((len(progress), len(domains)))
+    for row, entry in enumerate(progress):
+        domain_progress = (entry or {}).get('domainProgress') or {}
+        for column, number in enumerate(domains):
+            d = domain_progress.get(str(number)) or {}
+            attempts[row, column] = d.get('attemptedQuestions') or 0
+            correct[row, column] = d.get('correctAnswers') or 0
+    return attempts, correct
+
+
+def snapshot_counts(rollup: ProgressRollup, domains: List[int]) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Learner names and attempted/correct matrices from a progress rollup snapshot"""
+    names = sorted(rollup.learners)
+    attempts = np.zeros((len(names), len(domains)))
+    correct = np.zeros((len(names), len(domains)))
+    for row, name in enumerate(names):
+        for column, number in enumerate(domains):
+            d = rollup.learners[name]['domains'].get(str(number)) or {}
+            attempts[row, column] = d.get('attempts', 0)
+            correct[row, column] = d.get('correct', 0)
+    return names, attempts, correct
+
+
+def beta_parameters(attempts: np.ndarray, correct: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Posterior Beta(alpha, beta) of each learner's accuracy in each domain"""
+    total = attempts.sum(axis=1, keepdims=True)
+    overall = np.where(total > 0, correct.sum(axis=1, keepdims=True) / np.maximum(total, 1), 0.5)
+    # Keep the prior proper for learners who are always right or always wrong
+    overall = np.clip(overall, 0.05, 0.95)
+    correct = np.minimum(correct, attempts)
+    return correct + PRIOR_ATTEMPTS * overall, attempts - correct + PRIOR_ATTEMPTS * (1 - overall)
+
+
+def simulate(alpha: np.ndarray, beta: np.ndarray, quotas: np.ndarray, passing_score: float, simulations: int,
+             seed: int = 0) -> Dict[str, np.ndarray]:
+    """Sit simulations exams per learner: draw domain accuracy, then correct answers per domain
+
+    Learners are processed in batches of whole learners, every batch a
+    single learners x simulations x domains draw.
+    """
+    rng = np.random.default_rng(seed)
+    learners = len(alpha)
+    size = quotas.sum()
+    passes = np.zeros(learners, dtype=np.int64)
+    mean_score = np.zeros(learners)
+    low_score = np.zeros(learners)
+    high_score = np.zeros(learners)
+    batch = max(1, BATCH_CELLS // (simulations * len(quotas)))
+    for start in range(0, learners, batch):
+        rows = slice(start, start + batch)
+        shape = (len(alpha[rows]), simulations, len(quotas))
+        accuracy = rng.beta(alpha[rows][:, None, :], beta[rows][:, None, :], size=shape)
+        right = rng.binomial(quotas[None, None, :], accuracy, size=shape).sum(axis=2)
+        scores = right * (100.0 / size)
+        passes[rows] = (scores >= passing_score).sum(axis=1)
+        mean_score[rows] = scores.mean(axis=1)
+        low_score[rows], high_score[rows] = np.percentile(scores, [5, 95], axis=1)
+    probability = passes / simulations
+    # Wilson score interval for the Monte Carlo estimate
+    centre = (probability + Z_95 ** 2 / (2 * simulations)) / (1 + Z_95 ** 2 / simulations)
+    half = Z_95 * np.sqrt(probability * (1 - probability) / simulations + Z_95 ** 2 / (4 * simulations ** 2)) \
+        / (1 + Z_95 ** 2 / simulations)
+    return {'probability': probability, 'low': np.clip(centre - half, 0, 1), 'high': np.clip(centre + half, 0, 1),
+            'meanScore': mean_score, 'scoreLow': low_score, 'scoreHigh': high_score}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Monte Carlo probability that each learner passes a weighted exam')
+    parser.add_argument('input', nargs='?', help='An export, or a directory of exports with userProgress')
+    parser.add_argument('--snapshot', help='Read domain counts from a rollup snapshot instead of exports')
+    parser.add_argument('--questions', default='src/data/questions.json',
+                        help='Bank whose domain weights shape the exam')
+    parser.add_argument('--size', type=int, default=DEFAULT_FORM_SIZE, help='Questions per exam')
+    parser.add_argument('--passing-score', type=float, default=PASSING_SCORE, help='Passing percentage')
+    parser.add_argument('-n', '--simulations', type=int, default=DEFAULT_SIMULATIONS, help='Exams per learner')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='artifacts/pass_probability.json')
+    args = parser.parse_args(argv)
+    if bool(args.input) == bool(args.snapshot):
+        parser.error('give either exports or --snapshot')
+    if args.simulations < 1 or args.size < 1:
+        parser.error('--simulations and --size must be positive')
+
+    _, weights = domain_pools(load_questions(args.questions))
+    quota_map = apportion(args.size, weights)
+    domains = sorted(quota_map)
+    quotas = np.array([quota_map[d] for d in domains], dtype=np.int64)
+
+    start = time.perf_counter()
+    if args.snapshot:
+        names, attempts, correct = snapshot_counts(ProgressRollup.load(args.snapshot), domains)
+    else:
+        paths = export_paths(args.input)
+        names = [os.path.splitext(os.path.basename(path))[0] for path in paths]
+        attempts, correct = progress_counts([read_progress(path) for path in paths], domains)
+    practised = attempts.sum(axis=1) > 0
+    if not practised.any():
+        print(f"❌ No domain progress found in {args.snapshot or args.input}")
+        return 1
+    loaded = time.perf_counter()
+
+    alpha, beta = beta_parameters(attempts[practised], correct[practised])
+    result = simulate(alpha, beta, quotas, args.passing_score, args.simulations, args.seed)
+    simulated = time.perf_counter()
+
+    learners = {}
+    for row, name in enumerate(np.array(names)[practised].tolist()):
+        learners[name] = {
+            'passProbability': round(float(result['probability'][row]), 4),
+            'confidenceInterval': [round(float(result['low'][row]), 4), round(float(result['high'][row]), 4)],
+            'expectedScore': round(float(result['meanScore'][row]), 1),
+            'scoreRange': [round(float(result['scoreLow'][row]), 1), round(float(result['scoreHigh'][row]), 1)],
+            'attempts': int(attempts[practised][row].sum())
+        }
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'exam': {'size': args.size, 'passingScore': args.passing_score,
+                     'quotas': {str(d): int(k) for d, k in zip(domains, quotas)}},
+            'simulations': args.simulations,
+            'seed': args.seed,
+            'learners': learners
+        }, f, indent=2)
+
+    probability = result['probability']
+    print(f"Simulated {args.simulations} exams for each of {len(probability)} learners in "
+          f"{simulated - loaded:.2f}s (read {loaded - start:.2f}s)")
+    print(f"  exam: {args.size} questions ({', '.join(f'{d}: {k}' for d, k in zip(domains, quotas))}), "
+          f"pass at {args.passing_score:g}%")
+    print(f"  likely to pass (>= 80%): {int((probability >= 0.8).sum())}, "
+          f"borderline: {int(((probability >= 0.2) & (probability < 0.8)).sum())}, "
+          f"unlikely (< 20%): {int((probability < 0.2).sum())}")
+    if not practised.all():
+        print(f"  ℹ️ {int((~practised).sum())} learners have no domain progress yet")
+    print(f"Pass probabilities saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+QUIZDATA = os.path.join(SCRIPTS_DIR, 'quizdata.py')
+
+STATE_FILE = 'artifacts/.pipeline_state.json'
+MANIFEST_FILE = 'artifacts/pipeline_manifest.json'
+
+# Shared helpers whose edits should invalidate every stage that imports them. quizdata.py
+# gains a subcommand per tool, so each stage fingerprints only its own handler in it.
+COMMON_CODE = ['scripts/bank_io.py']
+
+
+class Stage:
+    def __init__(self, name: str, command: List[str], inputs: List[str], outputs: List[str],
+                 code: List[str], after: Optional[List[str]] = None, handler: Optional[str] = None):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.code = COMMON_CODE + code
+        self.after = after or []
+        # quizdata.py function that runs the stage; forwarded commands have none
+        self.handler = handler
+
+
+def define_stages(pdf: str, overrides: str) -> List[Stage]:
+    """The extract -> answers/explanations -> merge -> validate -> bundle DAG"""
+    merge_sources = [
+        '--source', 'appendix=answers:artifacts/appendix_answers.json:10',
+        '--source', 'book:artifacts/book_explanations.json:50'
+    ]
+    merge_inputs = ['artifacts/extracted_questions.json', 'artifacts/appendix_answers.json',
+                    'artifacts/book_explanations.json']
+    if overrides and os.path.exists(overrides):
+        merge_sources += ['--source', f'manual=overrides:{overrides}:100']
+        merge_inputs.append(overrides)
+
+    return [
+        Stage('extract', ['extract', '--pdf', pdf, '--output', 'artifacts/extracted_questions.json'],
+              inputs=[pdf], outputs=['artifacts/extracted_questions.json'],
+              code=['scripts/debug_and_test.py', 'scripts/book_profile.py'], handler='cmd_extract'),
+        Stage('answers', ['answers', '--pdf', pdf, '--output', 'artifacts/appendix_answers.json'],
+              inputs=[pdf], outputs=['artifacts/appendix_answers.json'],
+              code=['scripts/appendix_answers.py', 'scripts/book_profile.py'], handler='cmd_answers'),
+        Stage('explanations', ['explanations', '--pdf', pdf, '--output', 'artifacts/book_explanations.json'],
+              inputs=[pdf], outputs=['artifacts/book_explanations.json'],
+              code=['extract_explanations.py'], handler='cmd_explanations'),
+        Stage('merge', ['merge', '--questions', 'artifacts/extracted_questions.json',
+                        '--output', 'artifacts/questions.json',
+                        '--provenance', 'artifacts/questions_provenance.json'] + merge_sources,
+              inputs=merge_inputs,
+              outputs=['artifacts/questions.json', 'artifacts/questions_provenance.json'],
+              code=['scripts/merge_sources.py', 'scripts/explanation_matcher.py', 'scripts/text_utils.py']),
+        Stage('validate', ['validate', '--questions', 'artifacts/questions.json',
+                           '--report', 'artifacts/validation_report.json'],
+              inputs=['artifacts/questions.json'], outputs=['artifacts/validation_report.json'],
+              code=['scripts/bank_validator.py'], handler='cmd_validate'),
+        Stage('bundle', ['bundle', '--questions', 'artifacts/questions.json', '--output-dir', 'src/data'],
+              inputs=['artifacts/questions.json'],
+              outputs=['src/data/questions.json', 'src/data/search_index.json', 'src/data/related.json',
+                       'src/data/objectives.json'],
+              code=['scripts/search_index.py', 'scripts/related_questions.py', 'scripts/text_utils.py',
+                    'scripts/objective_index.py'],
+              after=['validate'], handler='cmd_bundle')
+    ]
+
+
+class FileHasher:
+    """Content hashes, reused across runs while a file's size and mtime are unchanged"""
+
+    def __init__(self, cache: Dict[str, List]):
+        self.cache = cache
+
+    def hash(self, path: str) -> Optional[str]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        cached = self.cache.get(path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        self.cache[path] = [stat.st_size, stat.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+
+def handler_sources(path: str = QUIZDATA) -> Dict[str, str]:
+    """Source of every top-level function in quizdata.py, read without importing it"""
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    return {node.name: ast.get_source_segment(source, node)
+            for node in ast.parse(source).body if isinstance(node, ast.FunctionDef)}
+
+
+def stage_key(stage: Stage, hasher: FileHasher, handlers: Optional[Dict[str, str]] = None) -> str:
+    """Cache key over the stage command, input contents and code versions"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps(stage.command).encode('utf-8'))
+    for path in stage.inputs + stage.code:
+        digest.update(f"{path}={hasher.hash(path)}\n".encode('utf-8'))
+    if stage.handler:
+        handlers = handlers if handlers is not None else handler_sources()
+        if stage.handler not in handlers:
+            raise SystemExit(f"Stage {stage.name}: no handler {stage.handler} in {QUIZDATA}")
+        digest.update(handlers[stage.handler].encode('utf-8'))
+    return digest.hexdigest()
+
+
+def upstream_of(stages: Dict[str, Stage]) -> Dict[str, set]:
+    """Stage -> names of stages it depends on, via produced inputs and explicit ordering"""
+    producers = {output: stage.name for stage in stages.values() for output in stage.outputs}
+    return {
+        name: {producers[p] for p in stage.inputs if p in producers} | set(stage.after)
+        for name, stage in stages.items()
+    }
+
+
+def select_stages(stages: Dict[str, Stage], targets: List[str]) -> Dict[str, Stage]:
+    """Targets plus everything they transitively depend on"""
+    deps = upstream_of(stages)
+    selected = set()
+    pending = list(targets or stages)
+    while pending:
+        name = pending.pop()
+        if name not in stages:
+            raise SystemExit(f"Unknown stage '{name}' (expected one of {', '.join(stages)})")
+        if name not in selected:
+            selected.add(name)
+            pending.extend(deps[name])
+    return {name: stage for name, stage in stages.items() if name in selected}
+
+
+def run_stage(stage: Stage) -> Dict:
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, QUIZDATA] + stage.command, capture_output=True, text=True)
+    return {
+        'returncode': result.returncode,
+        'duration': round(time.perf_counter() - start, 3),
+        'log': (result.stdout + result.stderr)[-4000:]
+    }
+
+
+def run_pipeline(stages: Dict[str, Stage], jobs: int = 4, force: bool = False, dry_run: bool = False) -> Dict:
+    """Run stages in dependency order, skipping unchanged ones and parallelising the rest"""
+    state = {'files': {}, 'stages': {}}
+    if os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    hasher = FileHasher(state['files'])
+    handlers = handler_sources()
+    deps = upstream_of(stages)
+    results: Dict[str, Dict] = {}
+    started = datetime.now(timezone.utc).isoformat()
+
+    def is_fresh(stage: Stage, key: str) -> bool:
+        previous = state['stages'].get(stage.name)
+        if force or not previous or previous['key'] != key:
+            return False
+        return all(hasher.hash(p) == previous['outputs'].get(p) for p in stage.outputs)
+
+    remaining = dict(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while remaining or running:
+            progressed = True
+            while progressed:
+                progressed = False
+                for name in list(remaining):
+                    upstream = [results.get(d, {}).get('status') for d in deps[name] & set(stages)]
+                    if any(status in ('failed', 'blocked') for status in upstream):
+                        results[name] = {'status': 'blocked'}
+                    elif not all(status in ('ran', 'skipped', 'planned') for status in upstream):
+                        continue
+                    else:
+                        stage = remaining[name]
+                        # Upstream outputs are final at this point, so the key reflects them
+                        key = stage_key(stage, hasher, handlers)
+                        if dry_run:
+                            fresh = 'planned' not in upstream and is_fresh(stage, key)
+                            results[name] = {'status': 'skipped' if fresh else 'planned', 'key': key}
+                        elif is_fresh(stage, key):
+                            results[name] = {'status': 'skipped', 'key': key}
+                        else:
+                            print(f"▶ {name}: {' '.join(stage.command)}")
+                            running[pool.submit(run_stage, stage)] = (stage, key)
+                    del remaining[name]
+                    progressed = True
+
+            if not running:
+                if remaining:
+                    raise SystemExit(f"Stage dependency cycle among: {', '.join(remaining)}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key = running.pop(future)
+                outcome = future.result()
+                if outcome['returncode'] == 0:
+                    outputs = {p: hasher.hash(p) for p in stage.outputs}
+                    state['stages'][stage.name] = {'key': key, 'outputs': outputs}
+                    results[stage.name] = {'status': 'ran', 'key': key, 'duration': outcome['duration']}
+                    print(f"✅ {stage.name} ({outcome['duration']:.2f}s)")
+                else:
+                    state['stages'].pop(stage.name, None)
+                    results[stage.name] = {'status': 'failed', 'key': key, 'duration': outcome['duration'],
+                                           'log': outcome['log']}
+                    print(f"❌ {stage.name} failed:\n{outcome['log']}")
+
+    manifest = {
+        'started': started,
+        'finished': datetime.now(timezone.utc).isoformat(),
+        'stages': {
+            name: dict(results[name],
+                       inputs={p: hasher.hash(p) for p in stage.inputs},
+                       outputs={p: hasher.hash(p) for p in stage.outputs})
+            for name, stage in stages.items()
+        }
+    }
+    if not dry_run:
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        with open(STATE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        with open(MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the question bank build pipeline with stage caching')
+    parser.add_argument('targets', nargs='*', help='Stages to build (default: all); dependencies are included')
+    parser.add_argument('--pdf', default='david.pdf')
+    parser.add_argument('--overrides', default='overrides.json', help='Manual overrides merged at top priority if present')
+    parser.add_argument('-j', '--jobs', type=int, default=4, help='Stages to run in parallel')
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and rerun every selected stage')
+    parser.add_argument('--dry-run', action='store_true', help='Only report which stages would run')
+    args = parser.parse_args(argv)
+
+    os.chdir(REPO_ROOT)
+    stages = {stage.name: stage for stage in define_stages(args.pdf, args.overrides)}
+    start = time.perf_counter()
+    manifest = run_pipeline(select_stages(stages, args.targets), args.jobs, args.force, args.dry_run)
+
+    print(f"\nPipeline finished in {time.perf_counter() - start:.2f}s")
+    for name, entry in manifest['stages'].items():
+        print(f"  {name:<13} {entry['status']}")
+    if not args.dry_run:
+        print(f"Manifest saved to: {MANIFEST_FILE}")
+    return 1 if any(e['status'] in ('failed', 'blocked') for e in manifest['stages'].values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
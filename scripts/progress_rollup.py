@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from learner_data import EPOCH_ISO, BankIndex, export_paths, from_millis, millis_column, new_attempts, to_iso
+from repair_learner_data import weak_and_strong_areas
+
+DEFAULT_LOG = 'artifacts/attempt_log.jsonl'
+DEFAULT_SNAPSHOT = 'artifacts/progress_snapshot.json'
+SNAPSHOT_VERSION = 1
+MARKS_VERSION = 2
+
+
+def load_marks(log_path: str) -> Dict:
+    """The log's marks: bytes of it committed so far, and each export's new_attempts mark"""
+    marks_path = log_path + '.marks.json'
+    if not os.path.exists(marks_path):
+        return {'version': MARKS_VERSION, 'logSize': 0, 'learners': {}}
+    with open(marks_path, 'r', encoding='utf-8') as f:
+        marks = json.load(f)
+    if marks.get('version') != MARKS_VERSION:
+        raise ValueError(f'{marks_path} was written by an older version of this tool; '
+                         f'delete it and {log_path}, then append again')
+    return marks
+
+
+def save_marks(log_path: str, marks: Dict):
+    """Write the marks atomically and durably; this is the commit point of an append"""
+    marks_path = log_path + '.marks.json'
+    with open(marks_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(marks, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(marks_path + '.tmp', marks_path)
+
+
+def read_new_events(path: str, offset: int, end: Optional[int] = None) -> Tuple[List[Dict], int]:
+    """Events appended after offset (and before end), and the offset just past the last complete line
+
+    A line still being written (no trailing newline) is left for the next run.
+    """
+    if not os.path.exists(path):
+        return [], 0
+    if os.path.getsize(path) < offset or (end is not None and end < offset):
+        raise ValueError(f'{path} is shorter than the snapshot offset {offset}; rebuild with --rebuild')
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        data = f.read() if end is None else f.read(end - offset)
+    complete = data.rfind(b'\n') + 1
+    lines = data[:complete].decode('utf-8').splitlines()
+    return [json.loads(line) for line in lines if line.strip()], offset + complete
+
+
+def group_sums(keys: np.ndarray, correct: np.ndarray, spent: np.ndarray, moment: np.ndarray):
+    """Per distinct key: count, correct, time spent and latest timestamp (as Python lists)"""
+    unique, index = np.unique(keys, return_inverse=True)
+    latest = np.zeros(len(unique), dtype=np.int64)
+    np.maximum.at(latest, index, moment)
+    return (unique.tolist(), np.bincount(index).tolist(), np.bincount(index, correct).tolist(),
+            np.bincount(index, spent).tolist(), latest.tolist())
+
+
+class ProgressRollup:
+    """Per-learner and per-domain aggregates folded from the attempt log
+
+    Each aggregate holds attempts, correct, timeSpent (a sum, so the mean
+    is exact) and lastAttempted in epoch ms.
+
+    The snapshot also records how far into the log it has read, so each
+    update only reads and folds the events appended since.
+    """
+
+    def __init__(self, offset: int = 0, events: int = 0, learners: Optional[Dict[str, Dict]] = None):
+        self.offset = offset
+        self.events = events
+        self.learners: Dict[str, Dict] = learners or {}
+
+    @classmethod
+    def load(cls, path: str) -> 'ProgressRollup':
+        if not os.path.exists(path):
+            return cls()
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f'Unsupported snapshot version {snapshot.get("version")}')
+        return cls(snapshot['offset'], snapshot['events'], snapshot['learners'])
+
+    def save(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so a crash never leaves a half-written snapshot
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'offset': self.offset, 'events': self.events,
+                       'learners': self.learners}, f, separators=(',', ':'))
+        os.replace(path + '.tmp', path)
+
+    def _learner(self, name: str) -> Dict:
+        return self.learners.setdefault(name, {'attempts': 0, 'correct': 0, 'timeSpent': 0.0, 'lastAttempted': 0,
+                                               'domains': {}})
+
+    @staticmethod
+    def _add(entry: Dict, count: int, correct: float, spent: float, latest: int):
+        entry['attempts'] += count
+        entry['correct'] += int(correct)
+        entry['timeSpent'] += spent
+        entry['lastAttempted'] = max(entry['lastAttempted'], latest)
+
+    def apply(self, events: List[Dict], bank: BankIndex):
+        """Fold a batch of events in log order; a reset event forgets its learner's aggregates"""
+        start = 0
+        for i, event in enumerate(events):
+            if event.get('reset'):
+                self._fold(events[start:i], bank)
+                self.learners.pop(event['learner'], None)
+                start = i + 1
+        self._fold(events[start:], bank)
+
+    def _fold(self, events: List[Dict], bank: BankIndex):
+        """Fold attempt events: group sums in NumPy, then one dict update per group"""
+        if not events:
+            return
+        names, learner = np.unique(np.array([e['learner'] for e in events], dtype=str), return_inverse=True)
+        question = np.array([e['questionId'] for e in events], dtype=np.int64)
+        correct = np.array([bool(e['isCorrect']) for e in events], dtype=np.float64)
+        spent = np.array([e.get('timeSpent') or 0 for e in events], dtype=np.float64)
+        moment = millis_column([e.get('timestamp') for e in events])
+        domain = np.array([bank.domains.get(q) or 0 for q in question.tolist()], dtype=np.int64)
+
+        span = max(bank.domain_sizes, default=0) + 1
+        for key, count, right, spent_sum, latest in zip(*group_sums(learner, correct, spent, moment)):
+            self._add(self._learner(str(names[key])), count, right, spent_sum, latest)
+        known = domain > 0  # Questions no longer in the bank count towards totals only
+        cells = learner[known] * span + domain[known]
+        for key, count, right, spent_sum, latest in zip(*group_sums(cells, correct[known], spent[known],
+                                                                     moment[known])):
+            entry = self._learner(str(names[key // span]))['domains'].setdefault(str(key % span), {
+                'attempts': 0, 'correct': 0, 'timeSpent': 0.0, 'lastAttempted': 0})
+            self._add(entry, count, right, spent_sum, latest)
+        self.events += len(events)
+
+    def user_progress(self, name: str, bank: BankIndex) -> Dict:
+        """The learner's UserProgress, shaped like StorageService (and repair_learner_data) builds it"""
+        entry = self.learners.get(name) or {'attempts': 0, 'correct': 0, 'timeSpent': 0.0, 'lastAttempted': 0,
+                                            'domains': {}}
+        domain_progress = {}
+        for number, d in sorted(entry['domains'].items(), key=lambda item: int(item[0])):
+            domain_progress[number] = {
+                'domainNumber': int(number),
+                'totalQuestions': bank.domain_sizes.get(int(number), 0),
+                'attemptedQuestions': d['attempts'],
+                'correctAnswers': d['correct'],
+                'accuracy': d['correct'] / d['attempts'] * 100,
+                'averageTimePerQuestion': d['timeSpent'] / d['attempts'],
+                'lastAttempted': to_iso(from_millis(d['lastAttempted'])) if d['lastAttempted'] else EPOCH_ISO
+            }
+        weak, strong = weak_and_strong_areas(domain_progress)
+        return {
+            'totalQuestionsAttempted': entry['attempts'],
+            'totalCorrectAnswers': entry['correct'],
+            'overallAccuracy': entry['correct'] / entry['attempts'] * 100 if entry['attempts'] else 0,
+            'totalTimeSpent': entry['timeSpent'],
+            'domainProgress': domain_progress,
+            'weakAreas': weak,
+            'strongAreas': strong,
+            'lastStudySession': to_iso(from_millis(entry['lastAttempted'])) if entry['lastAttempted'] else EPOCH_ISO,
+            'studyStreak': 0
+        }
+
+
+def append_exports(log_path: str, paths: List[str]) -> Tuple[int, int]:
+    """Append the attempts each export gained since it was last logged; returns (exports changed, events)
+
+    Each export's new_attempts mark lives beside the log, so unchanged
+    exports are not re-read. A learner whose earlier attempts changed gets
+    a reset event followed by their whole history.
+
+    The log is fsynced once and the marks saved once per run, together
+    with the log size they cover. Bytes past that size were written by a
+    run that stopped before committing them, so they are truncated here
+    and never folded, and that run's exports are read again.
+    """
+    marks = load_marks(log_path)
+    changed = appended = written = 0
+    if os.path.dirname(log_path):
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, 'ab') as log:
+        log.truncate(marks['logSize'])
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            mark = dict(marks['learners'].get(name, {}))
+            result = new_attempts(path, mark)
+            if result is None:
+                continue
+            columns, reset = result
+            lines = [json.dumps({'learner': name, 'reset': True}, separators=(',', ':'))] if reset else []
+            for i in range(len(columns['questionId'])):
+                lines.append(json.dumps({
+                    'learner': name,
+                    'questionId': int(columns['questionId'][i]),
+                    'selectedAnswer': str(columns['selectedAnswer'][i]),
+                    'correctAnswer': str(columns['correctAnswer'][i]),
+                    'isCorrect': bool(columns['isCorrect'][i]),
+                    'timeSpent': float(columns['timeSpent'][i]),
+                    'timestamp': to_iso(from_millis(int(columns['timestamp'][i]))),
+                    'testMode': str(columns['testMode'][i]),
+                    'sessionId': str(columns['sessionId'][i])
+                }, separators=(',', ':')))
+            if lines:
+                data = ('\n'.join(lines) + '\n').encode('utf-8')
+                log.write(data)
+                written += len(data)
+            marks['learners'][name] = mark
+            changed += 1
+            appended += len(columns['questionId'])
+        if not changed:
+            return 0, 0
+        log.flush()
+        os.fsync(log.fileno())
+    # Saving the marks commits the whole run
+    marks['logSize'] += written
+    save_marks(log_path, marks)
+    return changed, appended
+
+
+def committed_size(log_path: str) -> Optional[int]:
+    """How much of the log append_exports has committed (None if it did not write the log)"""
+    return load_marks(log_path)['logSize'] if os.path.exists(log_path + '.marks.json') else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Event-sourced userProgress rollups over an append-only attempt log')
+    parser.add_argument('--log', default=DEFAULT_LOG, help='Append-only JSONL attempt log')
+    parser.add_argument('--snapshot', default=DEFAULT_SNAPSHOT)
+    parser.add_argument('--questions', default='src/data/questions.json')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    append_parser = subparsers.add_parser('append', help='Append new attempts from learner exports to the log')
+    append_parser.add_argument('input', help='An export, or a directory of exports (v1 or compact v2)')
+
+    update_parser = subparsers.add_parser('update', help='Fold events appended since the snapshot into it')
+    update_parser.add_argument('--rebuild', action='store_true', help='Start from an empty snapshot')
+
+    show_parser = subparsers.add_parser('show', help='Print learners\' userProgress (snapshot plus unfolded events)')
+    show_parser.add_argument('learners', nargs='*', help='Learner names (default: all)')
+    show_parser.add_argument('--output', help='Write {learner: userProgress} here instead of printing')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == 'append':
+        try:
+            changed, appended = append_exports(args.log, export_paths(args.input))
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"Appended {appended} events from {changed} changed exports to {args.log} "
+              f"in {time.perf_counter() - start:.2f}s")
+        return 0
+
+    bank = BankIndex.load(args.questions)
+    rollup = ProgressRollup() if getattr(args, 'rebuild', False) else ProgressRollup.load(args.snapshot)
+    try:
+        events, offset = read_new_events(args.log, rollup.offset, committed_size(args.log))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    rollup.apply(events, bank)
+    rollup.offset = offset
+
+    if args.command == 'update':
+        rollup.save(args.snapshot)
+        print(f"Folded {len(events)} new events ({rollup.events} total, {len(rollup.learners)} learners) "
+              f"in {time.perf_counter() - start:.2f}s")
+        print(f"Snapshot saved to: {args.snapshot}")
+        return 0
+
+    names = args.learners or sorted(rollup.learners)
+    progress = {name: rollup.user_progress(name, bank) for name in names}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(progress, f, indent=2)
+        print(f"userProgress for {len(progress)} learners saved to: {args.output}")
+    else:
+        print(json.dumps(progress, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from bank_io import load_questions
+from exam_forms import apportion
+
+DEFAULT_EXAM_SIZE = 90
+MAX_EXAM_SIZE = 500
+EXAM_CACHE_SIZE = 256
+# Bodies smaller than this are sent uncompressed; gzip would barely help
+GZIP_MIN_SIZE = 512
+# How often (seconds) to check the bank file for changes
+RELOAD_INTERVAL = 1.0
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class Response:
+    """A serialised JSON body with its ETag and a lazily built gzip variant"""
+
+    def __init__(self, data, status: int = 200):
+        self.status = status
+        self.body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self._gzipped = None
+
+    @property
+    def gzip_etag(self) -> str:
+        # A different representation needs a different strong validator
+        return self.etag[:-1] + '-gz"'
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+def error(status: int, message: str) -> Response:
+    return Response({'error': message}, status)
+
+
+def pick_exam(by_domain: Dict[int, List[Dict]], weights: Dict[int, float], count: int, seed: int) -> List[Dict]:
+    """Sample an exam with questions spread across domains by exam weight"""
+    rng = random.Random(seed)
+    allocation = apportion(count, weights, {d: len(qs) for d, qs in by_domain.items()})
+    picked = [q for d in sorted(allocation) for q in rng.sample(by_domain[d], allocation[d])]
+    rng.shuffle(picked)
+    return picked
+
+
+class QuestionService:
+    """Preloaded, pre-serialised views of the bank plus a cache of generated exams"""
+
+    def __init__(self, path: str, exam_cache_size: int = EXAM_CACHE_SIZE):
+        self.path = path
+        self.exam_cache_size = exam_cache_size
+        self.mtime = None
+        self.checked = 0.0
+        self.load()
+
+    def load(self):
+        # Stat before reading, but record it only once the bank has loaded: a half-written
+        # file that fails to parse must be retried on the next check
+        mtime = os.stat(self.path).st_mtime_ns
+        questions = load_questions(self.path)
+        by_domain: Dict[int, List[Dict]] = defaultdict(list)
+        weights = {}
+        for question in questions:
+            number = question['domain']['number']
+            by_domain[number].append(question)
+            weights[number] = question['domain'].get('weight', 0) or 1
+        question_responses = {q['id']: Response(q) for q in questions}
+        domain_responses = {
+            number: Response({'domain': qs[0]['domain'], 'count': len(qs), 'questions': qs})
+            for number, qs in by_domain.items()
+        }
+        index_response = Response({
+            'questions': len(questions),
+            'domains': [dict(qs[0]['domain'], count=len(qs)) for _, qs in sorted(by_domain.items())]
+        })
+        # Swap everything in together so a failed reload leaves the previous bank intact
+        self.by_domain = by_domain
+        self.weights = weights
+        self.question_responses = question_responses
+        self.domain_responses = domain_responses
+        self.index_response = index_response
+        # A fresh cache per load so edited banks never serve stale exams
+        self.exam_response = functools.lru_cache(maxsize=self.exam_cache_size)(self._build_exam)
+        self.mtime = mtime
+
+    def maybe_reload(self) -> bool:
+        """Reload the bank if the file changed, checking at most once per RELOAD_INTERVAL"""
+        now = time.monotonic()
+        if now - self.checked < RELOAD_INTERVAL:
+            return False
+        self.checked = now
+        try:
+            if os.stat(self.path).st_mtime_ns == self.mtime:
+                return False
+            self.load()
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Reload of {self.path} failed, still serving the previous bank: {e}", file=sys.stderr)
+            return False
+        return True
+
+    def _build_exam(self, count: int, domains: Tuple[int, ...], seed: int) -> Response:
+        by_domain = {d: self.by_domain[d] for d in domains}
+        weights = {d: self.weights[d] for d in domains}
+        questions = pick_exam(by_domain, weights, count, seed)
+        return Response({'seed': seed, 'count': len(questions), 'domains': list(domains), 'questions': questions})
+
+    def exam(self, query: Dict[str, List[str]]) -> Response:
+        try:
+            count = int(query.get('count', [DEFAULT_EXAM_SIZE])[0])
+            domains = tuple(sorted({int(d) for value in query.get('domains', []) for d in value.split(',') if d}))
+            seed = int(query['seed'][0]) if 'seed' in query else None
+        except ValueError:
+            return error(400, 'count, domains and seed must be integers')
+        if not 1 <= count <= MAX_EXAM_SIZE:
+            return error(400, f'count must be between 1 and {MAX_EXAM_SIZE}')
+        domains = domains or tuple(sorted(self.by_domain))
+        unknown = [d for d in domains if d not in self.by_domain]
+        if unknown:
+            return error(404, f'Unknown domains: {unknown}')
+        if seed is None:
+            # Unseeded exams are one-off; the seed in the response reproduces them
+            return self._build_exam(count, domains, random.randrange(2 ** 31))
+        return self.exam_response(count, domains, seed)
+
+    def route(self, method: str, target: str) -> Response:
+        if method not in ('GET', 'HEAD'):
+            return error(405, 'Only GET is supported')
+        url = urlsplit(target)
+        parts = [p for p in url.path.split('/') if p]
+        try:
+            if not parts:
+                return self.index_response
+            if parts[0] == 'questions' and len(parts) == 2:
+                return self.question_responses.get(int(parts[1])) or error(404, f'No question {parts[1]}')
+            if parts[0] == 'domains' and len(parts) == 2:
+                return self.domain_responses.get(int(parts[1])) or error(404, f'No domain {parts[1]}')
+        except ValueError:
+            return error(400, 'Ids must be integers')
+        if parts == ['exam']:
+            return self.exam(parse_qs(url.query))
+        return error(404, f'No route for {url.path}')
+
+
+async def read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+    """Parse one request head; None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, version = lines[0].split(' ', 2)
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    # Requests to this API have no body, but drain one if a client sends it
+    length = int(headers.get('content-length', 0) or 0)
+    if length:
+        await reader.readexactly(length)
+    return method, target, version, headers
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: a comma-separated list of tags or '*', compared weakly"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or any((tag[2:] if tag.startswith('W/') else tag) == etag for tag in tags)
+
+
+def render(response: Response, method: str, headers: Dict[str, str], keep_alive: bool) -> bytes:
+    status = response.status
+    body = response.body
+    etag = response.etag
+    extra = []
+    if len(body) >= GZIP_MIN_SIZE and 'gzip' in headers.get('accept-encoding', ''):
+        body = response.gzipped
+        etag = response.gzip_etag
+        extra.append('Content-Encoding: gzip')
+    if status == 200 and etag_matches(headers.get('if-none-match'), etag):
+        status, body = 304, b''
+    head = [
+        f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}',
+        'Content-Type: application/json; charset=utf-8',
+        f'Content-Length: {len(body)}',
+        f'ETag: {etag}',
+        'Cache-Control: no-cache',
+        'Vary: Accept-Encoding',
+        'Access-Control-Allow-Origin: *',
+        'Connection: ' + ('keep-alive' if keep_alive else 'close')
+    ] + extra
+    payload = ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1')
+    return payload if method == 'HEAD' else payload + body
+
+
+async def start_server(service: QuestionService, host: str, port: int) -> asyncio.AbstractServer:
+    """Listen for HTTP/1.1 keep-alive connections (port 0 picks a free port)"""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+                service.maybe_reload()
+                try:
+                    response = service.route(method, target)
+                except Exception as e:
+                    response = error(500, str(e))
+                writer.write(render(response, method, headers, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port, backlog=1024)
+
+
+async def serve(service: QuestionService, host: str, port: int):
+    server = await start_server(service, host, port)
+    # The bound port, so --port 0 reports the one it picked (load_test reads this line)
+    port = server.sockets[0].getsockname()[1]
+    print(f"Serving on http://{host}:{port} (/questions/<id>, /domains/<n>, /exam?count=N&domains=1,2&seed=S)",
+          flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve the question bank over HTTP')
+    parser.add_argument('--questions', default='src/data/questions.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='0 picks a free port')
+    parser.add_argument('--exam-cache', type=int, default=EXAM_CACHE_SIZE, help='Seeded exams kept in the LRU cache')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    service = QuestionService(args.questions, args.exam_cache)
+    print(f"Loaded {len(service.question_responses)} questions from {args.questions} "
+          f"in {time.perf_counter() - start:.2f}s")
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
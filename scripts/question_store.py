@@ -0,0 +1,243 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS domains (
+    number INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    weight INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    original_id INTEGER,
+    domain_number INTEGER REFERENCES domains(number),
+    page_number INTEGER,
+    question_text TEXT NOT NULL,
+    correct_answer TEXT NOT NULL DEFAULT '',
+    question_type TEXT NOT NULL DEFAULT 'multiple-choice',
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS options (
+    question_id INTEGER NOT NULL REFERENCES questions(id) ON DELETE CASCADE,
+    letter TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (question_id, letter)
+);
+CREATE TABLE IF NOT EXISTS explanations (
+    question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_domain_original ON questions(domain_number, original_id);
+CREATE INDEX IF NOT EXISTS idx_questions_page ON questions(page_number);
+"""
+
+# Question fields stored in their own columns; anything else goes to `extra`
+CORE_FIELDS = ('id', 'originalId', 'pageNumber', 'domain', 'questionText', 'options',
+               'correctAnswer', 'explanation', 'questionType')
+
+# Scalar fields that can be updated in place, mapped to (table, column)
+UPDATABLE_FIELDS = {
+    'originalId': ('questions', 'original_id'),
+    'pageNumber': ('questions', 'page_number'),
+    'questionText': ('questions', 'question_text'),
+    'correctAnswer': ('questions', 'correct_answer'),
+    'questionType': ('questions', 'question_type'),
+    'explanation': ('explanations', 'text')
+}
+
+
+class QuestionStore:
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA foreign_keys = ON')
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_questions(self, questions: Iterable[Dict]) -> int:
+        """Insert or replace many questions in a single transaction"""
+        count = 0
+        with self.conn:
+            for q in questions:
+                domain = q.get('domain') or {}
+                if domain:
+                    self.conn.execute(
+                        'INSERT INTO domains (number, name, weight) VALUES (?, ?, ?) '
+                        'ON CONFLICT(number) DO UPDATE SET name = excluded.name, weight = excluded.weight',
+                        (domain['number'], domain.get('name', ''), domain.get('weight', 0))
+                    )
+                extra = {k: v for k, v in q.items() if k not in CORE_FIELDS}
+                self.conn.execute(
+                    'INSERT INTO questions (id, original_id, domain_number, page_number, question_text, '
+                    'correct_answer, question_type, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(id) DO UPDATE SET original_id = excluded.original_id, '
+                    'domain_number = excluded.domain_number, page_number = excluded.page_number, '
+                    'question_text = excluded.question_text, correct_answer = excluded.correct_answer, '
+                    'question_type = excluded.question_type, extra = excluded.extra',
+                    (q['id'], q.get('originalId'), domain.get('number'), q.get('pageNumber'),
+                     q.get('questionText', ''), q.get('correctAnswer', ''),
+                     q.get('questionType', 'multiple-choice'),
+                     json.dumps(extra, ensure_ascii=False) if extra else None)
+                )
+                self.conn.execute('DELETE FROM options WHERE question_id = ?', (q['id'],))
+                self.conn.executemany(
+                    'INSERT INTO options (question_id, letter, text) VALUES (?, ?, ?)',
+                    [(q['id'], o['letter'], o['text']) for o in q.get('options', [])]
+                )
+                self.conn.execute(
+                    'INSERT INTO explanations (question_id, text) VALUES (?, ?) '
+                    'ON CONFLICT(question_id) DO UPDATE SET text = excluded.text',
+                    (q['id'], q.get('explanation', ''))
+                )
+                count += 1
+        return count
+
+    def update_field(self, question_id: int, field: str, value) -> bool:
+        """Update one field of one question by primary key"""
+        return self.update_fields([(question_id, field, value)]) > 0
+
+    def update_fields(self, updates: Iterable[Tuple[int, str, object]]) -> int:
+        """Apply many (id, field, value) updates in a single transaction"""
+        updated = 0
+        with self.conn:
+            for question_id, field, value in updates:
+                if field not in UPDATABLE_FIELDS:
+                    raise ValueError(f"Field '{field}' cannot be updated "
+                                     f"(expected one of {', '.join(UPDATABLE_FIELDS)})")
+                table, column = UPDATABLE_FIELDS[field]
+                key = 'question_id' if table == 'explanations' else 'id'
+                cursor = self.conn.execute(f'UPDATE {table} SET {column} = ? WHERE {key} = ?', (value, question_id))
+                updated += cursor.rowcount
+        return updated
+
+    def _assemble(self, row) -> Dict:
+        (qid, original_id, page_number, question_text, correct_answer, question_type, extra,
+         domain_number, domain_name, domain_weight, explanation) = row
+        question = {'id': qid}
+        if original_id is not None:
+            question['originalId'] = original_id
+        if page_number is not None:
+            question['pageNumber'] = page_number
+        question['domain'] = {'number': domain_number, 'name': domain_name, 'weight': domain_weight}
+        question['questionText'] = question_text
+        question['options'] = [
+            {'letter': letter, 'text': text}
+            for letter, text in self.conn.execute(
+                'SELECT letter, text FROM options WHERE question_id = ? ORDER BY letter', (qid,))
+        ]
+        question['correctAnswer'] = correct_answer
+        question['explanation'] = explanation or ''
+        question['questionType'] = question_type
+        if extra:
+            question.update(json.loads(extra))
+        return question
+
+    _SELECT = (
+        'SELECT q.id, q.original_id, q.page_number, q.question_text, q.correct_answer, q.question_type, '
+        'q.extra, d.number, d.name, d.weight, e.text FROM questions q '
+        'LEFT JOIN domains d ON d.number = q.domain_number '
+        'LEFT JOIN explanations e ON e.question_id = q.id '
+    )
+
+    def get(self, question_id: int) -> Optional[Dict]:
+        """Look up a question by id"""
+        row = self.conn.execute(self._SELECT + 'WHERE q.id = ?', (question_id,)).fetchone()
+        return self._assemble(row) if row else None
+
+    def ids(self) -> Set[int]:
+        """Every question id, from a single primary-key scan"""
+        return {row[0] for row in self.conn.execute('SELECT id FROM questions')}
+
+    def find_by_original(self, domain_number: int, original_id: int) -> Optional[Dict]:
+        """Look up a question by its book (domain, originalId) key"""
+        row = self.conn.execute(self._SELECT + 'WHERE q.domain_number = ? AND q.original_id = ?',
+                                (domain_number, original_id)).fetchone()
+        return self._assemble(row) if row else None
+
+    def iter_questions(self) -> Iterator[Dict]:
+        """Yield every question in id order"""
+        for row in self.conn.execute(self._SELECT + 'ORDER BY q.id'):
+            yield self._assemble(row)
+
+    def export_json(self, path: str) -> int:
+        """Stream the bank to the app's questions.json layout"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('[')
+            for question in self.iter_questions():
+                body = json.dumps(question, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+                f.write((',\n  ' if count else '\n  ') + body)
+                count += 1
+            f.write('\n]' if count else ']')
+        return count
+
+
+def parse_value(field: str, raw: str):
+    if field in ('originalId', 'pageNumber'):
+        return int(raw)
+    return raw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='SQLite-backed question store')
+    parser.add_argument('--db', default='artifacts/questions.db')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Bulk upsert a JSON/JSONL bank into the store')
+    import_parser.add_argument('questions', nargs='?', default='src/data/questions.json')
+
+    export_parser = subparsers.add_parser('export', help='Stream the store out as questions.json')
+    export_parser.add_argument('output', nargs='?', default='src/data/questions.json')
+
+    get_parser = subparsers.add_parser('get', help='Print one question')
+    get_parser.add_argument('id', type=int, nargs='?')
+    get_parser.add_argument('--domain', type=int, help='Look up by domain and --original-id instead')
+    get_parser.add_argument('--original-id', type=int)
+
+    set_parser = subparsers.add_parser('set', help='Update a single field of one question')
+    set_parser.add_argument('id', type=int)
+    set_parser.add_argument('field', choices=sorted(UPDATABLE_FIELDS))
+    set_parser.add_argument('value')
+
+    args = parser.parse_args(argv)
+    store = QuestionStore(args.db)
+    start = time.perf_counter()
+    try:
+        if args.command == 'import':
+            from bank_io import load_questions
+            count = store.upsert_questions(load_questions(args.questions))
+            print(f"Upserted {count} questions into {args.db} in {time.perf_counter() - start:.2f}s")
+        elif args.command == 'export':
+            count = store.export_json(args.output)
+            print(f"Exported {count} questions to {args.output} in {time.perf_counter() - start:.2f}s")
+        elif args.command == 'get':
+            if args.domain is not None and args.original_id is not None:
+                question = store.find_by_original(args.domain, args.original_id)
+            elif args.id is not None:
+                question = store.get(args.id)
+            else:
+                parser.error('get needs an id or --domain with --original-id')
+            if question is None:
+                print('Question not found')
+                return 1
+            print(json.dumps(question, indent=2, ensure_ascii=False))
+        elif args.command == 'set':
+            if not store.update_field(args.id, args.field, parse_value(args.field, args.value)):
+                print(f"Question {args.id} not found")
+                return 1
+            print(f"Updated {args.field} of question {args.id}")
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,260 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Keep this module free of heavy imports: every subcommand imports what it
+# needs (PyMuPDF, pdfplumber, NumPy) inside its handler.
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SCRIPTS_DIR)
+for path in (SCRIPTS_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Subcommands that hand their arguments straight to an existing script's main()
+FORWARDED_COMMANDS = {
+    'merge': ('merge_sources', 'Merge answers/explanations from prioritised sources'),
+    'search': ('search_index', 'Build or query the full-text search index'),
+    'related': ('related_questions', 'Precompute related-question neighbours'),
+    'dedup': ('dedup_questions', 'Find near-duplicate questions'),
+    'store': ('question_store', 'Import, export and edit the SQLite question store'),
+    'revisions': ('revision_store', 'Snapshot, list, restore and diff bank revisions'),
+    'diff': ('bank_diff', 'Keyed diff between two bank files'),
+    'library': ('library', 'Ingest a directory of books concurrently into one bank'),
+    'objectives': ('objective_index', 'Build the exam objective -> question id index'),
+    'serve': ('question_server', 'Serve the bank over HTTP'),
+    'loadtest': ('load_test', 'Load-test the HTTP service'),
+    'forms': ('exam_forms', 'Generate domain-weighted exam forms in bulk'),
+    'repair': ('repair_learner_data', 'Repair exported learner-data blobs in bulk'),
+    'learner': ('learner_format', 'Compact learner-data exports to the v2 format, or expand them back'),
+    'items': ('item_analysis', 'Item analysis (difficulty, discrimination) over learner exports'),
+    'irt': ('irt_calibration', 'Calibrate 2PL IRT item parameters from learner exports'),
+    'keys': ('answer_key_audit', 'Flag answer keys that strong learners disagree with'),
+    'schedule': ('review_scheduler', 'Incrementally schedule spaced-repetition reviews per learner'),
+    'rollup': ('progress_rollup', 'Event-sourced userProgress rollups over an append-only attempt log'),
+    'attempts': ('attempt_store', 'Memory-mapped columnar attempt store for cohort analytics'),
+    'pass': ('pass_probability', 'Monte Carlo probability that each learner passes a weighted exam'),
+    'times': ('time_percentiles', 'Time-per-question percentiles from mergeable quantile sketches')
+}
+
+# Modules each subcommand imports up front, used by the import-time benchmark.
+# PDF libraries are benchmarked separately since they load only when a PDF is read.
+COMMAND_MODULES = {
+    'extract': ['debug_and_test', 'bank_io', 'book_profile'],
+    'answers': ['appendix_answers'],
+    'explanations': ['extract_explanations'],
+    'merge': ['merge_sources'],
+    'validate': ['bank_validator'],
+    'bundle': ['search_index', 'related_questions', 'objective_index'],
+    'search': ['search_index'],
+    'related': ['related_questions'],
+    'dedup': ['dedup_questions'],
+    'store': ['question_store'],
+    'revisions': ['revision_store'],
+    'diff': ['bank_diff'],
+    'library': ['library', 'merge_sources'],
+    'objectives': ['objective_index'],
+    'serve': ['question_server', 'exam_forms'],
+    'loadtest': ['load_test'],
+    'forms': ['exam_forms'],
+    'repair': ['repair_learner_data', 'learner_data'],
+    'learner': ['learner_format', 'learner_data'],
+    'items': ['item_analysis', 'attempt_store', 'learner_data'],
+    'irt': ['irt_calibration', 'attempt_store', 'learner_data'],
+    'keys': ['answer_key_audit', 'attempt_store', 'learner_data', 'merge_sources'],
+    'schedule': ['review_scheduler', 'learner_data'],
+    'rollup': ['progress_rollup', 'learner_data', 'repair_learner_data'],
+    'attempts': ['attempt_store', 'learner_data'],
+    'pass': ['pass_probability', 'exam_forms', 'progress_rollup'],
+    'times': ['time_percentiles', 'attempt_store', 'learner_data']
+}
+
+
+def cmd_extract(args) -> int:
+    """Extract question stems and options from the PDF"""
+    from bank_io import save_questions
+    from book_profile import load_profile
+    from debug_and_test import extract_questions_properly
+
+    questions = extract_questions_properly(args.pdf, load_profile(args.profile))
+    save_questions(args.output, questions)
+    print(f"Questions saved to: {args.output}")
+    return 0
+
+
+def cmd_answers(args) -> int:
+    """Parse the answer appendix with PyMuPDF"""
+    from appendix_answers import iter_appendix_answers
+    from book_profile import load_profile
+
+    first_page = args.first_page or load_profile(args.profile).answer_first_page
+    answers = list(iter_appendix_answers(args.pdf, first_page))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(answers, f, indent=2, ensure_ascii=False)
+    print(f"Parsed {len(answers)} appendix answers")
+    print(f"Answers saved to: {args.output}")
+    return 0
+
+
+def cmd_explanations(args) -> int:
+    """Extract book explanations with pdfplumber"""
+    import extract_explanations
+
+    extract_explanations.main(args.pdf, args.start_page, args.output)
+    return 0
+
+
+def cmd_validate(args) -> int:
+    """Run the data-quality rules over the bank (non-zero exit on errors)"""
+    import bank_validator
+
+    argv = [args.questions, '--tolerance', str(args.tolerance)]
+    if args.report:
+        argv += ['--report', args.report]
+    if args.json:
+        argv.append('--json')
+    if args.strict:
+        argv.append('--strict')
+    return bank_validator.main(argv)
+
+
+def cmd_bundle(args) -> int:
+    """Install the bank for the app and build its search and related-question artifacts"""
+    from bank_io import load_questions, save_questions
+    from objective_index import build_objective_index
+    from related_questions import build_related_index
+    from search_index import build_index
+
+    questions = load_questions(args.questions)
+    outputs = {
+        'search_index.json': build_index(questions),
+        'related.json': build_related_index(questions)
+    }
+    # Only books whose profile sets objectiveHeaders tag questions with objectives
+    objectives = build_objective_index(questions)
+    if objectives:
+        outputs['objectives.json'] = objectives
+    os.makedirs(args.output_dir, exist_ok=True)
+    bank_path = os.path.join(args.output_dir, 'questions.json')
+    if os.path.abspath(bank_path) != os.path.abspath(args.questions):
+        save_questions(bank_path, questions)
+        print(f"Wrote {bank_path}")
+    for name, data in outputs.items():
+        path = os.path.join(args.output_dir, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        print(f"Wrote {path}")
+    return 0
+
+
+def measure_import(modules, repeat: int) -> float:
+    """Best-of-N wall time (ms) to import modules in a fresh interpreter"""
+    code = (
+        'import sys, time\n'
+        f'sys.path[:0] = {[SCRIPTS_DIR, REPO_ROOT]!r}\n'
+        't = time.perf_counter()\n'
+        + ''.join(f'import {m}\n' for m in modules) +
+        'print((time.perf_counter() - t) * 1000)\n'
+    )
+    best = float('inf')
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        if result.returncode != 0:
+            return float('nan')
+        best = min(best, float(result.stdout.strip()))
+    return best
+
+
+def cmd_bench(args) -> int:
+    """Report CLI start-up time and per-subcommand import cost"""
+    timings = []
+
+    best = float('inf')
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--help'], capture_output=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    timings.append(('quizdata --help (process start-up)', best))
+    timings.append(('import quizdata', measure_import(['quizdata'], args.repeat)))
+
+    for command, modules in COMMAND_MODULES.items():
+        timings.append((f'{command} imports ({", ".join(modules)})', measure_import(modules, args.repeat)))
+    for library in ('fitz', 'pdfplumber', 'PyPDF2', 'numpy'):
+        timings.append((f'import {library}', measure_import([library], args.repeat)))
+
+    if args.json:
+        print(json.dumps({name: round(ms, 2) for name, ms in timings}, indent=2))
+        return 0
+
+    print(f"Import-time benchmark (best of {args.repeat}, ms; nan = not installed)")
+    for name, ms in timings:
+        print(f"  {ms:8.1f}  {name}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='quizdata', description='Question bank data tooling')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract = subparsers.add_parser('extract', help=cmd_extract.__doc__)
+    extract.add_argument('--pdf', default='david.pdf')
+    extract.add_argument('--profile', help='Book profile JSON (default: the david.pdf layout)')
+    extract.add_argument('--output', default='artifacts/extracted_questions.json')
+    extract.set_defaults(handler=cmd_extract)
+
+    answers = subparsers.add_parser('answers', help=cmd_answers.__doc__)
+    answers.add_argument('--pdf', default='david.pdf')
+    answers.add_argument('--profile', help='Book profile JSON (default: the david.pdf layout)')
+    answers.add_argument('--first-page', type=int, help="Overrides the profile's answerFirstPage")
+    answers.add_argument('--output', default='artifacts/appendix_answers.json')
+    answers.set_defaults(handler=cmd_answers)
+
+    explanations = subparsers.add_parser('explanations', help=cmd_explanations.__doc__)
+    explanations.add_argument('--pdf', default='david.pdf')
+    explanations.add_argument('--start-page', type=int, default=217)
+    explanations.add_argument('--output', default='book_explanations.json')
+    explanations.set_defaults(handler=cmd_explanations)
+
+    validate = subparsers.add_parser('validate', help=cmd_validate.__doc__)
+    validate.add_argument('--questions', default='src/data/questions.json')
+    validate.add_argument('--report', help='Also write the JSON report to this file')
+    validate.add_argument('--json', action='store_true')
+    validate.add_argument('--tolerance', type=float, default=5.0)
+    validate.add_argument('--strict', action='store_true', help='Fail on warnings as well as errors')
+    validate.set_defaults(handler=cmd_validate)
+
+    bundle = subparsers.add_parser('bundle', help=cmd_bundle.__doc__)
+    bundle.add_argument('--questions', default='src/data/questions.json')
+    bundle.add_argument('--output-dir', default='src/data')
+    bundle.set_defaults(handler=cmd_bundle)
+
+    bench = subparsers.add_parser('bench', help=cmd_bench.__doc__)
+    bench.add_argument('--repeat', type=int, default=5)
+    bench.add_argument('--json', action='store_true')
+    bench.set_defaults(handler=cmd_bench)
+
+    for name, (_, help_text) in FORWARDED_COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in FORWARDED_COMMANDS:
+        module_name = FORWARDED_COMMANDS[argv[0]][0]
+        return importlib.import_module(module_name).main(argv[1:]) or 0
+
+    args = build_parser().parse_args(argv)
+    output_dir = os.path.dirname(getattr(args, 'output', None) or '')
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
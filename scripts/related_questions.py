@@ -0,0 +1,112 @@
+import argparse
+import json
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from bank_io import load_questions
+from text_utils import question_fields, tokenize
+
+
+def build_tfidf_matrix(questions: List[Dict]) -> Tuple[sparse.csr_matrix, Dict[str, int]]:
+    """Build an L2-normalised sublinear TF-IDF matrix (questions x terms)"""
+    vocabulary: Dict[str, int] = {}
+    doc_indices = []
+    term_indices = []
+    for doc, question in enumerate(questions):
+        for _, text in question_fields(question):
+            for token in tokenize(text):
+                term_indices.append(vocabulary.setdefault(token, len(vocabulary)))
+                doc_indices.append(doc)
+
+    n_docs = len(questions)
+    n_terms = len(vocabulary)
+    rows = np.asarray(doc_indices, dtype=np.int64)
+    cols = np.asarray(term_indices, dtype=np.int64)
+
+    # Collapse repeated (doc, term) pairs into counts in one vectorized pass
+    keys, counts = np.unique(rows * n_terms + cols, return_counts=True)
+    rows = keys // n_terms
+    cols = keys % n_terms
+
+    df = np.bincount(cols, minlength=n_terms)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1.0
+    values = (1.0 + np.log(counts)) * idf[cols]
+
+    matrix = sparse.csr_matrix((values.astype(np.float32), (rows, cols)), shape=(n_docs, n_terms))
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags(1.0 / norms).dot(matrix).tocsr().astype(np.float32)
+    return matrix, vocabulary
+
+
+def top_k_neighbours(matrix: sparse.csr_matrix, k: int = 10, block_size: int = 256,
+                     min_score: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Cosine top-k neighbours per row, computed in row blocks to bound memory"""
+    n_docs = matrix.shape[0]
+    k = min(k, max(n_docs - 1, 0))
+    neighbours = np.full((n_docs, k), -1, dtype=np.int64)
+    scores = np.zeros((n_docs, k), dtype=np.float32)
+    if k == 0:
+        return neighbours, scores
+
+    transposed = matrix.T.tocsr()
+    for start in range(0, n_docs, block_size):
+        end = min(start + block_size, n_docs)
+        similarities = (matrix[start:end] @ transposed).toarray()
+        block_rows = np.arange(end - start)
+        similarities[block_rows, block_rows + start] = -1.0  # exclude self matches
+
+        candidates = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(similarities, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1, kind='stable')
+        neighbours[start:end] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:end] = np.take_along_axis(candidate_scores, order, axis=1)
+
+    neighbours[scores <= min_score] = -1
+    return neighbours, scores
+
+
+def build_related_index(questions: List[Dict], k: int = 10, block_size: int = 256,
+                        min_score: float = 0.05) -> Dict[str, List[Dict]]:
+    """Map each question id to its most similar questions"""
+    matrix, _ = build_tfidf_matrix(questions)
+    neighbours, scores = top_k_neighbours(matrix, k, block_size, min_score)
+    ids = [q['id'] for q in questions]
+
+    related = {}
+    for row, qid in enumerate(ids):
+        related[str(qid)] = [
+            {'id': ids[col], 'score': round(float(score), 4)}
+            for col, score in zip(neighbours[row], scores[row])
+            if col >= 0
+        ]
+    return related
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precompute related-question neighbours with TF-IDF cosine similarity')
+    parser.add_argument('--questions', default='src/data/questions.json')
+    parser.add_argument('--output', default='src/data/related.json')
+    parser.add_argument('-k', type=int, default=10, help='Neighbours to keep per question')
+    parser.add_argument('--block-size', type=int, default=256, help='Rows scored per batch')
+    parser.add_argument('--min-score', type=float, default=0.05, help='Drop neighbours at or below this similarity')
+    args = parser.parse_args(argv)
+
+    questions = load_questions(args.questions)
+
+    start = time.perf_counter()
+    related = build_related_index(questions, args.k, args.block_size, args.min_score)
+    elapsed = time.perf_counter() - start
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(related, f, separators=(',', ':'))
+
+    print(f"Computed top-{args.k} neighbours for {len(questions)} questions in {elapsed:.2f}s")
+    print(f"Related index saved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
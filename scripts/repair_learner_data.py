@@ -0,0 +1,254 @@
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from learner_data import EPOCH_ISO, BankIndex, iter_export, parse_time, session_answers, to_iso
+
+# Seconds per attempt when a session's time cannot be split across its answers
+DEFAULT_TIME_SPENT = 15
+
+# Set in each worker by the pool initializer, so the bank is sent once per process
+_bank: Optional[BankIndex] = None
+
+
+def _init_worker(bank: BankIndex):
+    global _bank
+    _bank = bank
+
+
+def rebuild_attempts(sessions: List[Dict], session_questions: Dict[int, Dict], bank: BankIndex,
+                     bank_answers: bool = False) -> List[Dict]:
+    """One attempt per answered question of every completed session
+
+    Like repair_data.js, a question with no embedded session copy is
+    skipped; bank_answers grades it against the current bank instead.
+    """
+    attempts = []
+    for session in sessions:
+        if not (session.get('completed') and session.get('answers')):
+            continue
+        answered = session.get('questionsAnswered') or 0
+        time_spent = (session.get('totalTimeSpent') or 0) / answered if answered else 0
+        if not time_spent or not math.isfinite(time_spent):
+            time_spent = DEFAULT_TIME_SPENT
+        timestamp = to_iso(parse_time(session.get('endTime') or session.get('startTime')))
+        for question_id, selected in session_answers(session):
+            # Embedded session copies are what the learner saw
+            question = session_questions.get(question_id)
+            if question is not None:
+                correct = question.get('correctAnswer')
+            elif bank_answers and question_id in bank.answers:
+                correct = bank.answers[question_id]
+            else:
+                continue
+            attempts.append({
+                'questionId': question_id,
+                'selectedAnswer': selected,
+                'correctAnswer': correct,
+                'isCorrect': selected == correct,
+                'timeSpent': time_spent,
+                'timestamp': timestamp,
+                'testMode': session.get('mode'),
+                'sessionId': session.get('id')
+            })
+    return attempts
+
+
+def weak_and_strong_areas(domain_progress: Dict[str, Dict]):
+    """Same rule as StorageService.updateWeakAndStrongAreas"""
+    ranked = sorted((dp['accuracy'], dp['domainNumber']) for dp in domain_progress.values()
+                    if dp['attemptedQuestions'] >= 5)
+    count = math.ceil(len(ranked) * 0.4)
+    return [d for _, d in ranked[:count]], [d for _, d in ranked[len(ranked) - count:]]
+
+
+def rebuild_progress(attempts: List[Dict], bank: BankIndex) -> Dict:
+    """Recompute the UserProgress summary from the attempt log"""
+    progress = {
+        'totalQuestionsAttempted': len(attempts),
+        'totalCorrectAnswers': sum(1 for a in attempts if a['isCorrect']),
+        'overallAccuracy': 0,
+        'totalTimeSpent': sum(a['timeSpent'] for a in attempts),
+        'domainProgress': {},
+        'weakAreas': [],
+        'strongAreas': [],
+        'lastStudySession': EPOCH_ISO,
+        'studyStreak': 0  # Cannot be rebuilt from the log
+    }
+    if attempts:
+        progress['overallAccuracy'] = progress['totalCorrectAnswers'] / len(attempts) * 100
+
+    last_study = None
+    domain_time: Dict[int, float] = {}
+    latest: Dict[int, object] = {}
+    for attempt in attempts:
+        moment = parse_time(attempt['timestamp'])
+        if moment and (last_study is None or moment > last_study):
+            last_study = moment
+        domain = bank.domains.get(attempt['questionId'])
+        if domain is None:
+            continue
+        dp = progress['domainProgress'].setdefault(str(domain), {
+            'domainNumber': domain,
+            'totalQuestions': bank.domain_sizes.get(domain, 0),
+            'attemptedQuestions': 0,
+            'correctAnswers': 0,
+            'accuracy': 0,
+            'averageTimePerQuestion': 0,
+            'lastAttempted': EPOCH_ISO
+        })
+        dp['attemptedQuestions'] += 1
+        dp['correctAnswers'] += attempt['isCorrect']
+        domain_time[domain] = domain_time.get(domain, 0) + attempt['timeSpent']
+        if moment and (domain not in latest or moment > latest[domain]):
+            latest[domain] = moment
+            dp['lastAttempted'] = attempt['timestamp']
+
+    for dp in progress['domainProgress'].values():
+        dp['accuracy'] = dp['correctAnswers'] / dp['attemptedQuestions'] * 100
+        dp['averageTimePerQuestion'] = domain_time[dp['domainNumber']] / dp['attemptedQuestions']
+    progress['weakAreas'], progress['strongAreas'] = weak_and_strong_areas(progress['domainProgress'])
+    if last_study:
+        progress['lastStudySession'] = to_iso(last_study)
+    return progress
+
+
+def repair_export(path: str, bank: BankIndex, bank_answers: bool = False) -> Dict:
+    """Repair one exported blob: dedup sessions, rebuild attempts and progress"""
+    data = {}
+    sessions = []
+    seen_ids = set()
+    session_questions: Dict[int, Dict] = {}
+    total_sessions = 0
+    for key, value in iter_export(path):
+        if key != 'testSessions':
+            data[key] = value
+            continue
+        data[key] = sessions
+        for session in value:
+            total_sessions += 1
+            if not isinstance(session, dict) or not session.get('id') or session['id'] in seen_ids:
+                continue
+            seen_ids.add(session['id'])
+            sessions.append(session)
+            embedded = session.get('questions') or (session.get('config') or {}).get('questions') or []
+            for question in embedded:
+                if question and question.get('id') and question['id'] not in session_questions:
+                    session_questions[question['id']] = question
+    data['testSessions'] = sessions
+
+    old_attempts = data.get('questionAttempts') or []
+    data['questionAttempts'] = rebuild_attempts(sessions, session_questions, bank, bank_answers)
+    data['userProgress'] = rebuild_progress(data['questionAttempts'], bank)
+    return {
+        'data': data,
+        'stats': {
+            'sessions': total_sessions,
+            'uniqueSessions': len(sessions),
+            'duplicateSessions': total_sessions - len(sessions),
+            'attemptsBefore': len(old_attempts),
+            'attempts': len(data['questionAttempts']),
+            'accuracy': round(data['userProgress']['overallAccuracy'], 2)
+        }
+    }
+
+
+def write_export(path: str, data: Dict, indent: Optional[int] = None):
+    # Compact output (the localStorage format) lets json use its C encoder
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, indent=indent,
+                           separators=None if indent else (',', ':')))
+
+
+def repair_file(path: str, output_dir: str, indent: Optional[int] = None, bank_answers: bool = False) -> Dict:
+    """Worker task: repair one file and write it; errors are reported, not raised"""
+    start = time.perf_counter()
+    name = os.path.basename(path)
+    try:
+        result = repair_export(path, _bank, bank_answers)
+        write_export(os.path.join(output_dir, name), result['data'], indent)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        # OSError and UnicodeDecodeError (a ValueError) cover unreadable or undecodable exports
+        return {'file': name, 'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+    return dict({'file': name, 'status': 'repaired', 'seconds': round(time.perf_counter() - start, 3)},
+                **result['stats'])
+
+
+def repair_directory(input_dir: str, output_dir: str, bank: BankIndex, jobs: Optional[int] = None,
+                     indent: Optional[int] = None, bank_answers: bool = False) -> List[Dict]:
+    paths = sorted(glob.glob(os.path.join(input_dir, '*.json')))
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(bank,)) as pool:
+        futures = [pool.submit(repair_file, path, output_dir, indent, bank_answers) for path in paths]
+        for future in as_completed(futures):
+            results.append(future.result())
+    return sorted(results, key=lambda r: r['file'])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Repair exported learner-data blobs (Python port of repair_data.js)')
+    parser.add_argument('input', help='An exported blob, or a directory of them')
+    parser.add_argument('--output', default='artifacts/repaired',
+                        help='Output directory (or file, when repairing a single blob)')
+    parser.add_argument('--questions', default='src/data/questions.json')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes (default: CPU count)')
+    parser.add_argument('--indent', type=int, help='Pretty-print output (repair_data.js used 2)')
+    parser.add_argument('--bank-answers', action='store_true',
+                        help='Grade answers with no embedded session question against the current bank '
+                             '(repair_data.js skips them)')
+    args = parser.parse_args(argv)
+
+    # Repairs are written without a backup, so never over the originals
+    if os.path.isfile(args.input):
+        output = args.output if args.output.endswith('.json') else os.path.join(args.output, os.path.basename(args.input))
+        if os.path.realpath(output) == os.path.realpath(args.input):
+            parser.error('--output would overwrite the input export; choose another path')
+    elif os.path.realpath(args.output) == os.path.realpath(args.input):
+        parser.error('--output must not be the input directory; repairs would overwrite the originals')
+
+    start = time.perf_counter()
+    bank = BankIndex.load(args.questions)
+
+    if os.path.isfile(args.input):
+        result = repair_export(args.input, bank, args.bank_answers)
+        if os.path.dirname(output):
+            os.makedirs(os.path.dirname(output), exist_ok=True)
+        write_export(output, result['data'], args.indent)
+        stats = result['stats']
+        print(f"ℹ️ Deduplicated sessions: {stats['uniqueSessions']} unique of {stats['sessions']}")
+        print(f"ℹ️ Rebuilt {stats['attempts']} question attempts (was {stats['attemptsBefore']})")
+        print(f"🎉 Repaired data written to {output}")
+        return 0
+
+    results = repair_directory(args.input, args.output, bank, args.jobs, args.indent, args.bank_answers)
+    summary_path = os.path.join(args.output, 'repair_summary.json')
+    errors = [r for r in results if r['status'] == 'error']
+    summary = {
+        'files': len(results),
+        'repaired': len(results) - len(errors),
+        'errors': len(errors),
+        'duplicateSessions': sum(r.get('duplicateSessions', 0) for r in results),
+        'attempts': sum(r.get('attempts', 0) for r in results),
+        'seconds': round(time.perf_counter() - start, 2),
+        'results': results
+    }
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"✅ Repaired {summary['repaired']}/{summary['files']} exports in {summary['seconds']:.2f}s "
+          f"({summary['duplicateSessions']} duplicate sessions removed, {summary['attempts']} attempts rebuilt)")
+    for r in errors:
+        print(f"❌ {r['file']}: {r['error']}")
+    print(f"Summary saved to: {summary_path}")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
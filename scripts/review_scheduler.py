@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from learner_data import export_paths, from_millis, new_attempts, parse_time, to_iso, to_millis
+
+DEFAULT_STATE = 'artifacts/scheduler_state.npz'
+DAY_MS = 86400000
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+# Intervals stop growing at about a century, keeping due dates within datetime's range
+MAX_INTERVAL_DAYS = 36500
+# SM-2 quality for a right and a wrong answer (the app only records right/wrong)
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+DEFAULT_QUEUE_SIZE = 50
+
+
+class SchedulerState:
+    """SM-2 state per (learner, question) cell, stored as parallel arrays
+
+    Cells are kept sorted by key = learner * KEY_SPACE + questionId so new
+    attempts are matched with one searchsorted. Per learner it also keeps
+    the new_attempts mark of its export (rows applied, their digest, mtime
+    and size), so unchanged exports are skipped without being read.
+    """
+
+    KEY_SPACE = 1 << 32
+    CELL_FIELDS = {'key': np.int64, 'repetitions': np.int32, 'ease': np.float64,
+                   'interval': np.float64, 'last': np.int64, 'due': np.int64}
+    LEARNER_FIELDS = {'rows': np.int64, 'mtime': np.int64, 'size': np.int64}
+
+    def __init__(self):
+        self.cells = {name: np.zeros(0, dtype=dtype) for name, dtype in self.CELL_FIELDS.items()}
+        self.learner_names: List[str] = []
+        self.learners = {name: np.zeros(0, dtype=dtype) for name, dtype in self.LEARNER_FIELDS.items()}
+        self.learner_digests: List[str] = []
+        self.learner_index: Dict[str, int] = {}
+
+    @staticmethod
+    def npz_path(path: str) -> str:
+        """The file np.savez writes for path: it appends .npz unless the name already has it"""
+        return path if path.endswith('.npz') else path + '.npz'
+
+    @classmethod
+    def load(cls, path: str) -> 'SchedulerState':
+        path = cls.npz_path(path)
+        state = cls()
+        if os.path.exists(path):
+            with np.load(path) as saved:
+                if 'learnerDigests' not in saved:
+                    raise ValueError(f'{path} was saved by an older scheduler; run with --rebuild')
+                state.cells = {name: saved[name] for name in cls.CELL_FIELDS}
+                state.learner_digests = saved['learnerDigests'].tolist()
+                state.learners = {name: saved[name] for name in cls.LEARNER_FIELDS}
+                state.learner_names = saved['learnerNames'].tolist()
+        state.learner_index = {name: i for i, name in enumerate(state.learner_names)}
+        return state
+
+    def save(self, path: str):
+        path = self.npz_path(path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, learnerNames=np.array(self.learner_names, dtype=str),
+                 learnerDigests=np.array(self.learner_digests, dtype=str), **self.cells, **self.learners)
+
+    def learner(self, name: str) -> int:
+        if name not in self.learner_index:
+            self.learner_index[name] = len(self.learner_names)
+            self.learner_names.append(name)
+            self.learner_digests.append('')
+            for field, values in self.learners.items():
+                self.learners[field] = np.append(values, 0)
+        return self.learner_index[name]
+
+    def mark(self, learner: int) -> Dict:
+        mark = {field: int(values[learner]) for field, values in self.learners.items()}
+        mark['digest'] = self.learner_digests[learner]
+        return mark
+
+    def set_mark(self, learner: int, mark: Dict):
+        for field in self.LEARNER_FIELDS:
+            self.learners[field][learner] = mark[field]
+        self.learner_digests[learner] = mark['digest']
+
+    def drop_learner(self, learner: int):
+        """Forget every cell of a learner, whose history is about to be replayed"""
+        keep = self.cells['key'] // self.KEY_SPACE != learner
+        self.cells = {name: values[keep] for name, values in self.cells.items()}
+
+    def cell_rows(self, keys: np.ndarray) -> np.ndarray:
+        """Rows of the given cell keys, adding fresh cells for unseen ones"""
+        unseen = np.setdiff1d(keys, self.cells['key'])
+        if len(unseen):
+            fresh = {'key': unseen, 'repetitions': np.zeros(len(unseen)), 'ease': np.full(len(unseen), INITIAL_EASE),
+                     'interval': np.zeros(len(unseen)), 'last': np.zeros(len(unseen)), 'due': np.zeros(len(unseen))}
+            merged = {name: np.concatenate([self.cells[name], fresh[name].astype(dtype)])
+                      for name, dtype in self.CELL_FIELDS.items()}
+            order = np.argsort(merged['key'], kind='stable')
+            self.cells = {name: values[order] for name, values in merged.items()}
+        return np.searchsorted(self.cells['key'], keys)
+
+
+def sm2_update(cells: Dict[str, np.ndarray], rows: np.ndarray, correct: np.ndarray, timestamps: np.ndarray):
+    """Apply one review to each of the given (distinct) rows at once"""
+    quality = np.where(correct, CORRECT_QUALITY, WRONG_QUALITY)
+    repetitions = cells['repetitions'][rows]
+    interval = cells['interval'][rows]
+    ease = cells['ease'][rows]
+    grown = np.where(repetitions == 0, 1.0, np.where(repetitions == 1, 6.0,
+                                                     np.minimum(np.round(interval * ease), MAX_INTERVAL_DAYS)))
+    cells['interval'][rows] = np.where(correct, grown, 1.0)
+    cells['repetitions'][rows] = np.where(correct, repetitions + 1, 0)
+    miss = 5 - quality
+    cells['ease'][rows] = np.maximum(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+    cells['last'][rows] = timestamps
+    # Clip before the cast: cells from older states may still hold uncapped intervals
+    cells['due'][rows] = timestamps + (np.minimum(cells['interval'][rows], MAX_INTERVAL_DAYS) * DAY_MS).astype(np.int64)
+
+
+def apply_attempts(state: SchedulerState, keys: np.ndarray, correct: np.ndarray, timestamps: np.ndarray) -> int:
+    """Replay new attempts in time order; returns the number of rounds
+
+    Round k applies the k-th new attempt of every cell together, so the
+    Python loop runs once per attempt depth, not once per attempt.
+    """
+    if not len(keys):
+        return 0
+    rows = state.cell_rows(keys)
+    order = np.lexsort((timestamps, rows))
+    rows, correct, timestamps = rows[order], correct[order], timestamps[order]
+    starts = np.r_[0, np.flatnonzero(rows[1:] != rows[:-1]) + 1]
+    depth = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+    by_depth = np.argsort(depth, kind='stable')
+    bounds = np.searchsorted(depth[by_depth], np.arange(depth.max() + 2))
+    for k in range(depth.max() + 1):
+        batch = by_depth[bounds[k]:bounds[k + 1]]
+        sm2_update(state.cells, rows[batch], correct[batch], timestamps[batch])
+    return int(depth.max()) + 1
+
+
+def update_state(state: SchedulerState, paths: List[str], rebuild: bool = False) -> Dict:
+    """Read exports changed since the last run and apply their new attempts
+
+    A learner whose earlier attempts changed is replayed from scratch.
+    """
+    stats = {'exports': len(paths), 'changed': 0, 'replayed': 0, 'attempts': 0, 'rounds': 0}
+    key_parts, correct_parts, time_parts = [], [], []
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        learner = state.learner(name)
+        mark = {} if rebuild else state.mark(learner)
+        result = new_attempts(path, mark)
+        if result is None:
+            continue
+        columns, reset = result
+        if reset:
+            state.drop_learner(learner)
+            stats['replayed'] += 1
+        key_parts.append(learner * SchedulerState.KEY_SPACE + columns['questionId'])
+        correct_parts.append(columns['isCorrect'])
+        time_parts.append(columns['timestamp'])
+        state.set_mark(learner, mark)
+        stats['changed'] += 1
+
+    if key_parts:
+        keys = np.concatenate(key_parts)
+        stats['attempts'] = len(keys)
+        stats['rounds'] = apply_attempts(state, keys, np.concatenate(correct_parts), np.concatenate(time_parts))
+    return stats
+
+
+def due_queues(state: SchedulerState, now: int, limit: int = DEFAULT_QUEUE_SIZE) -> Dict[str, List[Dict]]:
+    """Each learner's due questions, lowest estimated recall first
+
+    Recall uses the FSRS forgetting curve R = (1 + t / (9 * S))^-1 with the
+    SM-2 interval as the stability S.
+    """
+    cells = state.cells
+    due = cells['due'] <= now
+    learner = (cells['key'][due] // SchedulerState.KEY_SPACE).astype(np.int64)
+    question = cells['key'][due] % SchedulerState.KEY_SPACE
+    elapsed_days = (now - cells['last'][due]) / DAY_MS
+    recall = 1 / (1 + elapsed_days / (9 * np.maximum(cells['interval'][due], 1e-9)))
+    order = np.lexsort((recall, learner))
+    learner, question, recall = learner[order], question[order], recall[order]
+    interval, repetitions, due_at = cells['interval'][due][order], cells['repetitions'][due][order], \
+        cells['due'][due][order]
+
+    queues = {}
+    starts = np.r_[0, np.flatnonzero(learner[1:] != learner[:-1]) + 1] if len(learner) else np.zeros(0, dtype=int)
+    ends = np.r_[starts[1:], len(learner)]
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        end = min(end, start + limit)
+        queues[state.learner_names[learner[start]]] = [
+            {'questionId': int(question[i]), 'due': to_iso(from_millis(int(due_at[i]))),
+             'recall': round(float(recall[i]), 4), 'interval': float(interval[i]), 'repetitions': int(repetitions[i])}
+            for i in range(start, end)
+        ]
+    return queues
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Incremental SM-2 review scheduling across learner exports')
+    parser.add_argument('input', help='An export, or a directory of exports (v1 or compact v2)')
+    parser.add_argument('--state', default=DEFAULT_STATE, help='Scheduler state carried between runs')
+    parser.add_argument('--output', default='artifacts/review_queues.jsonl', help='One due queue per learner per line')
+    parser.add_argument('--now', help='Schedule as of this ISO time (default: now)')
+    parser.add_argument('--limit', type=int, default=DEFAULT_QUEUE_SIZE, help='Questions per queue')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore the saved state and replay every attempt')
+    args = parser.parse_args(argv)
+    args.state = SchedulerState.npz_path(args.state)
+
+    now_moment = parse_time(args.now) if args.now else None
+    if args.now and now_moment is None:
+        print(f"❌ Cannot parse --now {args.now}")
+        return 1
+    now = to_millis(now_moment) if now_moment else int(time.time() * 1000)
+
+    start = time.perf_counter()
+    try:
+        state = SchedulerState() if args.rebuild else SchedulerState.load(args.state)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    stats = update_state(state, export_paths(args.input), args.rebuild)
+    updated = time.perf_counter()
+    state.save(args.state)
+
+    queues = due_queues(state, now, args.limit)
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for learner, queue in queues.items():
+            f.write(json.dumps({'learner': learner, 'due': queue}, separators=(',', ':')) + '\n')
+
+    print(f"Applied {stats['attempts']} new attempts from {stats['changed']} of {stats['exports']} exports "
+          f"in {stats['rounds']} rounds ({updated - start:.2f}s); {len(state.cells['key'])} learner/question cells")
+    if stats['replayed']:
+        print(f"  ℹ️ {stats['replayed']} learners replayed from scratch (earlier attempts changed)")
+    due_total = sum(len(q) for q in queues.values())
+    print(f"  {len(queues)} learners have reviews due ({due_total} questions queued, up to {args.limit} each)")
+    print(f"State saved to: {args.state}")
+    print(f"Queues saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from bank_io import load_questions, save_questions
+
+DEFAULT_STORE = 'src/data/revisions'
+
+
+def record_hash(record: Dict) -> str:
+    """Content hash of a question record, independent of key order"""
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class RevisionStore:
+    """Content-addressed question records plus one manifest per bank version
+
+    Unique records are appended once to objects.jsonl; each snapshot is a
+    manifest listing the (id, record hash) pairs of that version in order.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE):
+        self.root = root
+        self.objects_path = os.path.join(root, 'objects.jsonl')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        self._objects: Optional[Dict[str, Dict]] = None
+
+    def _load_objects(self) -> Dict[str, Dict]:
+        if self._objects is None:
+            self._objects = {}
+            if os.path.exists(self.objects_path):
+                with open(self.objects_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._objects[entry['hash']] = entry['record']
+        return self._objects
+
+    def _manifest_path(self, name: str) -> str:
+        return os.path.join(self.manifests_dir, f'{name}.json')
+
+    def snapshot(self, questions: List[Dict], name: str, message: str = '', source: str = '') -> Dict:
+        """Store a bank version, writing only records not already in the store"""
+        if os.path.exists(self._manifest_path(name)):
+            raise ValueError(f"Revision '{name}' already exists")
+        objects = self._load_objects()
+        os.makedirs(self.manifests_dir, exist_ok=True)
+
+        entries = []
+        new_records = 0
+        with open(self.objects_path, 'a', encoding='utf-8') as f:
+            for question in questions:
+                digest = record_hash(question)
+                if digest not in objects:
+                    objects[digest] = question
+                    f.write(json.dumps({'hash': digest, 'record': question}, ensure_ascii=False) + '\n')
+                    new_records += 1
+                entries.append([question.get('id'), digest])
+
+        manifest = {
+            'name': name,
+            'created': datetime.now(timezone.utc).isoformat(),
+            'source': source,
+            'message': message,
+            'count': len(entries),
+            'newRecords': new_records,
+            'records': entries
+        }
+        with open(self._manifest_path(name), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, separators=(',', ':'))
+        return manifest
+
+    def manifest(self, name: str) -> Dict:
+        path = self._manifest_path(name)
+        if not os.path.exists(path):
+            raise ValueError(f"Unknown revision '{name}'")
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def list(self) -> List[Dict]:
+        """Manifests without their record lists, oldest first"""
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        summaries = []
+        for filename in os.listdir(self.manifests_dir):
+            if filename.endswith('.json'):
+                manifest = self.manifest(filename[:-len('.json')])
+                manifest.pop('records')
+                summaries.append(manifest)
+        return sorted(summaries, key=lambda m: m['created'])
+
+    def restore(self, name: str) -> List[Dict]:
+        """Rebuild the question list of a revision"""
+        objects = self._load_objects()
+        return [objects[digest] for _, digest in self.manifest(name)['records']]
+
+    def diff(self, old: str, new: str) -> Dict[str, List]:
+        """Questions added, removed and modified (with changed fields) between two revisions"""
+        old_records = {qid: digest for qid, digest in self.manifest(old)['records']}
+        new_records = {qid: digest for qid, digest in self.manifest(new)['records']}
+        objects = self._load_objects()
+
+        modified = []
+        for qid in sorted(old_records.keys() & new_records.keys()):
+            if old_records[qid] != new_records[qid]:
+                before, after = objects[old_records[qid]], objects[new_records[qid]]
+                fields = sorted(k for k in before.keys() | after.keys() if before.get(k) != after.get(k))
+                modified.append({'id': qid, 'fields': fields})
+        return {
+            'added': sorted(new_records.keys() - old_records.keys()),
+            'removed': sorted(old_records.keys() - new_records.keys()),
+            'modified': modified
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Content-addressed snapshots of the question bank')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Revision store directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='Record a bank file as a new revision')
+    snapshot_parser.add_argument('questions', nargs='?', default='src/data/questions.json')
+    snapshot_parser.add_argument('--name', help='Revision name (default: UTC timestamp)')
+    snapshot_parser.add_argument('-m', '--message', default='')
+
+    subparsers.add_parser('list', help='List revisions')
+
+    restore_parser = subparsers.add_parser('restore', help='Write a revision back out as a bank file')
+    restore_parser.add_argument('name')
+    restore_parser.add_argument('--output', default='src/data/questions.json')
+
+    diff_parser = subparsers.add_parser('diff', help='Compare two revisions by question id')
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    diff_parser.add_argument('--json', action='store_true')
+
+    args = parser.parse_args(argv)
+    store = RevisionStore(args.store)
+
+    if args.command == 'snapshot':
+        start = time.perf_counter()
+        name = args.name or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        manifest = store.snapshot(load_questions(args.questions), name, args.message, args.questions)
+        print(f"Snapshot '{name}': {manifest['count']} questions, {manifest['newRecords']} new records "
+              f"({time.perf_counter() - start:.2f}s)")
+    elif args.command == 'list':
+        for m in store.list():
+            print(f"{m['name']:<40} {m['created'][:19]}  {m['count']:>6} questions  "
+                  f"+{m['newRecords']:<6} {m['message']}")
+    elif args.command == 'restore':
+        questions = store.restore(args.name)
+        save_questions(args.output, questions)
+        print(f"Restored '{args.name}' ({len(questions)} questions) to {args.output}")
+    elif args.command == 'diff':
+        changes = store.diff(args.old, args.new)
+        if args.json:
+            print(json.dumps(changes, indent=2))
+            return
+        print(f"{args.old} -> {args.new}: {len(changes['added'])} added, {len(changes['removed'])} removed, "
+              f"{len(changes['modified'])} modified")
+        for qid in changes['added']:
+            print(f"  + {qid}")
+        for qid in changes['removed']:
+            print(f"  - {qid}")
+        for entry in changes['modified']:
+            print(f"  ~ {entry['id']}: {', '.join(entry['fields'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import base64
+import json
+import math
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from bank_io import load_questions
+from text_utils import positioned_tokens, tokenize
+
+INDEX_VERSION = 1
+
+# Okapi BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def encode_varints(numbers: List[int]) -> str:
+    """Encode non-negative integers as base64 LEB128 varints"""
+    out = bytearray()
+    for n in numbers:
+        while n >= 0x80:
+            out.append((n & 0x7F) | 0x80)
+            n >>= 7
+        out.append(n)
+    return base64.b64encode(bytes(out)).decode('ascii')
+
+
+def decode_varints(encoded: str) -> List[int]:
+    """Decode a base64 varint string back into integers"""
+    numbers = []
+    value = 0
+    shift = 0
+    for byte in base64.b64decode(encoded):
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            numbers.append(value)
+            value = 0
+            shift = 0
+    return numbers
+
+
+def build_index(questions: List[Dict]) -> Dict:
+    """Build a delta-encoded positional inverted index over the question bank"""
+    postings: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+    doc_lengths = []
+
+    for doc, question in enumerate(questions):
+        term_positions: Dict[str, List[int]] = defaultdict(list)
+        tokens = positioned_tokens(question)
+        for term, position in tokens:
+            term_positions[term].append(position)
+        doc_lengths.append(len(tokens))
+        for term, positions in term_positions.items():
+            postings[term].append((doc, positions))
+
+    terms = {}
+    for term in sorted(postings):
+        doc_stream = []
+        position_stream = []
+        previous_doc = 0
+        for doc, positions in postings[term]:
+            doc_stream.extend([doc - previous_doc, len(positions)])
+            previous_doc = doc
+            previous_position = 0
+            for position in positions:
+                position_stream.append(position - previous_position)
+                previous_position = position
+        terms[term] = [len(postings[term]), encode_varints(doc_stream), encode_varints(position_stream)]
+
+    total_length = sum(doc_lengths)
+    return {
+        'version': INDEX_VERSION,
+        'ids': [q['id'] for q in questions],
+        'docLengths': doc_lengths,
+        'avgDocLength': total_length / len(doc_lengths) if doc_lengths else 0.0,
+        'terms': terms
+    }
+
+
+class SearchIndex:
+    def __init__(self, data: Dict):
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version: {data.get('version')}")
+        self.ids = data['ids']
+        self.doc_lengths = data['docLengths']
+        self.avg_doc_length = data['avgDocLength'] or 1.0
+        self.terms = data['terms']
+        self.doc_count = len(self.ids)
+        self._postings_cache: Dict[str, List[Tuple[int, int]]] = {}
+        self._positions_cache: Dict[str, Dict[int, List[int]]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> 'SearchIndex':
+        """Load a prebuilt index from disk"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def postings(self, term: str) -> List[Tuple[int, int]]:
+        """Return (doc, term frequency) pairs for a term"""
+        cached = self._postings_cache.get(term)
+        if cached is not None:
+            return cached
+        entry = self.terms.get(term)
+        result = []
+        if entry:
+            stream = decode_varints(entry[1])
+            doc = 0
+            for i in range(0, len(stream), 2):
+                doc += stream[i]
+                result.append((doc, stream[i + 1]))
+        self._postings_cache[term] = result
+        return result
+
+    def positions(self, term: str) -> Dict[int, List[int]]:
+        """Return doc -> token positions for a term"""
+        cached = self._positions_cache.get(term)
+        if cached is not None:
+            return cached
+        result = {}
+        entry = self.terms.get(term)
+        if entry:
+            gaps = decode_varints(entry[2])
+            offset = 0
+            for doc, tf in self.postings(term):
+                position = 0
+                doc_positions = []
+                for gap in gaps[offset:offset + tf]:
+                    position += gap
+                    doc_positions.append(position)
+                result[doc] = doc_positions
+                offset += tf
+        self._positions_cache[term] = result
+        return result
+
+    def idf(self, term: str) -> float:
+        """BM25 inverse document frequency"""
+        entry = self.terms.get(term)
+        df = entry[0] if entry else 0
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def phrase_docs(self, phrase: List[str]) -> set:
+        """Docs containing the terms of a phrase at consecutive positions"""
+        if not phrase:
+            return set()
+        candidates = set(self.positions(phrase[0]))
+        for term in phrase[1:]:
+            candidates &= set(self.positions(term))
+        matches = set()
+        for doc in candidates:
+            starts = set(self.positions(phrase[0])[doc])
+            for offset, term in enumerate(phrase[1:], start=1):
+                starts &= {p - offset for p in self.positions(term)[doc]}
+                if not starts:
+                    break
+            if starts:
+                matches.add(doc)
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Rank questions by BM25; quoted phrases must match exactly"""
+        phrases = [tokenize(p) for p in re.findall(r'"([^"]+)"', query)]
+        terms = tokenize(query.replace('"', ' '))
+        scores: Dict[int, float] = defaultdict(float)
+
+        for term in set(terms):
+            idf = self.idf(term)
+            for doc, tf in self.postings(term):
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc] / self.avg_doc_length)
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        # A phrase of only stopwords or punctuation tokenizes to nothing and constrains nothing
+        for phrase in filter(None, phrases):
+            allowed = self.phrase_docs(phrase)
+            scores = {doc: score for doc, score in scores.items() if doc in allowed}
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(self.ids[doc], score) for doc, score in ranked]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build and query the full-text question search index')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build the index from the question bank')
+    build_parser.add_argument('--questions', default='src/data/questions.json')
+    build_parser.add_argument('--output', default='src/data/search_index.json')
+
+    query_parser = subparsers.add_parser('query', help='Run a ranked query against the index')
+    query_parser.add_argument('query')
+    query_parser.add_argument('--index', default='src/data/search_index.json')
+    query_parser.add_argument('--questions', default='src/data/questions.json')
+    query_parser.add_argument('-k', '--limit', type=int, default=10)
+    query_parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        questions = load_questions(args.questions)
+        start = time.perf_counter()
+        index = build_index(questions)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+        elapsed = time.perf_counter() - start
+        print(f"Indexed {len(questions)} questions, {len(index['terms'])} terms in {elapsed:.2f}s")
+        print(f"Index saved to: {args.output}")
+        return
+
+    index = SearchIndex.load(args.index)
+    start = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps([{'id': qid, 'score': round(score, 4)} for qid, score in results]))
+        return
+
+    questions_by_id = {q['id']: q for q in load_questions(args.questions)}
+    print(f"{len(results)} results in {elapsed_ms:.3f} ms")
+    for qid, score in results:
+        text = questions_by_id.get(qid, {}).get('questionText', '')
+        print(f"  [{qid}] {score:.3f}  {text[:90]}...")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+from bank_validator import validate_questions
+
+
+def question(**fields):
+    q = {
+        'id': 1,
+        'domain': {'number': 1, 'name': 'General Security Concepts', 'weight': 12},
+        'questionText': 'Which control encrypts a whole drive?',
+        'options': [{'letter': letter, 'text': f'Option {letter}'} for letter in 'ABCD'],
+        'correctAnswer': 'A',
+        'explanation': 'Full-disk encryption protects the whole drive.'
+    }
+    q.update(fields)
+    return q
+
+
+def failures(report, rule):
+    return next(r for r in report['rules'] if r['rule'] == rule)['failures']
+
+
+def test_null_answer_and_explanation_are_reported():
+    report = validate_questions([question(correctAnswer=None, explanation=None)])
+    assert failures(report, 'answer-in-options') == 1
+    assert failures(report, 'explanation') == 1
+    assert not report['passed']
+
+
+def test_null_option_text_is_reported():
+    options = [{'letter': 'A', 'text': None}] + question()['options'][1:]
+    report = validate_questions([question(options=options, questionText=None)])
+    assert failures(report, 'option-text') == 1
+
+
+def test_hyphen_breaks_are_warnings_labelled_by_kind():
+    report = validate_questions([question(questionText='Full- disk encryption, fol- lowing a drive loss',
+                                          explanation='The following control applies.')])
+    result = next(r for r in report['rules'] if r['rule'] == 'hyphen-break')
+    assert result['severity'] == 'warning' and result['failures'] == 1
+    assert [(b['text'], b['kind']) for b in result['breaks']] == [('Full- disk', 'stray-space'),
+                                                                   ('fol- lowing', 'line-break')]
@@ -0,0 +1,53 @@
+import re
+from typing import Dict, Iterator, List, Tuple
+
+# Common English words that carry no signal for matching questions
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be because been before being
+both but by can could did do does doing during each for from had has have having
+he her here hers him his how i if in into is it its itself just may me might more
+most must my no nor not of off on once only or other our ours out over own same
+she should so some such than that the their theirs them then there these they
+this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours
+""".split())
+
+# Gap inserted between fields so phrase matches never span two fields
+FIELD_POSITION_GAP = 16
+
+_HYPHEN_BREAK = re.compile(r'(\w)- (\w)')
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+
+def normalize_text(text: str) -> str:
+    """Normalize extraction artifacts like 'Full- disk' and collapse whitespace"""
+    text = _HYPHEN_BREAK.sub(r'\1-\2', text or '')
+    return re.sub(r'\s+', ' ', text).strip().lower()
+
+
+def tokenize(text: str, keep_stopwords: bool = False) -> List[str]:
+    """Split text into lowercase alphanumeric tokens"""
+    tokens = _TOKEN.findall(normalize_text(text))
+    if keep_stopwords:
+        return tokens
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def question_fields(question: Dict) -> Iterator[Tuple[str, str]]:
+    """Yield (field, text) pairs for the searchable parts of a question"""
+    yield 'questionText', question.get('questionText', '')
+    for option in question.get('options', []):
+        yield f"option{option.get('letter', '')}", option.get('text', '')
+    yield 'explanation', question.get('explanation', '')
+
+
+def positioned_tokens(question: Dict) -> List[Tuple[str, int]]:
+    """Tokenize every searchable field, returning (term, position) pairs"""
+    result = []
+    position = 0
+    for _, text in question_fields(question):
+        for token in tokenize(text):
+            result.append((token, position))
+            position += 1
+        position += FIELD_POSITION_GAP
+    return result
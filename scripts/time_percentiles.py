@@ -0,0 +1,240 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from attempt_store import AttemptStore
+from learner_data import BankIndex, export_paths, read_attempt_columns
+
+# Every reported quantile is within this relative error of an observed time
+RELATIVE_ACCURACY = 0.01
+# Times are clamped to this range (seconds); non-positive times go to a separate zero bucket
+MIN_TIME = 0.1
+MAX_TIME = 86400.0
+QUANTILES = (0.5, 0.9, 0.99)
+# Store rows scanned per chunk, bounding memory for any store size
+CHUNK_ROWS = 1 << 22
+# A question is flagged when its median time exceeds its domain's by this factor
+LONG_FACTOR = 2.0
+MIN_FLAG_ATTEMPTS = 30
+
+
+class TimeSketches:
+    """Mergeable log-bucket quantile sketches of timeSpent, one per question
+
+    Bucket i holds times in (gamma^(i-1), gamma^i], so any quantile is known
+    to within RELATIVE_ACCURACY (the DDSketch construction). The bucket
+    layout is fixed, so memory is questions x buckets whatever the attempt
+    volume, and merging sketches from different workers is adding counts.
+    """
+
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    LOW = int(np.floor(np.log(MIN_TIME) / np.log(GAMMA)))
+    BUCKETS = int(np.ceil(np.log(MAX_TIME) / np.log(GAMMA))) - LOW + 2  # Bucket 0 counts zero times
+
+    def __init__(self, ids: Optional[np.ndarray] = None, counts: Optional[np.ndarray] = None,
+                 totals: Optional[np.ndarray] = None):
+        self.ids = np.zeros(0, dtype=np.int64) if ids is None else ids
+        self.counts = np.zeros((len(self.ids), self.BUCKETS), dtype=np.int64) if counts is None else counts
+        self.totals = np.zeros(len(self.ids)) if totals is None else totals
+
+    @classmethod
+    def load(cls, path: str) -> 'TimeSketches':
+        with np.load(path) as saved:
+            if saved['counts'].shape[1] != cls.BUCKETS:
+                raise ValueError(f'{path} was built with a different bucket layout')
+            return cls(saved['ids'], saved['counts'], saved['totals'])
+
+    def save(self, path: str) -> str:
+        """Save to path, with .npz appended if missing (as np.savez would); returns the path written"""
+        if not path.endswith('.npz'):
+            path += '.npz'
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, ids=self.ids, counts=self.counts, totals=self.totals)
+        return path
+
+    def _rows(self, ids: np.ndarray) -> np.ndarray:
+        """Rows of the given question ids, adding empty sketches for unseen ones"""
+        unseen = np.setdiff1d(ids, self.ids)
+        if len(unseen):
+            merged = np.union1d(self.ids, unseen)
+            counts = np.zeros((len(merged), self.BUCKETS), dtype=np.int64)
+            totals = np.zeros(len(merged))
+            rows = np.searchsorted(merged, self.ids)
+            counts[rows], totals[rows] = self.counts, self.totals
+            self.ids, self.counts, self.totals = merged, counts, totals
+        return np.searchsorted(self.ids, ids)
+
+    @classmethod
+    def bucket(cls, seconds: np.ndarray) -> np.ndarray:
+        seconds = np.asarray(seconds, dtype=np.float64)
+        positive = seconds > 0  # Also false for NaN
+        index = np.ceil(np.log(np.clip(seconds, MIN_TIME, MAX_TIME), where=positive,
+                               out=np.ones_like(seconds)) / np.log(cls.GAMMA))
+        return np.where(positive, index.astype(np.int64) - cls.LOW + 1, 0)
+
+    def add(self, question_ids: np.ndarray, seconds: np.ndarray):
+        """Fold a batch of (questionId, timeSpent) pairs in with one bincount"""
+        if not len(question_ids):
+            return
+        ids, inverse = np.unique(question_ids, return_inverse=True)
+        rows = self._rows(ids)[inverse]
+        cells = np.bincount(rows * self.BUCKETS + self.bucket(seconds), minlength=self.counts.size)
+        self.counts += cells.reshape(self.counts.shape)
+        self.totals += np.bincount(rows, np.nan_to_num(seconds), minlength=len(self.ids))
+
+    def merge(self, other: 'TimeSketches') -> 'TimeSketches':
+        rows = self._rows(other.ids)
+        self.counts[rows] += other.counts
+        self.totals[rows] += other.totals
+        return self
+
+    def grouped(self, groups: np.ndarray) -> 'TimeSketches':
+        """Sketches of groups of questions (e.g. domains): groups[i] is the group of self.ids[i]"""
+        keys, inverse = np.unique(groups, return_inverse=True)
+        counts = np.zeros((len(keys), self.BUCKETS), dtype=np.int64)
+        np.add.at(counts, inverse, self.counts)
+        return TimeSketches(keys.astype(np.int64), counts, np.bincount(inverse, self.totals, len(keys)))
+
+    def quantiles(self, qs: Sequence[float] = QUANTILES) -> np.ndarray:
+        """rows x len(qs) quantile estimates (seconds); NaN for empty sketches"""
+        cumulative = np.cumsum(self.counts, axis=1)
+        total = cumulative[:, -1:]
+        ranks = np.floor(np.array(qs)[None, :] * np.maximum(total - 1, 0))
+        index = (cumulative[:, None, :] <= ranks[:, :, None]).sum(axis=2)
+        # The geometric midpoint estimate of each bucket is within RELATIVE_ACCURACY of its contents
+        values = 2 * self.GAMMA ** (index + self.LOW - 1) / (self.GAMMA + 1)
+        values = np.where(index == 0, 0.0, values)
+        return np.where(total > 0, values, np.nan)
+
+    @property
+    def attempts(self) -> np.ndarray:
+        return self.counts.sum(axis=1)
+
+
+def iter_store_chunks(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+    """(questionId, timeSpent) chunks of an attempt store, sliced from its memory maps"""
+    for segment in AttemptStore(path).segments():
+        for start in range(0, len(segment['questionId']), chunk_rows):
+            yield {field: np.asarray(segment[field][start:start + chunk_rows])
+                   for field in ('questionId', 'timeSpent')}
+
+
+def sketch_exports(paths: List[str]) -> TimeSketches:
+    """Sketch a share of the exports, one export in memory at a time"""
+    sketches = TimeSketches()
+    for path in paths:
+        columns = read_attempt_columns(path)
+        sketches.add(columns['questionId'], columns['timeSpent'])
+    return sketches
+
+
+def sketch_source(source: str, jobs: Optional[int] = None) -> TimeSketches:
+    """Sketch a saved sketch file, an attempt store, or exports (split across worker processes)"""
+    if source.endswith('.npz'):
+        return TimeSketches.load(source)
+    if os.path.isdir(source) and AttemptStore.is_store(source):
+        sketches = TimeSketches()
+        for chunk in iter_store_chunks(source):
+            sketches.add(chunk['questionId'], chunk['timeSpent'])
+        return sketches
+    paths = export_paths(source)
+    workers = min(jobs or os.cpu_count() or 1, len(paths))
+    if workers <= 1:
+        return sketch_exports(paths)
+    sketches = TimeSketches()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(sketch_exports, [paths[i::workers] for i in range(workers)]):
+            sketches.merge(part)
+    return sketches
+
+
+def timing_entries(sketches: TimeSketches) -> Dict[str, Dict]:
+    quantiles = sketches.quantiles()
+    attempts = sketches.attempts
+    entries = {}
+    for row, key in enumerate(sketches.ids.tolist()):
+        if not attempts[row]:
+            continue
+        entries[str(key)] = {'attempts': int(attempts[row]),
+                             'mean': round(float(sketches.totals[row] / attempts[row]), 1),
+                             **{f'p{round(q * 100)}': round(float(v), 1) for q, v in zip(QUANTILES, quantiles[row])}}
+    return entries
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Time-per-question percentiles from mergeable quantile sketches')
+    parser.add_argument('inputs', nargs='+',
+                        help='Exports or directories of them, attempt stores, or saved sketches (.npz) to merge')
+    parser.add_argument('--questions', default='src/data/questions.json', help='Bank for per-domain sketches')
+    parser.add_argument('--output', default='artifacts/time_percentiles.json')
+    parser.add_argument('--save-sketch', help='Also save the merged sketches (.npz) for a later merge')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes for reading exports (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sketches = TimeSketches()
+    try:
+        for source in args.inputs:
+            sketches.merge(sketch_source(source, args.jobs))
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    attempts = sketches.attempts
+    if not attempts.sum():
+        print(f"❌ No question attempts found in {', '.join(args.inputs)}")
+        return 1
+    sketched = time.perf_counter()
+    if args.save_sketch:
+        args.save_sketch = sketches.save(args.save_sketch)
+
+    bank = BankIndex.load(args.questions) if os.path.exists(args.questions) else BankIndex({}, {}, {})
+    domain_of = np.array([bank.domains.get(qid) or 0 for qid in sketches.ids.tolist()], dtype=np.int64)
+    domains = sketches.grouped(domain_of)
+    overall = sketches.grouped(np.zeros(len(sketches.ids), dtype=np.int64))
+
+    # Long stems: median time well above the domain's, with enough attempts to trust it
+    question_median = sketches.quantiles((0.5,))[:, 0]
+    domain_median = domains.quantiles((0.5,))[np.searchsorted(domains.ids, domain_of), 0]
+    long = (attempts >= MIN_FLAG_ATTEMPTS) & (domain_of > 0) & (question_median > LONG_FACTOR * domain_median)
+    order = np.argsort(-question_median[long] / np.maximum(domain_median[long], MIN_TIME), kind='stable')
+    flagged = sketches.ids[long][order].tolist()
+
+    report = {
+        'relativeAccuracy': RELATIVE_ACCURACY,
+        'attempts': int(attempts.sum()),
+        'overall': timing_entries(overall)['0'],
+        'domains': {key: entry for key, entry in timing_entries(domains).items() if key != '0'},
+        'questions': timing_entries(sketches),
+        'longQuestions': flagged
+    }
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Sketched {report['attempts']} attempts on {len(report['questions'])} questions in "
+          f"{sketched - start:.2f}s ({sketches.counts.nbytes / 1e6:.1f} MB of sketches)")
+    overall_entry = report['overall']
+    print(f"  overall: p50 {overall_entry['p50']}s, p90 {overall_entry['p90']}s, p99 {overall_entry['p99']}s")
+    for key, entry in report['domains'].items():
+        print(f"  domain {key}: p50 {entry['p50']}s, p90 {entry['p90']}s, p99 {entry['p99']}s")
+    if flagged:
+        shown = ', '.join(map(str, flagged[:10])) + (' ...' if len(flagged) > 10 else '')
+        print(f"  ⚠️ {len(flagged)} questions take over {LONG_FACTOR:g}x their domain's median time ({shown})")
+    else:
+        print(f"  ✅ No question takes over {LONG_FACTOR:g}x its domain's median time")
+    if args.save_sketch:
+        print(f"Sketches saved to: {args.save_sketch}")
+    print(f"Percentiles saved to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,6 +17,8 @@ export interface Question {
   correctAnswer: string;
   explanation: string;
   questionType: 'multiple-choice' | 'multiple-response' | 'fill-in-the-blank' | 'drag-and-drop' | 'image-based';
+  book?: string;
+  objective?: string;
 }
 
 export interface QuizState {
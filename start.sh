@@ -11,8 +11,10 @@ fi
 # Activate virtual environment and install Python dependencies
 source venv/bin/activate && pip install -r scripts/requirements.txt
 
-# Extract questions from PDF
-source venv/bin/activate && python scripts/extract_questions.py
+# Rebuild the question bank from the PDF (stages with unchanged inputs are skipped)
+if [ -f "david.pdf" ]; then
+    source venv/bin/activate && python scripts/pipeline.py
+fi
 
 # Install Node.js dependencies
 npm install
@@ -1,5 +1,11 @@
 import json
+import os
 import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from explanation_matcher import DEFAULT_MIN_CONFIDENCE, match_unmatched
 
 def clean_text(text):
     # Remove extra whitespace and normalize
@@ -13,38 +19,63 @@ with open('src/data/questions.json', 'r', encoding='utf-8') as f:
 with open('book_explanations.json', 'r', encoding='utf-8') as f:
     book_explanations = json.load(f)
 
-# Build lookups
+# Build lookups; a later entry for the same (domain, number) replaces the earlier one
 book_lookup = {}
-for e in book_explanations:
+overwritten_explanations = set()
+for idx, e in enumerate(book_explanations):
     if 'domain' in e and e['domain'] is not None:
         key = (e['domain'], e['number'])
+        if key in book_lookup:
+            overwritten_explanations.add(book_lookup[key]['index'])
         book_lookup[key] = {
             'explanation': e['explanation'],
-            'answer': e['answer']
+            'answer': e['answer'],
+            'index': idx
         }
 
 updated = 0
-not_found = 0
+unmatched_questions = []
+used_explanations = set()
 
 for q in questions:
     qnum = q.get('originalId') or q.get('id')
     domain = q.get('domain', {}).get('number')
     
     if not (qnum and domain):
-        not_found += 1
+        unmatched_questions.append(q)
         continue
         
     key = (int(domain), int(qnum))
     if key in book_lookup:
         q['explanation'] = book_lookup[key]['explanation']
         q['correctAnswer'] = book_lookup[key]['answer']
+        used_explanations.add(book_lookup[key]['index'])
         updated += 1
     else:
-        not_found += 1
+        unmatched_questions.append(q)
+
+# Fall back to option wording for explanations whose domain was mis-assigned
+# (replaced duplicates stay out of the pool, or they could be matched a second time)
+leftover_explanations = [e for idx, e in enumerate(book_explanations)
+                         if idx not in used_explanations and idx not in overwritten_explanations]
+start = time.perf_counter()
+fuzzy_matches = match_unmatched(unmatched_questions, leftover_explanations, DEFAULT_MIN_CONFIDENCE)
+elapsed_ms = (time.perf_counter() - start) * 1000
+
+for q, e, confidence in fuzzy_matches:
+    q['explanation'] = e['explanation']
+    q['correctAnswer'] = e['answer']
+    print(f"  Fuzzy match: question {q['id']} (domain {q.get('domain', {}).get('number')}, #{q.get('originalId')}) "
+          f"<- book domain {e.get('domain')} #{e['number']} (confidence {confidence:.2f})")
+
+not_found = len(unmatched_questions) - len(fuzzy_matches)
 
 print(f'Updated explanations and answers for {updated} questions')
+print(f'Fuzzy matched: {len(fuzzy_matches)} in {elapsed_ms:.1f} ms')
 print(f'Not found: {not_found}')
+if overwritten_explanations:
+    print(f'Duplicate book entries ignored: {len(overwritten_explanations)} (same domain and number as a later entry)')
 
 # Save the updated questions
 with open('src/data/questions_with_book_explanations.json', 'w', encoding='utf-8') as f:
-    json.dump(questions, f, ensure_ascii=False, indent=2) 
\ No newline at end of file
+    json.dump(questions, f, ensure_ascii=False, indent=2)